@@ -10,7 +10,7 @@ from openpyxl import load_workbook
 from collections import Counter
 import shutil
 import io
-from sinotrans.core import FileProcessor
+from sinotrans.core import FileProcessor, SheetSidecar
 
 # ==================== MODEL层 ====================
 class ConfigLoader:
@@ -141,9 +141,11 @@ class FileUploadModel:
 class DataModel:
     """数据模型 - 处理所有数据相关操作"""
     
-    def __init__(self):
+    def __init__(self, sidecar_dir=None):
         self.config_path = Path("conf")
         self.target_path = Path("target")
+        # 旁路根目录，与处理器写入旁路文件的目录一致
+        self.sidecar_dir = sidecar_dir
         self.config_loader = ConfigLoader()
         self.required_fields = self.config_loader.required_fields
         self.key_fields = self.config_loader.key_fields
@@ -163,9 +165,11 @@ class DataModel:
             return []
     
     def load_sheet_data(self, file_path, sheet_name):
-        """加载指定工作表的数据"""
+        """加载指定工作表的数据（优先读取处理时生成的列式旁路文件，源文件变化后自动回退到Excel）"""
         try:
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
+            df = SheetSidecar.load_frame(file_path, sheet_name, root=self.sidecar_dir)
+            if df is None:
+                df = pd.read_excel(file_path, sheet_name=sheet_name)
             return df, None
         except Exception as e:
             return None, str(e)
@@ -203,8 +207,10 @@ class DataModel:
 class ProcessorModel:
     """处理器模型 - 处理SNT数据"""
     
-    def __init__(self):
+    def __init__(self, base_dir=None, sidecar_dir=None):
         self.target_path = Path("target")
+        self.base_dir = base_dir
+        self.sidecar_dir = sidecar_dir
     
     def process_data(self):
         """处理SNT数据"""
@@ -216,7 +222,7 @@ class ProcessorModel:
             
             # 导入并运行SNT2处理器
             from snt2 import AutoSntProcessor
-            processor = AutoSntProcessor()
+            processor = AutoSntProcessor(base_dir=self.base_dir, sidecar_dir=self.sidecar_dir)
             result = processor.run()
             
             if result:
@@ -858,8 +864,11 @@ class MainController:
     """主控制器"""
     
     def __init__(self):
-        self.data_model = DataModel()
-        self.processor_model = ProcessorModel()
+        # 工作目录：上传文件、配置、target均相对于启动目录，处理器使用同一目录，分析页面从同一旁路根目录读取旁路文件
+        base_dir = os.path.abspath(".")
+        sidecar_dir = SheetSidecar.default_root(base_dir)
+        self.data_model = DataModel(sidecar_dir)
+        self.processor_model = ProcessorModel(base_dir, sidecar_dir)
         self.config_model = ConfigModel()
         self.file_upload_model = FileUploadModel()
     
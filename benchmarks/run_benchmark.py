@@ -0,0 +1,217 @@
+"""
+SNT流水线基准测试
+
+生成合成数据后，在独立子进程中多次运行 AutoSntProcessor，统计各阶段耗时、吞吐量（行/秒）和峰值内存：
+    mappings       —— 加载映射配置
+    validation     —— 校验并解析输入文件
+    baseline_load  —— 加载snt基准数据
+    merge          —— 合并res/report数据（不含基准数据加载）
+    write          —— 写入输出工作表（不含样式）
+    style          —— 设置样式
+    save           —— 保存结果文件
+各阶段耗时由流水线的计时区间（Tracer）汇总，为独占耗时（同一线程内嵌套区间的耗时只计入内层区间）；
+工作表并发模式下各阶段耗时为所有线程之和，可能大于总耗时；进程池子进程内的区间不回传，
+其耗时计入主进程中提交/等待任务的区间（merge_sheet、sheet_tasks）
+峰值内存取流水线进程与已结束子进程（进程池工作进程）中的较大值
+
+用法：
+    python benchmarks/run_benchmark.py --snt-rows 50000 --res-files 20 --rows-per-file 5000 --repeat 3
+    python benchmarks/run_benchmark.py --work-dir bench_data --skip-generate --engine columnar --json result.json
+"""
+from pathlib import Path
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "lib"))
+sys.path.insert(0, str(REPO_ROOT))
+
+from synthetic_data import add_generator_arguments, generator_from_args
+from sinotrans.utils import Logger, Tracer
+
+try:
+    import resource
+except ImportError:  # Windows下没有resource模块，不统计峰值内存
+    resource = None
+
+RESULT_PREFIX = "BENCH_RESULT "
+STAGES = ["mappings", "validation", "baseline_load", "merge", "write", "style", "save"]
+# {计时区间名称: 阶段}，未列出的区间（run等）不计入任何阶段
+SPAN_STAGES = {
+    "load_mappings": "mappings",
+    "validate_input_files": "validation",
+    "ingest": "validation",
+    "load_snt_data": "baseline_load",
+    "merge_sheet": "merge",
+    "sheet_tasks": "merge",
+    "process_file": "merge",
+    "hash_join": "merge",
+    "stream_merge": "merge",
+    "stream_file": "merge",
+    "create_output": "write",
+    "write_sheet": "write",
+    "style": "style",
+    "save": "save",
+}
+
+
+def stage_totals(spans):
+    """按阶段累计计时区间的独占耗时：区间耗时减去同一线程内子区间的耗时（其他线程的子区间并行执行，不扣除）"""
+    totals = {stage: 0.0 for stage in STAGES}
+
+    def walk(span):
+        stage = SPAN_STAGES.get(span["name"])
+        if stage is not None:
+            nested = sum(child["wall"] for child in span["children"] if child["thread"] == span["thread"])
+            totals[stage] += span["wall"] - nested
+        for child in span["children"]:
+            walk(child)
+
+    for root in spans:
+        walk(root)
+    return totals
+
+
+def peak_memory_mb():
+    """
+    峰值常驻内存（MB）：当前进程与已结束子进程中的较大值
+    进程池后端的解析、合并在工作进程中执行，只统计当前进程会低估内存占用；工作进程在流水线结束时关闭，此时已计入RUSAGE_CHILDREN
+    """
+    if resource is None:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # Linux单位为KB，macOS为字节
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_worker(work_dir, processor_kwargs):
+    """子进程：运行一次流水线，输出一行JSON结果"""
+    from snt2 import AutoSntProcessor
+
+    processor = AutoSntProcessor(base_dir=work_dir, **processor_kwargs)
+    with open(os.path.join(work_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    start = time.perf_counter()
+    success = processor.run()
+    total = time.perf_counter() - start
+    if success and os.path.exists(processor.target_file):
+        os.remove(processor.target_file)
+
+    rows = manifest["rows"]["total"]
+    result = {
+        "success": success,
+        "total": total,
+        "stages": stage_totals(Tracer.report()),
+        "rows": rows,
+        "rows_per_sec": rows / total if total else None,
+        "peak_memory_mb": peak_memory_mb(),
+    }
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+def run_once(work_dir, processor_kwargs):
+    """在独立子进程中运行一次，保证峰值内存互不影响"""
+    completed = subprocess.run(
+        [sys.executable, __file__, "--worker", work_dir, "--processor-kwargs", json.dumps(processor_kwargs)],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, encoding="utf-8", input="",
+    )
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"❌ 基准测试子进程失败（退出码 {completed.returncode}）")
+
+
+def summarize(results):
+    """取各次运行的中位数"""
+    median = lambda values: statistics.median(values) if values else None
+    peaks = [r["peak_memory_mb"] for r in results if r["peak_memory_mb"] is not None]
+    return {
+        "runs": len(results),
+        "success": all(r["success"] for r in results),
+        "rows": results[0]["rows"],
+        "total": median([r["total"] for r in results]),
+        "rows_per_sec": median([r["rows_per_sec"] for r in results]),
+        "peak_memory_mb": max(peaks) if peaks else None,
+        "stages": {stage: median([r["stages"][stage] for r in results]) for stage in STAGES},
+    }
+
+
+def print_summary(summary):
+    total = summary["total"]
+    Logger.info(f"{'='*60}")
+    Logger.info(f"{'阶段':<16}{'耗时(s)':>12}{'占比':>10}")
+    for stage, elapsed in summary["stages"].items():
+        Logger.info(f"{stage:<16}{elapsed:>12.3f}{elapsed / total:>10.1%}")
+    Logger.info(f"{'total':<16}{total:>12.3f}")
+    Logger.info(f"{'='*60}")
+    Logger.info(f"📊 数据行数: {summary['rows']}，吞吐量: {summary['rows_per_sec']:.0f} 行/秒")
+    if summary["peak_memory_mb"] is not None:
+        Logger.info(f"📊 峰值内存: {summary['peak_memory_mb']:.1f} MB")
+    if not summary["success"]:
+        Logger.error("❌ 存在运行失败的轮次")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SNT流水线基准测试")
+    parser.add_argument("--work-dir", help="数据目录（默认为临时目录）")
+    parser.add_argument("--skip-generate", action="store_true", help="使用已生成的数据")
+    parser.add_argument("--repeat", type=int, default=3, help="运行次数")
+    parser.add_argument("--json", help="结果输出文件")
+    parser.add_argument("--engine", default="row", choices=["row", "columnar"], help="读取引擎")
+    parser.add_argument("--pool-backend", default="thread", choices=["thread", "process"], help="执行后端")
+    parser.add_argument("--concurrent-sheets", action="store_true", help="并发处理所有工作表")
+    parser.add_argument("--streaming-output", action="store_true", help="流式写入输出文件")
+    parser.add_argument("--parse-cache", action="store_true", help="启用解析缓存（测量热启动）")
+    parser.add_argument("--sidecar", action="store_true", help="启用列式旁路文件")
+    parser.add_argument("--map-memo", action="store_true", help="启用字段映射结果缓存")
+    parser.add_argument("--streaming-merge", action="store_true", help="res/report文件经有界队列流式合并")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--processor-kwargs", help=argparse.SUPPRESS)
+    add_generator_arguments(parser)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, json.loads(args.processor_kwargs))
+        return
+
+    work_dir = os.path.abspath(args.work_dir or tempfile.mkdtemp(prefix="snt_bench_"))
+    Logger(debug_path=os.path.join(work_dir, "bench_logs"))
+    if not args.skip_generate:
+        generator_from_args(work_dir, args).generate()
+
+    processor_kwargs = {
+        "engine": args.engine,
+        "pool_backend": args.pool_backend,
+        "concurrent_sheets": args.concurrent_sheets,
+        "streaming_output": args.streaming_output,
+        "parse_cache": args.parse_cache,
+        "sidecar": args.sidecar,
+        "map_memo": args.map_memo,
+        "streaming_merge": args.streaming_merge,
+    }
+    results = []
+    for idx in range(1, args.repeat + 1):
+        result = run_once(work_dir, processor_kwargs)
+        Logger.info(f"⏱️ 第{idx}次运行: {result['total']:.3f}s，{result['rows_per_sec']:.0f} 行/秒")
+        results.append(result)
+
+    summary = summarize(results)
+    summary["options"] = processor_kwargs
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "runs": results}, f, ensure_ascii=False, indent=2)
+        Logger.info(f"💾 结果已保存: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+SNT流水线合成数据生成器
+
+在指定工作目录下生成与 AutoSntProcessor 目录结构一致的合成数据：
+    conf/          —— 复制仓库中的映射配置
+    template.xlsx  —— 复制仓库中的模板
+    snt/           —— 1个基准文件，每个工作表 snt_rows 行
+    res/           —— res_files 个反馈文件
+    report/        —— report_files 个报表文件
+    manifest.json  —— 生成参数及各类文件的数据行数
+
+用法：
+    python benchmarks/synthetic_data.py <工作目录> --snt-rows 50000 --res-files 20 --rows-per-file 5000
+"""
+from datetime import datetime, timedelta
+from openpyxl import Workbook
+from pathlib import Path
+import argparse
+import json
+import random
+import shutil
+import sys
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "lib"))
+
+from sinotrans.utils import Logger
+
+
+class SyntheticSntGenerator:
+    """
+    合成SNT/res/report工作簿：
+    - rows/files/sheets：数据规模
+    - collision_rate：res/report行复用其他res/report文件已更新过的关键字段的比例（覆盖优先级的压力）
+    - unmatched_rate：res/report行关键字段在基准数据中不存在的比例
+    - fallback_rate：res/report文件只有回退工作表（Sheet1）的比例
+    所有文件均为 .xlsx（流水线通过openpyxl读取，不支持 .xls）
+    """
+    REQUIRED_SHEETS = ["CREATED", "NOT INCLUDED", "COORDINATED", "REQUESTED", "BOOKED"]
+    FALLBACK_SHEET = "Sheet1"
+    SNT_HEADERS = ["folder", "bu", "po", "lot", "esd", "lsd", "vendor", "so_number", "pol", "pod", "status", "criteria", "fwd_feedback"]
+    RES_HEADERS = SNT_HEADERS + ["Remark", "列1", "列2"]
+    REPORT_HEADERS = [
+        "folder", "bu", "po", "lot", "vendor", "pol", "pod", "ffww", "sli_status", "esd", "etd", "teuQty",
+        "VendorContact", "BookingRequestDate", "BookingConfirmDate", "ASNDate", "SHIPPING MODE",
+        "shipment number", "ETD", "ETA", "SO", "ATD", "Container",
+    ]
+    FEEDBACKS = ["Vendor did not answer", "Booking requested", "Cargo ready", "Waiting for SO", None]
+    REMARKS = ["OK", "Pending vendor", "Check with carrier", None]
+    BUS = ["FA", "HT", "MA", "SO"]
+    PORTS = ["CNBJO", "CNYTN", "CNNGB", "CNSHA"]
+    DESTINATIONS = ["COBUN", "PECLL", "CLSAI", "CLL"]
+    MODES = ["FCL", "LCL", "AIR"]
+
+    def __init__(self, work_dir, snt_rows=10000, res_files=10, report_files=2, rows_per_file=1000, sheets=5,
+                 collision_rate=0.1, unmatched_rate=0.05, fallback_rate=0.1, seed=42):
+        self.work_dir = Path(work_dir)
+        self.snt_rows = snt_rows
+        self.res_files = res_files
+        self.report_files = report_files
+        self.rows_per_file = rows_per_file
+        self.sheets = self.REQUIRED_SHEETS[:max(1, min(sheets, len(self.REQUIRED_SHEETS)))]
+        self.collision_rate = collision_rate
+        self.unmatched_rate = unmatched_rate
+        self.fallback_rate = fallback_rate
+        self.random = random.Random(seed)
+        self.base_date = datetime(2025, 8, 1)
+        self.row_counts = {"snt": 0, "res": 0, "report": 0}
+
+    def _key(self, sheet_idx, idx):
+        """关键字段 (folder, po, lot)，po在不同文件中混用数字和文本，检验关键字段类型归一"""
+        return f"{idx:05d}{self.BUS[idx % len(self.BUS)]}{sheet_idx}/25J11", str(7000000 + idx), idx % 3 + 1
+
+    def _date(self):
+        return self.base_date + timedelta(days=self.random.randint(0, 90))
+
+    def _snt_row(self, key, sheet_name):
+        folder, po, lot = key
+        return [
+            folder, self.random.choice(self.BUS), po, lot, self._date(), self._date(),
+            f"VENDOR {self.random.randint(1, 500):03d}", None,
+            self.random.choice(self.PORTS), self.random.choice(self.DESTINATIONS),
+            sheet_name, self.random.choice(["CRITIC", "NORMAL"]), None,
+        ]
+
+    def _res_row(self, key, sheet_name):
+        row = self._snt_row(key, sheet_name)
+        row[self.SNT_HEADERS.index("fwd_feedback")] = self.random.choice(self.FEEDBACKS)
+        return row + [self.random.choice(self.REMARKS), self.random.choice(["A", None]), self.random.choice(["B", None])]
+
+    def _report_row(self, key):
+        folder, po, lot = key
+        return [
+            folder, self.random.choice(self.BUS), int(po), lot, f"VENDOR {self.random.randint(1, 500):03d}",
+            self.random.choice(self.PORTS), self.random.choice(self.DESTINATIONS), "SNT", "Estimado",
+            self._date(), self._date(), self.random.randint(1, 4),
+            self.random.choice(["Contacted", None]), self._date(), self._date(), self._date(),
+            self.random.choice(self.MODES), f"SH{self.random.randint(100000, 999999)}",
+            self._date(), self._date(), f"SO{self.random.randint(10000, 99999)}", self._date(),
+            f"CONT{self.random.randint(1000000, 9999999)}",
+        ]
+
+    def _source_keys(self, sheet_idx, used_keys):
+        """生成一个res/report文件某个工作表的关键字段序列"""
+        keys = []
+        for _ in range(self.rows_per_file):
+            roll = self.random.random()
+            if used_keys and roll < self.collision_rate:
+                keys.append(self.random.choice(used_keys))
+            elif roll < self.collision_rate + self.unmatched_rate:
+                keys.append(self._key(sheet_idx, self.snt_rows + self.random.randint(0, self.snt_rows)))
+            else:
+                keys.append(self._key(sheet_idx, self.random.randrange(self.snt_rows)))
+        used_keys.extend(keys)
+        return keys
+
+    def _save(self, path, sheets):
+        """
+        保存工作簿 {工作表名称: (表头, 行数据)}
+        使用普通模式（而不是write-only模式）保存，工作表带有 <dimension> 范围，与用户的真实文件一致，基线处理器可以读取
+        """
+        wb = Workbook()
+        wb.remove(wb.active)
+        for sheet_name, (headers, rows) in sheets.items():
+            ws = wb.create_sheet(sheet_name)
+            ws.append(headers)
+            for row in rows:
+                ws.append(row)
+        wb.save(str(path))
+
+    def _prepare_workspace(self):
+        for folder in ("conf", "snt", "res", "report", "target"):
+            path = self.work_dir / folder
+            if folder in ("snt", "res", "report") and path.exists():
+                shutil.rmtree(path)
+            path.mkdir(parents=True, exist_ok=True)
+        for conf_file in (REPO_ROOT / "conf").glob("*.txt"):
+            shutil.copy(conf_file, self.work_dir / "conf" / conf_file.name)
+        shutil.copy(REPO_ROOT / "template.xlsx", self.work_dir / "template.xlsx")
+        # 只处理生成的工作表
+        sheet_config = self.work_dir / "conf" / "sheet_config.txt"
+        lines = sheet_config.read_text(encoding="utf-8").splitlines()
+        lines = [f"required_sheet:{','.join(self.sheets)}" if line.startswith("required_sheet:") else line for line in lines]
+        sheet_config.write_text("\n".join(lines), encoding="utf-8")
+
+    def generate(self):
+        """生成全部合成数据，返回manifest"""
+        self._prepare_workspace()
+
+        snt_sheets = {}
+        for sheet_idx, sheet_name in enumerate(self.sheets):
+            rows = [self._snt_row(self._key(sheet_idx, idx), sheet_name) for idx in range(self.snt_rows)]
+            snt_sheets[sheet_name] = (self.SNT_HEADERS, rows)
+            self.row_counts["snt"] += len(rows)
+        self._save(self.work_dir / "snt" / "000_PendingPoSnt.xlsx", snt_sheets)
+
+        used_keys = {sheet_name: [] for sheet_name in self.sheets}
+        for folder, file_count in (("res", self.res_files), ("report", self.report_files)):
+            for file_idx in range(file_count):
+                use_fallback = self.random.random() < self.fallback_rate
+                sheets = {}
+                for sheet_idx, sheet_name in enumerate(self.sheets):
+                    keys = self._source_keys(sheet_idx, used_keys[sheet_name])
+                    if folder == "res":
+                        headers, rows = self.RES_HEADERS, [self._res_row(key, sheet_name) for key in keys]
+                    else:
+                        headers, rows = self.REPORT_HEADERS, [self._report_row(key) for key in keys]
+                    if use_fallback:
+                        # 只有回退工作表时，所有目标工作表都读取同一张回退表
+                        fallback_rows = sheets.setdefault(self.FALLBACK_SHEET, (headers, []))[1]
+                        fallback_rows.extend(rows)
+                    else:
+                        sheets[sheet_name] = (headers, rows)
+                    self.row_counts[folder] += len(rows)
+                self._save(self.work_dir / folder / f"{file_idx:03d}_{folder}.xlsx", sheets)
+
+        manifest = {
+            "config": {
+                "snt_rows": self.snt_rows, "res_files": self.res_files, "report_files": self.report_files,
+                "rows_per_file": self.rows_per_file, "sheets": self.sheets, "collision_rate": self.collision_rate,
+                "unmatched_rate": self.unmatched_rate, "fallback_rate": self.fallback_rate,
+            },
+            "rows": dict(self.row_counts, total=sum(self.row_counts.values())),
+        }
+        with open(self.work_dir / "manifest.json", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        Logger.info(f"✅ 合成数据已生成: {self.work_dir}，共 {manifest['rows']['total']} 行")
+        return manifest
+
+
+def add_generator_arguments(parser):
+    """生成器命令行参数（基准测试脚本复用）"""
+    parser.add_argument("--snt-rows", type=int, default=10000, help="基准文件每个工作表的行数")
+    parser.add_argument("--res-files", type=int, default=10, help="res文件数")
+    parser.add_argument("--report-files", type=int, default=2, help="report文件数")
+    parser.add_argument("--rows-per-file", type=int, default=1000, help="res/report文件每个工作表的行数")
+    parser.add_argument("--sheets", type=int, default=5, help="工作表数（1-5）")
+    parser.add_argument("--collision-rate", type=float, default=0.1, help="关键字段冲突比例")
+    parser.add_argument("--unmatched-rate", type=float, default=0.05, help="无法匹配基准数据的行比例")
+    parser.add_argument("--fallback-rate", type=float, default=0.1, help="只有回退工作表的文件比例")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+
+
+def generator_from_args(work_dir, args):
+    return SyntheticSntGenerator(
+        work_dir, snt_rows=args.snt_rows, res_files=args.res_files, report_files=args.report_files,
+        rows_per_file=args.rows_per_file, sheets=args.sheets, collision_rate=args.collision_rate,
+        unmatched_rate=args.unmatched_rate, fallback_rate=args.fallback_rate, seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="生成SNT流水线合成数据")
+    parser.add_argument("work_dir", help="工作目录")
+    add_generator_arguments(parser)
+    args = parser.parse_args()
+    Logger(debug_path=str(Path(args.work_dir) / "logs"))
+    generator_from_args(args.work_dir, args).generate()
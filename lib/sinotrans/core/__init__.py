@@ -1,4 +1,19 @@
 from sinotrans.core.file_processor import FileProcessor
 from sinotrans.core.rule import Rule
-from sinotrans.core.eml import EmlParser, EmailClient
-from sinotrans.core.excel_processor import ExcelProcessor
\ No newline at end of file
+from sinotrans.core.rule_memo import RuleMemo
+from sinotrans.core.eml import EmlParser, EmailClient, BlockingImapSessionPool
+from sinotrans.core.mailbox_directory import MailboxDirectory
+from sinotrans.core.async_imap import AsyncImapConnection, ImapSessionPool, AsyncEmailClient
+from sinotrans.core.excel_processor import ExcelProcessor
+from sinotrans.core.parse_cache import ParseCache
+from sinotrans.core.sheet_bounds import SheetBounds
+from sinotrans.core.key_index import KeyIndex
+from sinotrans.core.sheet_schema import SheetSchema
+from sinotrans.core.sheet_snapshot import SheetSnapshot
+from sinotrans.core.mapping_plan import MappingPlan
+from sinotrans.core.row_store import RowStore
+from sinotrans.core.sheet_frame import SheetFrame
+from sinotrans.core.merge_engine import SntMergeEngine
+from sinotrans.core.sheet_style import SheetStyler
+from sinotrans.core.sheet_sidecar import SheetSidecar
+from sinotrans.core.sheet_writer import StreamingWorkbookWriter
\ No newline at end of file
@@ -0,0 +1,978 @@
+from sinotrans.core.mailbox_directory import MailboxDirectory
+from sinotrans.utils.logger import Logger
+from collections import OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
+import itertools
+import os
+import random
+import re
+import ssl
+import tempfile
+
+
+class AsyncImapConnection:
+    """
+    基于 asyncio 流的最小 IMAP4rev1 客户端连接，命令可流水线发送（不必等待上一条命令完成）：
+    - 每条命令分配独立标签，读取任务按标签完成对应命令，多条命令的往返时间相互重叠
+    - 未标记响应（* SEARCH / * 1 FETCH / * LIST ...）按响应名称归属到期望该响应的未完成命令：
+      UID FETCH/STORE 等按UID集合命令的 FETCH 响应按响应中的UID归属到UID集合包含该UID的命令，同类命令可以流水线发送；
+      无法区分所属命令的响应（SEARCH、LIST等）同一时间只允许一条期望该响应的命令未完成，同类命令在连接内自动依次发送
+    - 返回值格式与 imaplib 一致：(状态, 数据列表)，含字面量的响应为 (前缀, 字面量字节) 元组，EmailClient 的解析逻辑可直接复用
+    """
+    LITERAL_RE = re.compile(rb'\{(\d+)\+?\}$')
+    TAGGED_RE = re.compile(rb'^(?P<tag>[A-Z]+\d+) (?P<type>[A-Z]+) ?(?P<data>.*)$')
+    UNTAGGED_RE = re.compile(rb'^\* (?P<type>[A-Z-]+)(?: (?P<data>.*))?$', re.S)
+    UNTAGGED_STATUS_RE = re.compile(rb'^\* (?P<data>\d+) (?P<type>[A-Z-]+)(?: (?P<data2>.*))?$', re.S)
+    # 需要原样发送的参数（括号列表、序号集、已加引号的字符串等），其余含特殊字符的参数加引号
+    ATOM_RE = re.compile(r'^[^\s"\\(){}%*\x00-\x1f\x7f]+$')
+    UID_RE = re.compile(rb'\bUID (\d+)')
+    # 流式读取字面量时每次读取的字节数
+    LITERAL_CHUNK_SIZE = 65536
+    _tag_prefixes = itertools.count()
+
+    class _Pending:
+        """
+        未完成的命令：期望的未标记响应名称、已收到的未标记响应、完成结果
+        - literal_sink: 流式接收字面量，sink(前缀行) 返回可写对象（write方法）时字面量分块写入该对象，返回None时照常读入内存
+        - on_untagged: 逐条处理未标记响应，设置后响应不再累积到命令结果中
+        - uids: 按UID集合执行的命令的UID范围 [(下限, 上限), ...]，只接收UID在范围内的 FETCH 响应
+        """
+        def __init__(self, names, future, literal_sink=None, on_untagged=None, uids=None):
+            self.names = names
+            self.future = future
+            self.literal_sink = literal_sink
+            self.on_untagged = on_untagged
+            self.uids = uids
+            self.untagged: Dict[str, list] = {}
+
+        def accepts(self, name: str, uid: Optional[int]) -> bool:
+            if name not in self.names:
+                return False
+            if self.uids is None or name != 'FETCH':
+                return True
+            return uid is not None and any(low <= uid <= high for low, high in self.uids)
+
+    def __init__(self, host: str, port: int, use_ssl: bool = True, timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.state = 'LOGOUT'
+        self.capabilities = set()
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        # 标签前缀按连接区分，便于在日志中区分不同连接的命令
+        self._tag_prefix = ''.join(chr(ord('A') + int(d)) for d in str(next(self._tag_prefixes)))
+        self._tag_counter = itertools.count(1)
+        self._pending: "OrderedDict[bytes, AsyncImapConnection._Pending]" = OrderedDict()
+        self._continuation: Optional[asyncio.Future] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._read_task: Optional[asyncio.Task] = None
+        # 按未标记响应名称加锁：不能按UID区分的命令依次执行，见 command()
+        self._untagged_locks: Dict[str, asyncio.Lock] = {}
+
+    async def open(self):
+        """建立连接（SSL）并读取服务器问候，随后启动读取任务并查询服务器能力"""
+        ssl_context = ssl.create_default_context() if self.use_ssl is True else (self.use_ssl or None)
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=ssl_context), self.timeout
+        )
+        greeting = await asyncio.wait_for(self._read_response(), self.timeout)
+        head = greeting[0] if isinstance(greeting[0], bytes) else greeting[0][0]
+        if head.startswith(b'* PREAUTH'):
+            self.state = 'AUTH'
+        elif head.startswith(b'* OK'):
+            self.state = 'NONAUTH'
+        else:
+            self.writer.close()
+            raise RuntimeError(f"❌ IMAP服务器拒绝连接: {head!r}")
+        self._write_lock = asyncio.Lock()
+        self._read_task = asyncio.ensure_future(self._read_loop())
+        await self.capability()
+        return self
+
+    async def close(self):
+        """关闭连接，未完成的命令以异常结束"""
+        self.state = 'LOGOUT'
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+        if self._read_task is not None:
+            self._read_task.cancel()
+            try:
+                await self._read_task
+            except BaseException:
+                pass
+            self._read_task = None
+        self._fail_pending(ConnectionError("IMAP连接已关闭"))
+
+    @property
+    def closed(self) -> bool:
+        return self.state == 'LOGOUT'
+
+    # ---------------------------------------------------------------- 读取
+    async def _read_line(self) -> bytes:
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("IMAP服务器关闭了连接")
+        return line.rstrip(b'\r\n')
+
+    async def _read_response(self) -> list:
+        """
+        读取一条完整响应（含字面量）：[(前缀, 字面量), ..., 剩余行] 或 [行]
+        期望该响应的命令设置了 literal_sink 时，字面量分块写入sink返回的对象，元组中保存该对象而不是字面量字节
+        """
+        items = []
+        line = await self._read_line()
+        sink = self._literal_sink_for(line) if line.startswith(b'* ') else None
+        while True:
+            match = self.LITERAL_RE.search(line)
+            if not match:
+                break
+            size = int(match.group(1))
+            target = sink(line) if sink is not None else None
+            if target is None:
+                items.append((line, await self.reader.readexactly(size)))
+            else:
+                while size > 0:
+                    block = await self.reader.readexactly(min(size, self.LITERAL_CHUNK_SIZE))
+                    target.write(block)
+                    size -= len(block)
+                items.append((line, target))
+            line = await self._read_line()
+        items.append(line)
+        return items
+
+    def _literal_sink_for(self, head: bytes):
+        """未标记响应所属命令的 literal_sink（没有时返回None）"""
+        match = self.UNTAGGED_STATUS_RE.match(head) or self.UNTAGGED_RE.match(head)
+        if not match:
+            return None
+        pending = self._owner(match.group('type').decode('ascii'), head)
+        return pending.literal_sink if pending is not None else None
+
+    def _owner(self, name: str, head: bytes) -> Optional["AsyncImapConnection._Pending"]:
+        """
+        未标记响应所属的未完成命令：FETCH 响应优先归属到UID集合包含该UID的命令，
+        其余归属到最早发出、期望该响应且不限定UID的命令
+        """
+        uid = None
+        if name == 'FETCH':
+            match = self.UID_RE.search(head)
+            uid = int(match.group(1)) if match else None
+            for pending in self._pending.values():
+                if pending.uids is not None and pending.accepts(name, uid):
+                    return pending
+        for pending in self._pending.values():
+            if pending.uids is None and pending.accepts(name, uid):
+                return pending
+        return None
+
+    async def _read_loop(self):
+        try:
+            while True:
+                self._dispatch(await self._read_response())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.state = 'LOGOUT'
+            self._fail_pending(e if isinstance(e, ConnectionError) else ConnectionError(f"IMAP读取失败: {e}"))
+
+    def _fail_pending(self, error: Exception):
+        for pending in self._pending.values():
+            if not pending.future.done():
+                pending.future.set_exception(error)
+        self._pending.clear()
+        if self._continuation is not None and not self._continuation.done():
+            self._continuation.set_exception(error)
+
+    def _dispatch(self, items: list):
+        head = items[0] if isinstance(items[0], bytes) else items[0][0]
+        if head.startswith(b'+'):
+            if self._continuation is not None and not self._continuation.done():
+                self._continuation.set_result(head)
+            return
+        if head.startswith(b'* '):
+            self._dispatch_untagged(head, items)
+            return
+        match = self.TAGGED_RE.match(head)
+        pending = self._pending.pop(match.group('tag'), None) if match else None
+        if pending is None:
+            Logger.debug(f"⚠️ 无法识别的IMAP响应: {head[:200]!r}")
+            return
+        if not pending.future.done():
+            pending.future.set_result((match.group('type').decode('ascii'), match.group('data'), pending))
+
+    def _dispatch_untagged(self, head: bytes, items: list):
+        match = self.UNTAGGED_STATUS_RE.match(head)
+        if match:
+            name = match.group('type').decode('ascii')
+            first = match.group('data') + (b' ' + match.group('data2') if match.group('data2') is not None else b'')
+        else:
+            match = self.UNTAGGED_RE.match(head)
+            if not match:
+                Logger.debug(f"⚠️ 无法识别的IMAP响应: {head[:200]!r}")
+                return
+            name = match.group('type').decode('ascii')
+            first = match.group('data') or b''
+        if name == 'CAPABILITY':
+            self.capabilities = set(first.decode('ascii', errors='ignore').upper().split())
+        if name == 'BYE':
+            self.state = 'LOGOUT'
+
+        # 去掉 "* 名称 " 前缀后按 imaplib 的格式保存
+        data = list(items)
+        data[0] = first if isinstance(items[0], bytes) else (first, items[0][1])
+        if len(data) > 1 and data[-1] == b'':
+            data.pop()
+        # UID可能出现在字面量之后（如 "* 1 FETCH (BODY[] {n} ... UID 5)"），按响应的所有非字面量部分查找
+        text = b' '.join(item[0] if isinstance(item, tuple) else item for item in items)
+        pending = self._owner(name, text)
+        if pending is None:
+            return
+        if pending.on_untagged is not None:
+            pending.on_untagged(name, data)
+        else:
+            pending.untagged.setdefault(name, []).extend(data)
+
+    # ---------------------------------------------------------------- 命令
+    def _format_arg(self, arg) -> list:
+        """将参数转为待发送的片段：字节串作为字面量发送，字符串按需加引号"""
+        if isinstance(arg, bytes):
+            return [arg]
+        text = str(arg)
+        if not text.isascii() or '\r' in text or '\n' in text:
+            return [text.encode('utf-8')]
+        if self.ATOM_RE.match(text) or (text.startswith('(') and text.endswith(')')) \
+                or (len(text) >= 2 and text.startswith('"') and text.endswith('"')):
+            return [text]
+        return ['"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"']
+
+    async def command(self, name: str, *args, untagged: Iterable[str] = None,
+                      literal_sink=None, on_untagged=None, uid_set: str = None) -> Tuple[str, list]:
+        """
+        发送命令并等待完成（可并发调用，多条命令流水线发送）
+        返回：(状态, 数据列表)；数据为 untagged 指定名称（默认与命令同名）的未标记响应，没有时为 [None]
+        状态为 NO 时数据为服务器的提示信息；BAD 时抛出RuntimeError
+        literal_sink/on_untagged 见 _Pending，用于边接收边处理大响应（如批量获取邮件）
+        uid_set: 命令操作的UID集合，FETCH 响应按UID归属到该命令；未指定时，期望相同未标记响应的命令依次执行
+        """
+        if self.closed or self._read_task is None:
+            raise ConnectionError("IMAP连接未建立")
+        names = tuple(untagged) if untagged is not None else (name.split()[-1].upper(),)
+        uids = self.uid_ranges(uid_set) if uid_set is not None else None
+        # 按UID集合归属的命令只需独占 FETCH 以外的响应名称
+        exclusive = sorted(set(names) - {'FETCH'}) if uids is not None else sorted(set(names))
+        async with AsyncExitStack() as stack:
+            for response_name in exclusive:
+                await stack.enter_async_context(self._untagged_locks.setdefault(response_name, asyncio.Lock()))
+            return await self._send(name, args, names, literal_sink, on_untagged, uids)
+
+    @staticmethod
+    def uid_ranges(uid_set: str) -> List[Tuple[int, float]]:
+        """IMAP UID集合（如 "1:500,503"、"10:*"）转为 [(下限, 上限), ...]，"*" 视为无上限"""
+        ranges = []
+        for part in uid_set.split(','):
+            low, _, high = part.partition(':')
+            bounds = [float('inf') if value == '*' else int(value) for value in (low, high or low)]
+            ranges.append((min(bounds), max(bounds)))
+        return ranges
+
+    async def _send(self, name, args, names, literal_sink, on_untagged, uids) -> Tuple[str, list]:
+        tag = f"{self._tag_prefix}{next(self._tag_counter)}".encode('ascii')
+        future = asyncio.get_running_loop().create_future()
+        pending = self._Pending(names, future, literal_sink, on_untagged, uids)
+
+        parts = []
+        for arg in args:
+            parts.extend(self._format_arg(arg))
+        async with self._write_lock:
+            self._pending[tag] = pending
+            buffer = tag + b' ' + name.encode('ascii')
+            for part in parts:
+                if isinstance(part, bytes):
+                    # 同步字面量：等待服务器的继续请求后再发送内容
+                    self.writer.write(buffer + b' {%d}\r\n' % len(part))
+                    self._continuation = asyncio.get_running_loop().create_future()
+                    await self.writer.drain()
+                    await self._continuation
+                    self._continuation = None
+                    buffer = part
+                else:
+                    buffer += b' ' + part.encode('ascii')
+            self.writer.write(buffer + b'\r\n')
+            await self.writer.drain()
+
+        typ, text, pending = await future
+        if typ == 'BAD':
+            raise RuntimeError(f"❌ IMAP命令错误 {name}: {text.decode('utf-8', errors='replace')}")
+        if typ == 'NO':
+            return typ, [text]
+        data = []
+        for response_name in names:
+            data.extend(pending.untagged.get(response_name, ()))
+        return typ, data or [None]
+
+    async def uid(self, command: str, *args) -> Tuple[str, list]:
+        """UID 命令，返回格式与 imaplib.IMAP4.uid 一致"""
+        command = command.upper()
+        if command in ('SEARCH', 'SORT', 'THREAD'):
+            return await self.command(f"UID {command}", *args, untagged=(command,))
+        # FETCH/STORE/COPY/MOVE/EXPUNGE 的第一个参数为UID集合，返回的 FETCH 响应按UID归属
+        return await self.command(f"UID {command}", *args, untagged=('FETCH',), uid_set=args[0])
+
+    async def uid_fetch_stream(self, uid_set: str, item: str, on_message, literal_sink=None) -> Tuple[str, list]:
+        """
+        UID FETCH 一个UID集合，每收到一封邮件立即回调 on_message(uid, payload)，不在命令结果中累积邮件内容
+        payload 为字面量字节；指定 literal_sink 时为sink返回的可写对象（邮件内容已分块写入）
+        """
+        errors = []
+
+        def _on_untagged(name, data):
+            head = b''.join(entry[0] if isinstance(entry, tuple) else entry for entry in data)
+            match = self.UID_RE.search(head)
+            payload = next((entry[1] for entry in data if isinstance(entry, tuple)), None)
+            if match is None or payload is None:
+                Logger.debug(f"⚠️ 忽略无邮件内容的FETCH响应: {head[:200]!r}")
+                return
+            # 回调异常不能中断读取任务（会影响同一连接上的其他命令），命令完成后再抛出
+            try:
+                on_message(match.group(1).decode('ascii'), payload)
+            except Exception as e:
+                errors.append(e)
+
+        result = await self.command(
+            'UID FETCH', uid_set, item, untagged=('FETCH',), literal_sink=literal_sink, on_untagged=_on_untagged,
+            uid_set=uid_set
+        )
+        if errors:
+            raise errors[0]
+        return result
+
+    async def capability(self) -> set:
+        await self.command('CAPABILITY')
+        return self.capabilities
+
+    async def login(self, username: str, password: str):
+        typ, data = await self.command('LOGIN', username, password)
+        if typ != 'OK':
+            raise RuntimeError(f"❌ 登录失败: {data}")
+        self.state = 'AUTH'
+        # 登录后服务器能力可能变化（如 MOVE、UIDPLUS）
+        await self.capability()
+        return typ, data
+
+    async def select(self, mailbox: str = 'INBOX', readonly: bool = False):
+        typ, data = await self.command('EXAMINE' if readonly else 'SELECT', mailbox, untagged=('EXISTS',))
+        if typ != 'OK':
+            raise RuntimeError(f"❌ 选择邮箱失败 {mailbox}: {data}")
+        self.state = 'SELECTED'
+        return typ, data
+
+    async def noop(self):
+        return await self.command('NOOP')
+
+    async def list(self, directory: str = '""', pattern: str = '*'):
+        return await self.command('LIST', directory, pattern)
+
+    async def create(self, mailbox: str):
+        return await self.command('CREATE', mailbox)
+
+    async def expunge(self):
+        return await self.command('EXPUNGE')
+
+    async def logout(self):
+        try:
+            if not self.closed:
+                await asyncio.wait_for(self.command('LOGOUT', untagged=('BYE',)), self.timeout)
+        except Exception:
+            pass
+        finally:
+            await self.close()
+
+
+class ImapSessionPool:
+    """
+    同一账号、同一邮箱的已认证IMAP会话池（AsyncImapConnection），最多 size 个会话：
+    - 会话按需建立（SSL握手 + LOGIN + SELECT），用完归还后复用，不再每次出错都完整重连
+    - 取出的会话由调用方独占，同一会话内的多条命令仍可流水线发送；并发操作分散到不同会话上并行执行
+    - 健康检查只针对空闲超过 idle_check 秒的会话（取出时发送NOOP），不在每次操作前发送NOOP
+    - 已断开或检查失败的会话直接丢弃，由新会话补足
+    用法：
+        async with pool.session() as mail:
+            status, data = await mail.uid('SEARCH', 'ALL')
+    """
+    def __init__(self, imap_server, imap_port, imap_username, imap_password, selected_box="INBOX", size=4,
+                 idle_check=60, use_ssl=True, timeout=30):
+        if size <= 0:
+            raise ValueError(f"❌ 连接池大小必须大于0: {size}")
+        self.imap_server = imap_server
+        self.imap_port = imap_port
+        self.imap_username = imap_username
+        self.imap_password = imap_password
+        self.selected_box = selected_box
+        self.size = size
+        self.idle_check = idle_check
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        # 空闲会话栈 [(会话, 归还时间)]，后进先出：优先复用刚用过的会话，长期空闲的会话留在栈底
+        self._idle: List[Tuple[AsyncImapConnection, float]] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.created = 0
+        self.reused = 0
+        self.health_checks = 0
+        self.discarded = 0
+
+    async def connect(self, max_retries=3) -> AsyncImapConnection:
+        """
+        建立新的已认证会话（登录并选择邮箱），默认重试3次，如果失败则抛出异常
+        新会话不计入连接池，由调用方负责关闭或通过 release() 归还
+        """
+        for attempt in range(1, max_retries + 1):
+            mail = AsyncImapConnection(self.imap_server, self.imap_port, self.use_ssl, self.timeout)
+            try:
+                await mail.open()
+                await mail.login(self.imap_username, self.imap_password)
+                await mail.select(self.selected_box)
+                self.created += 1
+                return mail
+            except Exception as e:
+                await mail.close()
+                Logger.debug(f"⚠️ 连接失败 (尝试 {attempt}/{max_retries}): {e}")
+                if attempt < max_retries:
+                    delay = min(60, 2 ** attempt)  # 指数退避，最大60秒
+                    Logger.debug(f"等待 {delay} 秒后重试...")
+                    await asyncio.sleep(delay + random.uniform(0, 1))  # 添加随机抖动
+                else:
+                    raise RuntimeError(f"❌ 重试失败：{e}")
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        return self._slots
+
+    async def _healthy(self, mail: AsyncImapConnection) -> bool:
+        """空闲会话健康检查：NOOP在超时时间内返回OK"""
+        self.health_checks += 1
+        try:
+            status, _ = await asyncio.wait_for(mail.noop(), self.timeout)
+            return status == 'OK'
+        except Exception as e:
+            Logger.debug(f"💓 空闲会话检查失败: {e}")
+            return False
+
+    async def acquire(self) -> AsyncImapConnection:
+        """取出一个可用会话（没有空闲会话且未达上限时新建，达到上限时等待其他会话归还）"""
+        slots = self._get_slots()
+        await slots.acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            while self._idle:
+                mail, released_at = self._idle.pop()
+                if mail.state != 'SELECTED' or (
+                        loop.time() - released_at >= self.idle_check and not await self._healthy(mail)):
+                    await self._discard(mail)
+                    continue
+                self.reused += 1
+                return mail
+            return await self.connect()
+        except BaseException:
+            slots.release()
+            raise
+
+    def release(self, mail: AsyncImapConnection):
+        """归还会话（已断开的会话直接丢弃）"""
+        try:
+            if mail.state == 'SELECTED':
+                self._idle.append((mail, asyncio.get_running_loop().time()))
+            else:
+                self.discarded += 1
+                asyncio.ensure_future(mail.close())
+        finally:
+            self._get_slots().release()
+
+    async def _discard(self, mail: AsyncImapConnection):
+        self.discarded += 1
+        await mail.logout()
+
+    @asynccontextmanager
+    async def session(self):
+        """独占一个会话；操作抛出异常时会话状态未知，关闭后丢弃（相当于 EmailClient 的 _reset_connection）"""
+        mail = await self.acquire()
+        try:
+            yield mail
+        except BaseException:
+            await mail.close()
+            raise
+        finally:
+            self.release(mail)
+
+    async def warm(self, count: int = 1):
+        """预先建立 count 个会话放入连接池（账号或邮箱配置错误时尽早失败）"""
+        mails = [await self.acquire() for _ in range(min(count, self.size))]
+        for mail in mails:
+            self.release(mail)
+
+    async def close(self):
+        """登出所有空闲会话"""
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(mail.logout() for mail, _ in idle))
+        Logger.debug(f"🔌 连接池关闭: {self.stats()}")
+
+    def stats(self) -> Dict:
+        """新建、复用、健康检查、丢弃的会话数，当前空闲会话数"""
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "health_checks": self.health_checks,
+            "discarded": self.discarded,
+            "idle": len(self._idle),
+        }
+
+
+class AsyncEmailClient:
+    """
+    EmailClient 的 asyncio 版本，操作与 EmailClient 一致（搜索、获取、复制、删除、邮箱目录列表/创建），返回值格式相同
+    - 每个操作从会话池（ImapSessionPool，pool_size 个已认证会话）中独占一个会话执行，并发操作分散到多个会话上并行
+    - 同一会话内的多条命令流水线发送，批量获取邮件的耗时接近一次往返而不是所有往返之和
+    - 跨邮箱操作为每个邮箱建立独立的会话池并发执行（IMAP 会话同一时间只能选中一个邮箱）
+    - 重试退避使用 asyncio.sleep，不阻塞事件循环中的其他会话
+    用法：
+        async with AsyncEmailClient(server, port, username, password, pool_size=4) as client:
+            status, data = await client.search_mail(None, 'ALL')
+    """
+    def __init__(self, imap_server, imap_port, imap_username, imap_password, selected_box="INBOX", max_retries=5,
+                 use_ssl=True, timeout=30, pool_size=1, idle_check=60):
+        self.imap_server = imap_server
+        self.imap_port = imap_port
+        self.imap_username = imap_username
+        self.imap_password = imap_password
+        self.selected_box = selected_box  # 默认邮箱
+        self.max_retries = max_retries  # 最大重试次数
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.pool = ImapSessionPool(
+            imap_server, imap_port, imap_username, imap_password, selected_box,
+            size=pool_size, idle_check=idle_check, use_ssl=use_ssl, timeout=timeout
+        )
+        # 邮箱目录缓存（会话池中的所有会话共用），CREATE/DELETE/RENAME 后失效
+        self.mailboxes = MailboxDirectory()
+
+    async def __aenter__(self):
+        await self.connect_imap()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.logout()
+
+    def _for_mailbox(self, mailbox: str) -> "AsyncEmailClient":
+        """同一账号、指定邮箱（解码后的名称）的新客户端（独立会话池）"""
+        return AsyncEmailClient(
+            self.imap_server, self.imap_port, self.imap_username, self.imap_password,
+            selected_box=self.mailboxes.server_name(mailbox), max_retries=self.max_retries, use_ssl=self.use_ssl, timeout=self.timeout,
+            pool_size=self.pool.size, idle_check=self.pool.idle_check
+        )
+
+    async def connect_imap(self):
+        """预先建立一个会话（登录并选择邮箱），失败时抛出异常"""
+        await self.pool.warm()
+
+    async def logout(self):
+        """登出并关闭会话池中的所有会话"""
+        await self.pool.close()
+
+    async def _retry_imap_operation(self, operation, *args, **kwargs):
+        """
+        从会话池取出一个会话执行IMAP操作（operation(mail, ...) 为协程函数），失败时丢弃该会话，退避后换一个会话重试
+        """
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                async with self.pool.session() as mail:
+                    return await operation(mail, *args, **kwargs)
+            except Exception as e:
+                Logger.error(f"⚠️ IMAP状态错误 (尝试 {attempt}/{self.max_retries}): {e}")
+                if attempt < self.max_retries:
+                    delay = min(60, 2 ** attempt)  # 指数退避，最大60秒
+                    Logger.info(f"等待 {delay} 秒后重试...")
+                    await asyncio.sleep(delay + random.uniform(0, 1))  # 添加随机抖动
+                else:
+                    raise RuntimeError(f"{self.imap_username}无法连接到服务器: {self.imap_server}:{self.imap_port}") from e
+        return None
+
+    async def noop(self):
+        """发送NOOP心跳命令"""
+        async def _noop(mail):
+            response = await mail.noop()
+            if not response or response[0] != 'OK':
+                raise RuntimeError(f"⚠️ NOOP响应异常: {response}")
+            return response
+        return await self._retry_imap_operation(_noop)
+
+    @staticmethod
+    async def _mail_uid(mail, command, *args):
+        return await mail.uid(command, *args)
+
+    async def search_mail(self, condition, keyword):
+        """
+        搜索邮件（带重试机制）
+        :param condition: 搜索条件（如字符集，可为None）
+        :param keyword: 关键字，如"ALL"
+        :return: (status, messages)
+        """
+        args = [arg for arg in (condition, keyword) if arg is not None]
+        return await self._retry_imap_operation(self._mail_uid, 'SEARCH', *args)
+
+    async def fetch_email_by_uid(self, email_uid, keyword):
+        """获取指定 UID 的邮件内容——原始邮件数据（带重试机制），返回 (status, msg_data)"""
+        return await self._retry_imap_operation(self._mail_uid, 'FETCH', self._uid_text(email_uid), keyword)
+
+    def _spread(self, count: int) -> List[range]:
+        """将 count 个任务按顺序均分为不超过会话池大小的连续分组"""
+        groups = min(self.pool.size, count)
+        return [range(idx * count // groups, (idx + 1) * count // groups) for idx in range(groups)]
+
+    async def fetch_emails_by_uids(self, email_uids: Iterable, keyword) -> List[Tuple[str, list]]:
+        """
+        获取多封邮件（每封一条 UID FETCH）：按会话池大小分组，各组在各自的会话上并行，组内命令流水线发送
+        按输入顺序返回 [(status, msg_data), ...]
+        """
+        email_uids = [self._uid_text(uid) for uid in email_uids]
+
+        async def _fetch(mail, indices):
+            return await asyncio.gather(*(mail.uid('FETCH', email_uids[idx], keyword) for idx in indices))
+
+        results = [None] * len(email_uids)
+        groups = self._spread(len(email_uids))
+        for indices, group_results in zip(groups, await asyncio.gather(*(
+                self._retry_imap_operation(_fetch, indices) for indices in groups))):
+            for idx, result in zip(indices, group_results):
+                results[idx] = result
+        return results
+
+    async def expand_uid_set(self, uid_set: str) -> List[str]:
+        """将IMAP UID集合（如 "1:*"、"5,7:9"）展开为当前邮箱中实际存在的UID列表（一次 UID SEARCH）"""
+        status, data = await self._retry_imap_operation(self._mail_uid, 'SEARCH', 'UID', uid_set)
+        if status != 'OK':
+            raise RuntimeError(f"❌ 搜索UID集合失败 {uid_set}: {data}")
+        return [uid.decode('ascii') for uid in (data[0] or b'').split()]
+
+    @staticmethod
+    def uid_chunks(email_uids: Iterable, chunk_size: int) -> List[str]:
+        """将UID列表按升序每 chunk_size 个分为一段，每段压缩为UID集合字符串（连续UID合并为范围，如 "1:500"）"""
+        uids = sorted({int(AsyncEmailClient._uid_text(uid)) for uid in email_uids})
+        chunks = []
+        for start in range(0, len(uids), chunk_size):
+            ranges = []
+            for uid in uids[start:start + chunk_size]:
+                if ranges and ranges[-1][1] == uid - 1:
+                    ranges[-1][1] = uid
+                else:
+                    ranges.append([uid, uid])
+            chunks.append(','.join(f"{low}:{high}" if low != high else str(low) for low, high in ranges))
+        return chunks
+
+    async def fetch_emails_streaming(self, email_uids, on_message, keyword='BODY.PEEK[]', chunk_size=500,
+                                     literal_sink=None) -> int:
+        """
+        批量获取邮件：UID按 chunk_size 分段，每段一条 UID FETCH（如 UID FETCH 1:500 (BODY.PEEK[])），
+        每收到一封邮件立即回调 on_message(uid, payload)，不在内存中累积整段邮件
+        - email_uids: UID列表，或IMAP UID集合字符串（如 "1:*"，先以一次 UID SEARCH 展开）
+        - literal_sink: 见 AsyncImapConnection._Pending，指定后邮件内容边接收边写入sink返回的对象
+        某段失败重试时，该段中已回调过的邮件会再次回调
+        返回：回调的邮件数
+        """
+        if isinstance(email_uids, str):
+            email_uids = await self.expand_uid_set(email_uids)
+        count = 0
+        callback_errors = []
+
+        def _on_message(uid, payload):
+            # 回调异常直接抛给调用方，不作为连接错误重试
+            nonlocal count
+            if callback_errors:
+                return
+            try:
+                on_message(uid, payload)
+                count += 1
+            except Exception as e:
+                callback_errors.append(e)
+
+        item = keyword if keyword.startswith('(') else f"({keyword})"
+
+        async def _fetch_chunk(uid_set):
+            status, data = await self._retry_imap_operation(
+                lambda mail: mail.uid_fetch_stream(uid_set, item, _on_message, literal_sink)
+            )
+            if status != 'OK':
+                raise RuntimeError(f"❌ 批量获取邮件失败 {uid_set}: {data}")
+            Logger.debug(f"📥 已获取UID段 {uid_set}")
+
+        # 各段分散到会话池的会话上并行获取（同时进行的段数不超过会话池大小），回调顺序不保证按UID排列
+        await asyncio.gather(*(_fetch_chunk(uid_set) for uid_set in self.uid_chunks(email_uids, chunk_size)))
+        if callback_errors:
+            raise callback_errors[0]
+        return count
+
+    async def fetch_emails_to_dir(self, email_uids, dest_dir, keyword='BODY.PEEK[]', chunk_size=500) -> Dict[str, str]:
+        """
+        批量获取邮件并逐封保存为 dest_dir/<uid>.eml：邮件内容边接收边分块写入临时文件，接收完成后按UID重命名
+        内存占用与邮件、附件大小无关
+        返回：{uid: eml文件路径}
+        """
+        os.makedirs(dest_dir, exist_ok=True)
+        saved = {}
+        open_files = []
+
+        def _open(prefix):
+            handle = tempfile.NamedTemporaryFile(dir=dest_dir, suffix='.eml.part', delete=False)
+            open_files.append(handle)
+            return handle
+
+        def _on_message(uid, handle):
+            handle.close()
+            path = os.path.join(dest_dir, f"{uid}.eml")
+            os.replace(handle.name, path)
+            open_files.remove(handle)
+            saved[uid] = path
+
+        try:
+            await self.fetch_emails_streaming(email_uids, _on_message, keyword, chunk_size, literal_sink=_open)
+        finally:
+            # 中断时清理未接收完整的临时文件
+            for handle in open_files:
+                handle.close()
+                if os.path.exists(handle.name):
+                    os.remove(handle.name)
+        Logger.info(f"📥 已保存 {len(saved)} 封邮件到 {dest_dir}")
+        return saved
+
+    async def copy_email_by_uid(self, email_uid, utf7_folder):
+        """将指定 UID 的邮件复制到目标文件夹（UTF-7 编码格式），返回 IMAP 操作结果"""
+        return await self._retry_imap_operation(self._mail_uid, 'COPY', self._uid_text(email_uid), utf7_folder)
+
+    @staticmethod
+    def report_removed(email_uids: List, remaining: set, action: str) -> bool:
+        """按验证搜索的结果汇总批量删除/移动：UID仍在当前邮箱中即视为失败"""
+        failed = [uid for uid in map(AsyncEmailClient._uid_text, email_uids) if uid in remaining]
+        if failed:
+            Logger.info(f"❌ {len(failed)} 封邮件{action}失败: {', '.join(failed)}")
+        Logger.info(f"✅ 已{action} {len(email_uids) - len(failed)} 封邮件")
+        return not failed
+
+    @staticmethod
+    async def _search_remaining(mail: AsyncImapConnection, uid_sets: List[str]) -> set:
+        """以 UID SEARCH UID <集合> 查询仍在当前邮箱中的UID（逐段发送：* SEARCH 响应不含所属命令的信息，无法流水线区分）"""
+        remaining = set()
+        for uid_set in uid_sets:
+            status, data = await mail.uid('SEARCH', 'UID', uid_set)
+            if status != 'OK':
+                raise RuntimeError(f"❌ 验证搜索失败 {uid_set}: {data}")
+            remaining.update(uid.decode('ascii') for uid in (data[0] or b'').split())
+        return remaining
+
+    @staticmethod
+    async def _delete_uid_set(mail: AsyncImapConnection, uid_set: str):
+        """
+        标记删除并清除：支持UIDPLUS时 UID EXPUNGE 只清除指定UID
+        不支持UIDPLUS时只能 EXPUNGE，会清除当前邮箱中所有带 \\Deleted 标记的邮件（包括不在本批次中的邮件），与原先逐封删除的行为一致
+        """
+        result = await mail.uid('STORE', uid_set, '+FLAGS.SILENT', '(\\Deleted)')
+        Logger.debug(f'🛑 标记删除 {uid_set} 结果：{result[0]}')
+        if result[0] != 'OK':
+            raise RuntimeError(f"❌ 标记删除失败：{uid_set}，错误：{result[1]}")
+        if 'UIDPLUS' in mail.capabilities:
+            return await mail.command('UID EXPUNGE', uid_set, untagged=('EXPUNGE',))
+        return await mail.expunge()
+
+    async def delete_email_by_uids(self, email_uids: List[str], batch_size=1000):
+        """
+        批量删除邮件并验证是否成功：按UID集合标记删除（每段一条 UID STORE），UID EXPUNGE（不支持UIDPLUS时 EXPUNGE）提交，
+        最后以 UID SEARCH 确认这些UID已不在当前邮箱中
+        """
+        email_uids = list(email_uids)
+        uid_sets = self.uid_chunks(email_uids, batch_size)
+
+        async def _delete(mail):
+            for uid_set in uid_sets:
+                await self._delete_uid_set(mail, uid_set)
+            return await self._search_remaining(mail, uid_sets)
+
+        try:
+            remaining = await self._retry_imap_operation(_delete)
+            return self.report_removed(email_uids, remaining, "删除")
+        except Exception as e:
+            Logger.error(f"❌ 删除错误: {e}")
+            return False
+
+    async def copy_emails_by_uids(self, email_uids, utf7_folder, batch_size=1000):
+        """批量复制邮件到目标文件夹（UTF-7 编码格式），每段一条 UID COPY（流水线发送），失败时抛出RuntimeError"""
+        uid_sets = self.uid_chunks(email_uids, batch_size)
+
+        async def _copy(mail):
+            for uid_set, copy_result in zip(uid_sets, await asyncio.gather(*(
+                    mail.uid('COPY', uid_set, utf7_folder) for uid_set in uid_sets))):
+                if copy_result[0] != 'OK':
+                    raise RuntimeError(f"❌ 邮件复制失败：{uid_set} -> {utf7_folder}，错误：{copy_result[1]}")
+        await self._retry_imap_operation(_copy)
+
+    async def move_emails_by_uids(self, email_uids, utf7_folder, batch_size=1000):
+        """
+        批量移动邮件到目标文件夹（UTF-7 编码格式）：
+        服务器支持MOVE时每段一条 UID MOVE，否则 UID COPY + 标记删除 + UID EXPUNGE（不支持UIDPLUS时 EXPUNGE，见 _delete_uid_set），
+        最后以 UID SEARCH 确认这些UID已不在当前邮箱中
+        换会话重试时先按段 UID SEARCH 出仍在源邮箱中的UID，只处理这些UID；已复制成功的段不再复制，只标记删除并清除，
+        避免目标文件夹中出现重复邮件（COPY已执行但响应丢失的段仍可能重复）
+        返回：是否全部移动成功
+        """
+        email_uids = list(email_uids)
+        uid_sets = self.uid_chunks(email_uids, batch_size)
+        copied = set()
+        attempts = []
+
+        async def _move(mail):
+            retrying = bool(attempts)
+            attempts.append(True)
+            for uid_set in uid_sets:
+                pending_set = uid_set
+                if retrying:
+                    remaining = await self._search_remaining(mail, [uid_set])
+                    if not remaining:
+                        continue
+                    pending_set = self.uid_chunks(remaining, batch_size)[0]
+                if 'MOVE' in mail.capabilities:
+                    result = await mail.uid('MOVE', pending_set, utf7_folder)
+                else:
+                    result = ('OK', None)
+                    if uid_set not in copied:
+                        result = await mail.uid('COPY', pending_set, utf7_folder)
+                    if result[0] == 'OK':
+                        copied.add(uid_set)
+                        await self._delete_uid_set(mail, pending_set)
+                if result[0] != 'OK':
+                    raise RuntimeError(f"❌ 邮件移动失败：{pending_set} -> {utf7_folder}，错误：{result[1]}")
+            return await self._search_remaining(mail, uid_sets)
+
+        try:
+            remaining = await self._retry_imap_operation(_move)
+            return self.report_removed(email_uids, remaining, f"移动到 {utf7_folder}")
+        except Exception as e:
+            Logger.error(f"❌ 移动错误: {e}")
+            return False
+
+    async def list_mailboxes(self, refresh=False) -> List[str]:
+        """
+        获取邮箱现有文件夹名称列表（已按修改版UTF-7解码）
+        使用邮箱目录缓存：首次调用或 refresh=True 时执行 LIST，之后直接读取缓存
+        """
+        if refresh or not self.mailboxes.loaded:
+            async def _list(mail):
+                status, folders = await mail.list()
+                if status != "OK" or not folders or folders == [None]:
+                    raise RuntimeError(f"❌ 获取有效邮箱列表失败：{status}")
+                self.mailboxes.load(folders)
+            await self._retry_imap_operation(_list)
+        return self.mailboxes.names()
+
+    async def check_exist_mailbox(self, folder_name, refresh=False):
+        """
+        检查邮箱中是否存在指定的文件夹（名称不区分大小写）
+        优先查询邮箱目录缓存；缓存中没有时重新LIST一次（文件夹可能由其他客户端创建）
+        """
+        if not folder_name or not isinstance(folder_name, str):
+            raise RuntimeError("🚨 文件夹名称不能为空且必须是字符串")
+        cached = self.mailboxes.loaded and not refresh
+        await self.list_mailboxes(refresh)
+        if folder_name in self.mailboxes:
+            return True
+        if cached:
+            await self.list_mailboxes(refresh=True)
+            return folder_name in self.mailboxes
+        return False
+
+    async def _change_mailbox(self, action, command, *folder_names):
+        """执行 CREATE/DELETE/RENAME（名称按修改版UTF-7编码），无论成功与否都使邮箱目录缓存失效，失败时抛出RuntimeError"""
+        if not all(folder_names) or not all(isinstance(name, str) for name in folder_names):
+            raise RuntimeError("🚨 文件夹名称不能为空且必须是字符串")
+        server_names = [self.mailboxes.server_name(name) for name in folder_names]
+
+        async def _change(mail):
+            try:
+                typ, response = await mail.command(command, *server_names)
+            finally:
+                self.mailboxes.invalidate()
+            if typ != 'OK':
+                raise RuntimeError(f"❌ 文件夹{action}失败（{typ}）：{response}")
+            Logger.info(f"📁 文件夹{action}成功：{' -> '.join(folder_names)}")
+        await self._retry_imap_operation(_change)
+
+    async def create_mailbox(self, folder_name):
+        """在邮箱中创建文件夹（邮箱目录），失败时抛出RuntimeError"""
+        await self._change_mailbox("创建", 'CREATE', folder_name)
+        # 目录缓存已失效，验证时重新LIST一次
+        if not await self.check_exist_mailbox(folder_name):
+            raise RuntimeError(f"❌ 文件夹创建失败：'{folder_name}' 不存在")
+        Logger.debug(f"✅ 验证成功：'{folder_name}' 已存在")
+
+    async def delete_mailbox(self, folder_name):
+        """删除文件夹（邮箱目录），失败时抛出RuntimeError"""
+        await self._change_mailbox("删除", 'DELETE', folder_name)
+
+    async def rename_mailbox(self, old_name, new_name):
+        """重命名文件夹（邮箱目录），失败时抛出RuntimeError"""
+        await self._change_mailbox("重命名", 'RENAME', old_name, new_name)
+
+    async def copy_eml_to_folder(self, email_uid, folder_name):
+        """先判断文件夹存不存在，然后复制邮件到指定文件夹"""
+        if not await self.check_exist_mailbox(folder_name):
+            raise RuntimeError(f"❌ 文件夹不存在：{folder_name}")
+        utf7_folder = self.mailboxes.server_name(folder_name)
+        copy_result = await self.copy_email_by_uid(email_uid, utf7_folder)
+        if copy_result[0] != 'OK':
+            raise RuntimeError(f"❌ 邮件复制失败：{email_uid} -> {utf7_folder}，错误：{copy_result[1]}")
+        Logger.info(f"✉️ 原邮件复制到：{utf7_folder}")
+
+    async def archive_emls_to_folder(self, email_uids, folder_name, move=True):
+        """
+        批量归档：只判断一次文件夹是否存在，然后将一组邮件移动（move=False时复制）到指定文件夹
+        返回：是否全部成功
+        """
+        email_uids = list(email_uids)
+        if not await self.check_exist_mailbox(folder_name):
+            raise RuntimeError(f"❌ 文件夹不存在：{folder_name}")
+        utf7_folder = self.mailboxes.server_name(folder_name)
+        if move:
+            return await self.move_emails_by_uids(email_uids, utf7_folder)
+        await self.copy_emails_by_uids(email_uids, utf7_folder)
+        Logger.info(f"✉️ {len(email_uids)} 封邮件复制到：{utf7_folder}")
+        return True
+
+    async def search_mailboxes(self, mailboxes: Iterable[str], condition, keyword) -> Dict[str, Tuple[str, list]]:
+        """并发搜索多个邮箱（每个邮箱一个连接），返回 {邮箱: (status, messages)}"""
+        async def _search(mailbox):
+            async with self._for_mailbox(mailbox) as client:
+                return await client.search_mail(condition, keyword)
+        mailboxes = list(mailboxes)
+        results = await asyncio.gather(*(_search(mailbox) for mailbox in mailboxes))
+        return dict(zip(mailboxes, results))
+
+    async def fetch_mailboxes(self, mailbox_uids: Dict[str, Iterable], keyword) -> Dict[str, List[Tuple[str, list]]]:
+        """
+        并发获取多个邮箱中的邮件：每个邮箱一个连接，连接内的 UID FETCH 流水线发送
+        参数：mailbox_uids——{邮箱: [UID, ...]}
+        返回：{邮箱: [(status, msg_data), ...]}
+        """
+        async def _fetch(mailbox, email_uids):
+            async with self._for_mailbox(mailbox) as client:
+                return await client.fetch_emails_by_uids(email_uids, keyword)
+        mailboxes = list(mailbox_uids)
+        results = await asyncio.gather(*(_fetch(mailbox, mailbox_uids[mailbox]) for mailbox in mailboxes))
+        return dict(zip(mailboxes, results))
+
+    @staticmethod
+    def _uid_text(email_uid) -> str:
+        return email_uid.decode('ascii') if isinstance(email_uid, bytes) else str(email_uid)
@@ -1,13 +1,18 @@
 from sinotrans.utils.logger import Logger
 from sinotrans.utils.global_thread_pool import GlobalThreadPool
 from sinotrans.core.rule import Rule
+from sinotrans.core.async_imap import AsyncEmailClient
+from sinotrans.core.mailbox_directory import MailboxDirectory
 from email import policy
 from email.parser import BytesParser
 from bs4 import BeautifulSoup
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+from contextlib import contextmanager
 import concurrent.futures
+import asyncio
 import imaplib
 import random
+import threading
 import time
 import re
 import os
@@ -107,7 +112,7 @@ class EmlParser:
         except Exception as e:
             Logger.error(f"❌ 处理邮件 {filename} 失败: {str(e)}")
             return (po_number, {})
-    def parse_eml_files(self, key_field: str):
+    def parse_eml_files(self, key_field: str, backend: str = None):
         """
         解析邮件文件夹，返回结构：
         {
@@ -115,111 +120,240 @@ class EmlParser:
         "key_field_value": {邮件B映射字典},
         ...
         }
+        backend：执行后端（GlobalThreadPool.BACKEND_THREAD / BACKEND_PROCESS），默认沿用全局执行器当前的后端
+        进程池后端下每封邮件的BeautifulSoup解析在独立进程中执行（EmlParser可pickle，绑定方法可直接提交）
+        执行器不在此处关闭，由调用方在流程结束时调用GlobalThreadPool.shutdown()
         """
         global_po_mapping = {}
         files = [f for f in os.listdir(self.email_path) if f.lower().endswith('.eml')]
         Logger.info(f"📩 发现 {len(files)} 封待处理邮件")
-        with GlobalThreadPool.get_executor() as executor:
-            futures = [
-                executor.submit(self.process_single_eml, filename)
-                for filename in files
-            ]
-            
-            for future in concurrent.futures.as_completed(futures):
-                # TODO 目前默认邮件文件名中包含PO号，因此需要解析邮件文件名获取PO号——key_field_value
-                key_field_value, fields = future.result()
-                if key_field_value:
-                    global_po_mapping[key_field_value] = fields
-                    Logger.debug(f"✅ {key_field}：{key_field_value}，解析结果：{global_po_mapping[key_field_value]}")
-        
+        executor = GlobalThreadPool.use_backend(backend) if backend else GlobalThreadPool.get_executor()
+        futures = [
+            executor.submit(self.process_single_eml, filename)
+            for filename in files
+        ]
+
+        for future in concurrent.futures.as_completed(futures):
+            # TODO 目前默认邮件文件名中包含PO号，因此需要解析邮件文件名获取PO号——key_field_value
+            key_field_value, fields = future.result()
+            if key_field_value:
+                global_po_mapping[key_field_value] = fields
+                Logger.debug(f"✅ {key_field}：{key_field_value}，解析结果：{global_po_mapping[key_field_value]}")
+
         return global_po_mapping
     
+class BlockingImapSessionPool:
+    """
+    EmailClient 使用的已认证IMAP会话池（imaplib 连接），与 ImapSessionPool 行为一致，可在多个线程中共用：
+    - 会话按需通过 connect() 建立（SSL握手 + LOGIN + SELECT），用完归还后复用，最多 size 个会话
+    - 取出的会话由当前线程独占；多个线程（如 GlobalThreadPool 中的任务）的操作分散到不同会话上并行执行
+    - 健康检查只针对空闲超过 idle_check 秒的会话（取出时发送NOOP），不在每次操作前发送NOOP
+    - 已断开或检查失败的会话直接丢弃，由新会话补足
+    用法：
+        with pool.session() as mail:
+            status, data = mail.uid('SEARCH', None, 'ALL')
+    """
+    def __init__(self, connect, size=1, idle_check=60):
+        if size <= 0:
+            raise ValueError(f"❌ 连接池大小必须大于0: {size}")
+        self.connect = connect
+        self.size = size
+        self.idle_check = idle_check
+        # 空闲会话栈 [(会话, 归还时间)]，后进先出：优先复用刚用过的会话，长期空闲的会话留在栈底
+        self._idle: List[Tuple[imaplib.IMAP4, float]] = []
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.health_checks = 0
+        self.discarded = 0
+
+    def _healthy(self, mail) -> bool:
+        """空闲会话健康检查：NOOP返回OK"""
+        with self._lock:
+            self.health_checks += 1
+        try:
+            status, _ = mail.noop()
+            return status == 'OK'
+        except Exception as e:
+            Logger.debug(f"💓 空闲会话检查失败: {e}")
+            return False
+
+    def _pop_idle(self):
+        with self._lock:
+            return self._idle.pop() if self._idle else None
+
+    def acquire(self):
+        """取出一个可用会话（没有空闲会话且未达上限时新建，达到上限时等待其他会话归还）"""
+        self._slots.acquire()
+        try:
+            while (idle := self._pop_idle()) is not None:
+                mail, released_at = idle
+                if mail.state != 'SELECTED' or (
+                        time.monotonic() - released_at >= self.idle_check and not self._healthy(mail)):
+                    self._discard(mail)
+                    continue
+                with self._lock:
+                    self.reused += 1
+                return mail
+            mail = self.connect()
+            with self._lock:
+                self.created += 1
+            return mail
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, mail):
+        """归还会话（已断开的会话直接丢弃）"""
+        try:
+            if mail.state == 'SELECTED':
+                with self._lock:
+                    self._idle.append((mail, time.monotonic()))
+            else:
+                self._discard(mail)
+        finally:
+            self._slots.release()
+
+    def _discard(self, mail):
+        with self._lock:
+            self.discarded += 1
+        self._logout(mail)
+
+    @staticmethod
+    def _logout(mail):
+        try:
+            mail.logout()
+        except Exception as e:
+            Logger.debug(f"❌ 登出时发生错误: {str(e)}")
+
+    def add(self, mail):
+        """将调用方已建立的会话放入连接池（超出 size 的会话直接登出）"""
+        with self._lock:
+            self.created += 1
+            if len(self._idle) < self.size:
+                self._idle.append((mail, time.monotonic()))
+                return
+        self._discard(mail)
+
+    @contextmanager
+    def session(self):
+        """独占一个会话；操作抛出异常时会话状态未知，登出后丢弃（相当于原先的 _reset_connection）"""
+        mail = self.acquire()
+        try:
+            yield mail
+        except BaseException:
+            try:
+                self._discard(mail)
+            finally:
+                self._slots.release()
+            raise
+        self.release(mail)
+
+    def close(self):
+        """登出所有空闲会话"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for mail, _ in idle:
+            self._logout(mail)
+        Logger.debug(f"🔌 连接池关闭: {self.stats()}")
+
+    def stats(self) -> Dict:
+        """新建、复用、健康检查、丢弃的会话数，当前空闲会话数"""
+        with self._lock:
+            return {
+                "created": self.created,
+                "reused": self.reused,
+                "health_checks": self.health_checks,
+                "discarded": self.discarded,
+                "idle": len(self._idle),
+            }
+
+
 class EmailClient:
-    """用于对邮箱进行操作"""
+    """
+    用于对邮箱进行操作
+    每个操作从会话池（BlockingImapSessionPool，pool_size 个已认证会话）中独占一个会话执行，操作期间通过 self.mail 访问该会话；
+    可在多个线程中共用同一个客户端，各线程的操作分散到不同会话上并行执行
+    """
 
-    mail = None
-    def __init__(self, imap_server, imap_port, imap_username, imap_password, selected_box="INBOX", max_retries=5):
+    # 当前连接登录后服务器公布的能力（如 MOVE、UIDPLUS）
+    capabilities = frozenset()
+    # 批量操作每条命令包含的UID数（UID集合会压缩为范围，避免命令行过长）
+    BATCH_SIZE = 1000
+    def __init__(self, imap_server, imap_port, imap_username, imap_password, selected_box="INBOX", max_retries=5,
+                 pool_size=1, idle_check=60):
         self.imap_server = imap_server
         self.imap_port = imap_port
         self.imap_username = imap_username
         self.imap_password = imap_password
         self.selected_box = selected_box  # 默认邮箱
         self.max_retries = max_retries  # 最大重试次数
-    def noop(self, max_retries=3):
-        """发送NOOP心跳命令，保持连接活跃，不受装饰器修饰（因为装饰器中也使用了NOOP命令），重试时选择重置连接
-        
-        使用指数退避策略进行重试，包含随机抖动以避免同步重试
-        自动处理连接重置和重连
-        
-        Raises:
-            RuntimeError: 当超过最大重试次数仍失败时抛出
-        """
+        self.mailboxes = MailboxDirectory()  # 邮箱目录缓存，操作失败时失效
+        self.pool = BlockingImapSessionPool(self._open_session, size=pool_size, idle_check=idle_check)
+        # 当前线程在操作期间独占的会话
+        self._local = threading.local()
+    @property
+    def mail(self):
+        """当前线程正在执行的操作所使用的会话（不在操作中时为None）"""
+        return getattr(self._local, 'mail', None)
+    @mail.setter
+    def mail(self, mail):
+        self._local.mail = mail
+    def noop(self):
+        """在会话池中的一个会话上发送NOOP心跳命令（失败时换一个会话重试，超过最大重试次数时抛出RuntimeError）"""
         Logger.debug("💓 发送NOOP心跳保持连接")
-        for attempt in range(1, self.max_retries + 1):
-            try:
-                # 前置状态检查
-                if not self.mail or self.mail.state not in ['SELECTED', 'AUTH']:
-                    Logger.info("🔁 IMAP连接已断开，正在重新连接...")
-                    self.connect_imap(self.selected_box)
-                
-                # 执行NOOP命令
-                response = self.mail.noop()
-                if not response or response[0] != 'OK':
-                    raise RuntimeError(f"⚠️ NOOP响应异常: {response}")
-                
-                Logger.debug("✅ NOOP成功")
-                
-            except Exception as e:
-                Logger.error(f"❌ NOOP失败 (尝试 {attempt}/{self.max_retries}): {str(e)}")
-                if attempt < max_retries:
-                    delay = min(60, 2 ** attempt + random.uniform(0, 1))  # 指数退避+随机抖动
-                    Logger.info(f"等待 {delay:.2f} 秒后重试...")
-                    time.sleep(delay)
-                    
-                    self._reset_connection()
-                else:
-                    raise RuntimeError(
-                        f"{self.imap_username}@{self.imap_server}:{self.imap_port} "
-                        f"❌ NOOP失败，超过最大重试次数: {str(e)}"
-                    ) from e
-                
+        def _noop():
+            response = self.mail.noop()
+            if not response or response[0] != 'OK':
+                raise RuntimeError(f"⚠️ NOOP响应异常: {response}")
+            Logger.debug("✅ NOOP成功")
+        return self._retry_imap_operation(_noop)
 
     def _reset_connection(self):
-        """安全地登出IMAP连接，self.mail = None"""
+        """登出会话池中的所有空闲会话，邮箱目录缓存失效"""
         try:
-            if self.mail:
-                try:
-                    self.mail.logout()
-                except Exception as logout_error:
-                    Logger.error(f"❌ 登出时发生错误: {str(logout_error)}")
+            self.pool.close()
         except Exception as e:
             Logger.error(f"❌ 重置连接时发生错误: {str(e)}")
         finally:
-            self.mail = None
+            self.mailboxes.invalidate()
     def _retry_imap_operation(self, operation, *args, **kwargs):
-        """重置连接，重试IMAP操作的装饰器"""
+        """
+        从会话池取出一个会话执行IMAP操作（操作中通过 self.mail 访问），失败时丢弃该会话，退避后换一个会话重试
+        嵌套调用（外层操作已持有会话）直接在该会话上执行，失败由外层操作重试
+        """
+        if self.mail is not None:
+            return operation(*args, **kwargs)
         for attempt in range(1, self.max_retries + 1):
             try:
-                # 确保连接有效
-                if not self.mail or self.mail.state != 'SELECTED':
-                    Logger.info("🔁 IMAP连接已断开，正在重新连接...")
-                    self.connect_imap(self.selected_box)
-                    self.noop()
-                    
-                return operation(*args, **kwargs)
+                with self.pool.session() as mail:
+                    self.mail = mail
+                    try:
+                        return operation(*args, **kwargs)
+                    finally:
+                        self.mail = None
             except Exception as e:
                 Logger.error(f"⚠️ IMAP状态错误 (尝试 {attempt}/{self.max_retries}): {e}")
+                # 会话已丢弃，目录缓存可能与服务器不一致
+                self.mailboxes.invalidate()
                 if attempt < self.max_retries:
                     # 添加：指数退避策略
                     delay = min(60, 2 ** attempt)  # 指数退避，最大60秒
                     Logger.info(f"等待 {delay} 秒后重试...")
                     time.sleep(delay + random.uniform(0, 1))  # 添加随机抖动
-                    
-                    self._reset_connection()
                 else:
                     raise RuntimeError(f"{self.imap_username}:{self.imap_password}无法连接到服务器: {self.imap_server}:{self.imap_port}") from e
         return None
-    def connect_imap(self, selected_box, max_retries=3):
+    def connect_imap(self, selected_box=None, max_retries=3):
+        """
+        预先建立一个会话（登录并选择邮箱）放入会话池，如果失败则抛出异常
+        返回：IMAP对象
+        """
+        mail = self._open_session(selected_box, max_retries)
+        self.pool.add(mail)
+        return mail
+    def _open_session(self, selected_box=None, max_retries=3):
         """
         根据配置连接IMAP服务器（SSL）并登录，默认重试3次，如果失败则抛出异常
         返回：IMAP对象
@@ -231,9 +365,14 @@ class EmailClient:
             try:
                 mail = imaplib.IMAP4_SSL(self.imap_server, self.imap_port)
                 mail.login(self.imap_username, self.imap_password)
+                # 登录后重新获取服务器能力（MOVE、UIDPLUS通常登录后才公布）
+                typ, data = mail.capability()
+                if typ == 'OK' and data and data[-1]:
+                    self.capabilities = frozenset(data[-1].decode('ascii', errors='ignore').upper().split())
+                else:
+                    self.capabilities = frozenset(cap.upper() for cap in mail.capabilities)
                 # 选择收件箱，可改为其他文件夹如 'Spam'
                 mail.select(selected_box)
-                self.mail = mail
                 return mail
             except Exception as e:
                 Logger.debug(f"⚠️ 连接失败 (尝试 {attempt}/{max_retries}): {e}")
@@ -269,6 +408,33 @@ class EmailClient:
             status, msg_data = self.mail.uid('FETCH', email_uid, keyword)
             return status, msg_data
         return self._retry_imap_operation(_fetch)
+    def _async_client(self):
+        """同一账号、邮箱的异步客户端（独立连接）"""
+        return AsyncEmailClient(
+            self.imap_server, self.imap_port, self.imap_username, self.imap_password,
+            selected_box=self.selected_box, max_retries=self.max_retries,
+            pool_size=self.pool.size, idle_check=self.pool.idle_check
+        )
+    def fetch_emails_streaming(self, email_uids, on_message, keyword='BODY.PEEK[]', chunk_size=500):
+        """
+        批量获取邮件：UID按 chunk_size 分段 UID FETCH，每收到一封邮件立即回调 on_message(uid, payload)
+        替代逐封调用 fetch_email_by_uid；使用独立的异步连接，不能在运行中的事件循环内调用
+        返回：回调的邮件数
+        """
+        async def _fetch():
+            async with self._async_client() as client:
+                return await client.fetch_emails_streaming(email_uids, on_message, keyword, chunk_size)
+        return asyncio.run(_fetch())
+    def fetch_emails_to_dir(self, email_uids, dest_dir, keyword='BODY.PEEK[]', chunk_size=500):
+        """
+        批量获取邮件并逐封保存为 dest_dir/<uid>.eml，邮件内容边接收边写入磁盘，内存占用与附件大小无关
+        使用独立的异步连接，不能在运行中的事件循环内调用
+        返回：{uid: eml文件路径}
+        """
+        async def _fetch():
+            async with self._async_client() as client:
+                return await client.fetch_emails_to_dir(email_uids, dest_dir, keyword, chunk_size)
+        return asyncio.run(_fetch())
     def copy_email_by_uid(self, email_uid, utf7_folder):
         """
         将指定 UID 的邮件复制到目标文件夹（带重试机制）
@@ -284,76 +450,162 @@ class EmailClient:
             copy_result = self.mail.uid('COPY', email_uid, utf7_folder)
             return copy_result
         return self._retry_imap_operation(_copy)
+    def _uid_sets(self, email_uids) -> List[str]:
+        """UID列表按 BATCH_SIZE 分段压缩为UID集合字符串（如 "1:500,503"）"""
+        return AsyncEmailClient.uid_chunks(email_uids, self.BATCH_SIZE)
+    def _search_remaining(self, uid_sets) -> set:
+        """以 UID SEARCH UID <集合> 查询仍在当前邮箱中的UID（每段一条命令）"""
+        remaining = set()
+        for uid_set in uid_sets:
+            status, data = self.mail.uid('SEARCH', 'UID', uid_set)
+            if status != 'OK':
+                raise RuntimeError(f"❌ 验证搜索失败 {uid_set}: {data}")
+            remaining.update(uid.decode('ascii') for uid in (data[0] or b'').split())
+        return remaining
+    def _expunge_uids(self, uid_set):
+        """
+        清除已标记删除的邮件：支持UIDPLUS时 UID EXPUNGE 只清除指定UID
+        不支持UIDPLUS时只能 EXPUNGE，会清除当前邮箱中所有带 \\Deleted 标记的邮件（包括其他客户端标记、不在本批次中的邮件），
+        与原先逐封删除的行为一致
+        """
+        if 'UIDPLUS' in self.capabilities:
+            return self.mail.uid('EXPUNGE', uid_set)
+        return self.mail.expunge()
+    def _store_deleted(self, uid_set):
+        result = self.mail.uid('STORE', uid_set, '+FLAGS.SILENT', '(\\Deleted)')
+        Logger.debug(f'🛑 标记删除 {uid_set} 结果：{result[0]}')
+        if result[0] != 'OK':
+            raise RuntimeError(f"❌ 标记删除失败：{uid_set}，错误：{result[1]}")
     def delete_email_by_uids(self, email_uids: List[str]):
-        """删除邮件（带重试机制）并验证是否成功"""
+        """
+        批量删除邮件（带重试机制）并验证是否成功：
+        按UID集合标记删除（每段一条 UID STORE），UID EXPUNGE（不支持UIDPLUS时 EXPUNGE）提交，
+        最后以一次 UID SEARCH 确认这些UID已不在当前邮箱中
+        """
+        email_uids = list(email_uids)
+        uid_sets = self._uid_sets(email_uids)
         def _delete():
-            for email_uid in email_uids:
-                # 标记删除
-                delete_result = self.mail.uid('STORE', email_uid, '+FLAGS', '\\Deleted')
-                Logger.debug(f'🛑 删除邮件 {email_uid} 结果：{delete_result}')
-            # 提交删除操作
-            self.mail.expunge()
+            for uid_set in uid_sets:
+                self._store_deleted(uid_set)
+                self._expunge_uids(uid_set)
+            return self._search_remaining(uid_sets)
 
         try:
-            self._retry_imap_operation(_delete)
-            success_flags = []
-            for email_uid in email_uids:
-                # 检查邮件是否存在（可能需要延迟）
-                time.sleep(3)  # 等待服务器处理
-                status, data = self.fetch_email_by_uid(email_uid, '(RFC822)')
-                if status == 'OK' and data == [None]:
-                    Logger.info(f"✅ 邮件 {email_uid} 删除成功")
-                    success_flags.append(True)
-                else:
-                    Logger.info(f"❌ 邮件 {email_uid} 删除失败（可能已不存在）")
-                    success_flags.append(False)
-            return all(success_flags)
+            remaining = self._retry_imap_operation(_delete)
+            return AsyncEmailClient.report_removed(email_uids, remaining, "删除")
         except Exception as e:
             Logger.error(f"❌ 删除错误: {e}")
             return False
+    def copy_emails_by_uids(self, email_uids, utf7_folder):
+        """批量复制邮件到目标文件夹（UTF-7 编码格式），每段一条 UID COPY，失败时抛出RuntimeError"""
+        uid_sets = self._uid_sets(email_uids)
+        def _copy():
+            for uid_set in uid_sets:
+                copy_result = self.mail.uid('COPY', uid_set, utf7_folder)
+                if copy_result[0] != 'OK':
+                    raise RuntimeError(f"❌ 邮件复制失败：{uid_set} -> {utf7_folder}，错误：{copy_result[1]}")
+        return self._retry_imap_operation(_copy)
+    def move_emails_by_uids(self, email_uids, utf7_folder):
+        """
+        批量移动邮件到目标文件夹（UTF-7 编码格式）：
+        服务器支持MOVE时每段一条 UID MOVE，否则 UID COPY + 标记删除 + UID EXPUNGE（不支持UIDPLUS时 EXPUNGE，见 _expunge_uids），
+        最后以一次 UID SEARCH 确认这些UID已不在当前邮箱中
+        重连重试时先按段 UID SEARCH 出仍在源邮箱中的UID，只处理这些UID；已复制成功的段不再复制，只标记删除并清除，
+        避免目标文件夹中出现重复邮件（COPY已执行但响应丢失的段仍可能重复）
+        返回：是否全部移动成功
+        """
+        email_uids = list(email_uids)
+        uid_sets = self._uid_sets(email_uids)
+        copied = set()
+        attempts = []
+        def _move():
+            retrying = bool(attempts)
+            attempts.append(True)
+            for uid_set in uid_sets:
+                pending_set = uid_set
+                if retrying:
+                    remaining = self._search_remaining([uid_set])
+                    if not remaining:
+                        continue
+                    pending_set = self._uid_sets(remaining)[0]
+                if 'MOVE' in self.capabilities:
+                    result = self.mail.uid('MOVE', pending_set, utf7_folder)
+                else:
+                    result = ('OK', None)
+                    if uid_set not in copied:
+                        result = self.mail.uid('COPY', pending_set, utf7_folder)
+                    if result[0] == 'OK':
+                        copied.add(uid_set)
+                        self._store_deleted(pending_set)
+                        self._expunge_uids(pending_set)
+                if result[0] != 'OK':
+                    raise RuntimeError(f"❌ 邮件移动失败：{pending_set} -> {utf7_folder}，错误：{result[1]}")
+            return self._search_remaining(uid_sets)
+
+        try:
+            remaining = self._retry_imap_operation(_move)
+            return AsyncEmailClient.report_removed(email_uids, remaining, f"移动到 {utf7_folder}")
+        except Exception as e:
+            Logger.error(f"❌ 移动错误: {e}")
+            return False
 
-    def check_exist_mailbox(self, folder_name):
+    def list_mailboxes(self, refresh=False):
+        """
+        获取邮箱现有文件夹名称列表（已按修改版UTF-7解码）
+        使用邮箱目录缓存：首次调用或 refresh=True 时执行 LIST，之后直接读取缓存
         """
-        检查邮箱中是否存在指定的文件夹
+        if refresh or not self.mailboxes.loaded:
+            def _list():
+                status, folders = self.mail.list()
+                if status != "OK" or not folders or folders == [None]:
+                    raise RuntimeError(f"❌ 获取有效邮箱列表失败：{status}")
+                self.mailboxes.load(folders)
+            self._retry_imap_operation(_list)
+        return self.mailboxes.names()
+    def check_exist_mailbox(self, folder_name, refresh=False):
+        """
+        检查邮箱中是否存在指定的文件夹（名称不区分大小写）
         
         Args:
-            mail: 已认证的IMAP邮箱连接对象
-            folder_name: 要检查的文件夹名称（需符合IMAP命名规范）
+            folder_name: 要检查的文件夹名称（解码后的名称，如 "已处理/KA"）
+            refresh: 是否强制重新LIST
         
         Returns:
             bool: True表示文件夹存在，False表示文件夹不存在
+        
+        优先查询邮箱目录缓存；缓存中没有时重新LIST一次（文件夹可能由其他客户端创建）
         """
         if not folder_name or not isinstance(folder_name, str):
             raise RuntimeError("🚨 文件夹名称不能为空且必须是字符串")
-        def _check():
-            # 获取邮箱现有文件夹列表
-            status, folders = self.mail.list()
-            if status != "OK" or not folders or len(folders) <= 0:
-                raise RuntimeError(f"❌ 获取有效邮箱列表失败：{status}")
-            
-            exists = False
-            for folder_info in folders:
-                try:
-                    # 兼容不同IMAP服务器的响应格式（如：'(\\HasNoChildren) "/" "INBOX"'）
-                    decoded_info = folder_info.decode('utf-8', errors='ignore')
-                    parts = [p.strip() for p in decoded_info.split('"/"')]
-                    
-                    if len(parts) >= 2:
-                        # 提取标准化文件夹名（去除引号和空格）
-                        existing_name = parts[-1].strip('"\' ')
-                        if existing_name.casefold() == folder_name.casefold():
-                            exists = True
-                            break
-                except Exception as e:
-                    raise RuntimeError (f"❌ 解析文件夹信息异常：{e}")
-            return exists
-        return self._retry_imap_operation(_check)
+        cached = self.mailboxes.loaded and not refresh
+        self.list_mailboxes(refresh)
+        if folder_name in self.mailboxes:
+            return True
+        if cached:
+            self.list_mailboxes(refresh=True)
+            return folder_name in self.mailboxes
+        return False
+    def _mailbox_arg(self, folder_name):
+        """命令中使用的文件夹名：修改版UTF-7编码（已缓存时使用服务器返回的原始名称），按需加引号"""
+        return MailboxDirectory.quote(self.mailboxes.server_name(folder_name))
+    def _change_mailbox(self, action, command, *folder_names):
+        """执行 CREATE/DELETE/RENAME，无论成功与否都使邮箱目录缓存失效，失败时抛出RuntimeError"""
+        if not all(folder_names) or not all(isinstance(name, str) for name in folder_names):
+            raise RuntimeError("🚨 文件夹名称不能为空且必须是字符串")
+        def _change():
+            try:
+                typ, response = command(*(self._mailbox_arg(name) for name in folder_names))
+            finally:
+                self.mailboxes.invalidate()
+            if typ != 'OK':
+                raise RuntimeError(f"❌ 文件夹{action}失败（{typ}）：{response}")
+            Logger.info(f"📁 文件夹{action}成功：{' -> '.join(folder_names)}")
+        return self._retry_imap_operation(_change)
     def create_mailbox(self, folder_name):
         """
-        在邮箱中创建文件夹（邮箱目录）
+        在邮箱中创建文件夹（邮箱目录），名称按修改版UTF-7编码
         输入:
-        mail: 已认证的IMAP邮箱连接对象
-        folder_name: 要创建的文件夹名称（需符合IMAP命名规范）
+        folder_name: 要创建的文件夹名称
 
         输出:
         None
@@ -361,25 +613,17 @@ class EmailClient:
         可能抛出的异常：
         RuntimeError: 如果文件夹创建失败
         """
-        if not folder_name or not isinstance(folder_name, str):
-            raise RuntimeError("🚨 文件夹名称不能为空且必须是字符串")
-        def _create():
-            # 创建新文件夹
-            typ, response = self.mail.create(folder_name)
-            if typ == 'OK':
-                Logger.info(f"📁 文件夹创建成功：'{folder_name}'")
-                # 1. 短暂延迟让服务器同步
-                time.sleep(1)  # 300ms延迟，根据网络状况调整
-                # 2. 发送NOOP命令刷新连接状态
-                self.mail.noop()
-                # 3. 验证文件夹是否真实存在
-                if self.check_exist_mailbox(folder_name):
-                    Logger.debug(f"✅ 验证成功：'{folder_name}' 已存在")
-                else:
-                    raise RuntimeError(f"❌ 文件夹创建失败（{typ}）：{response}")
-            else:
-                raise RuntimeError(f"❌ 文件夹创建失败（{typ}）：{response}")
-        return self._retry_imap_operation(_create)
+        self._change_mailbox("创建", lambda name: self.mail.create(name), folder_name)
+        # 目录缓存已失效，验证时重新LIST一次
+        if not self.check_exist_mailbox(folder_name):
+            raise RuntimeError(f"❌ 文件夹创建失败：'{folder_name}' 不存在")
+        Logger.debug(f"✅ 验证成功：'{folder_name}' 已存在")
+    def delete_mailbox(self, folder_name):
+        """删除文件夹（邮箱目录），失败时抛出RuntimeError"""
+        self._change_mailbox("删除", lambda name: self.mail.delete(name), folder_name)
+    def rename_mailbox(self, old_name, new_name):
+        """重命名文件夹（邮箱目录），失败时抛出RuntimeError"""
+        self._change_mailbox("重命名", lambda old, new: self.mail.rename(old, new), old_name, new_name)
                 
     def copy_eml_to_folder(self, email_uid, folder_name):
         """
@@ -390,9 +634,8 @@ class EmailClient:
             if not self.check_exist_mailbox(folder_name):
                 raise RuntimeError(f"❌ 文件夹不存在：{folder_name}")
             
-            # 2. 将字符串形式的文件夹名（如 "收件箱"）编码为 UTF-7 格式，这是 IMAP 协议要求的格式。然后将字节类型的 UTF-7 字符串解码为 Python 的字符串类型，以便后续用于 IMAP 命令中
-            s_utf7 = folder_name.encode('utf-7').replace(b'+', b'&').replace(b',', b'-')
-            utf7_folder = s_utf7.decode('ascii')
+            # 2. 将字符串形式的文件夹名（如 "收件箱"）编码为修改版 UTF-7 格式（如 "&ZTZO9nux-"），这是 IMAP 协议要求的格式
+            utf7_folder = self._mailbox_arg(folder_name)
 
             # 3. 执行复制操作
             copy_result = self.copy_email_by_uid(email_uid, utf7_folder)
@@ -402,4 +645,18 @@ class EmailClient:
                 Logger.info(f"✉️ 原邮件复制到：{utf7_folder}")
                 
         return self._retry_imap_operation(_copy)
-        #copy_result = mail.uid('COPY', email_uid, utf7_folder)
\ No newline at end of file
+        #copy_result = mail.uid('COPY', email_uid, utf7_folder)
+    def archive_emls_to_folder(self, email_uids, folder_name, move=True):
+        """
+        批量归档：只判断一次文件夹是否存在，然后将一组邮件移动（move=False时复制）到指定文件夹
+        返回：是否全部成功
+        """
+        email_uids = list(email_uids)
+        if not self.check_exist_mailbox(folder_name):
+            raise RuntimeError(f"❌ 文件夹不存在：{folder_name}")
+        utf7_folder = self._mailbox_arg(folder_name)
+        if move:
+            return self.move_emails_by_uids(email_uids, utf7_folder)
+        self.copy_emails_by_uids(email_uids, utf7_folder)
+        Logger.info(f"✉️ {len(email_uids)} 封邮件复制到：{utf7_folder}")
+        return True
\ No newline at end of file
@@ -2,12 +2,20 @@ from sinotrans.utils.progress_manager import ExcelProgressTracker
 from sinotrans.utils.global_thread_pool import GlobalThreadPool
 from sinotrans.utils.logger import Logger
 from sinotrans.core.rule import Rule
+from sinotrans.core.rule_memo import RuleMemo
+from sinotrans.core.sheet_snapshot import SheetSnapshot
+from sinotrans.core.sheet_frame import SheetFrame
+from sinotrans.core.parse_cache import ParseCache
+from sinotrans.core.sheet_sidecar import SheetSidecar
+from sinotrans.core.sheet_bounds import SheetBounds
+from sinotrans.core.sheet_schema import SheetSchema
 from typing import Dict, List, Tuple
 from openpyxl import load_workbook
 from deprecated import deprecated
 from zipfile import BadZipFile
 from pathlib import Path
 import concurrent.futures
+import itertools
 import pandas as pd
 import warnings
 import traceback
@@ -52,18 +60,22 @@ class ExcelProcessor:
             Logger.error(f"❌ fixed_mapping映射失败: {str(e)}")
             raise
     @staticmethod
-    def column_mapping(row, column_mapping):
+    def column_mapping(row, column_mapping, schema=None):
         """
         根据原行数据，结合字段映射文件，生成新行数据
         对当前输入进行map映射，映射到dest_name，返回字典{dest_name:value,......}
+        row: 行数据字典；传入schema时为与表头等宽的值元组，按列序号取值
         """
         mapped_row = {}
         try:
             for src_col, rules in column_mapping.items():
-                raw_value = row.get(src_col, None)
+                if schema is None:
+                    raw_value = row.get(src_col, None)
+                else:
+                    raw_value = schema.value(row, src_col)
                 for rule in rules:
                     if raw_value:
-                        mapped_row[rule.field_name] = rule.map_action(raw_value)
+                        mapped_row[rule.field_name] = RuleMemo.map(rule, raw_value)
                     if rule.considerEmpty:
                         mapped_row[rule.field_name] = raw_value
             return mapped_row
@@ -83,7 +95,7 @@ class ExcelProcessor:
                 for rules in email_mapping.values():
                     for rule in rules:
                         raw_value = global_po_mapping[key].get(rule.field_name)
-                        mapped_row[rule.field_name] = rule.map_action(raw_value)
+                        mapped_row[rule.field_name] = RuleMemo.map(rule, raw_value)
             return mapped_row
         except Exception as e:
             Logger.error(f"❌ email_mapping映射失败: {str(e)}")
@@ -100,7 +112,7 @@ class ExcelProcessor:
                 for rules in map.get(key):
                     for rule in rules:
                         raw_value = content.get(key)
-                        mapped_row[key] = rule.map_action(raw_value)
+                        mapped_row[key] = RuleMemo.map(rule, raw_value)
             return mapped_row
         except Exception as e:
             Logger.error(f"❌ mapping映射失败: {str(e)}")
@@ -109,55 +121,46 @@ class ExcelProcessor:
     @staticmethod
     def excel_row_generator_skipping(rs_input, file_name, progress=None, 
                         required_columns=None, desc=None, strict_flag=True):
-        """优化后的行数据生成器（支持连续空行1000行提前终止）"""
+        """优化后的行数据生成器（按真实数据边界遍历，并支持连续空行1000行提前终止）"""
         Logger.debug(f"📋 开始解析文件 {file_name}（共{rs_input.max_row}行）")
         headers = [cell.value for cell in rs_input[1]]
-        
-        # 预生成必填列检查器
-        required_check = None
-        if required_columns:
-            required_check = {
-                col: headers.index(col) 
-                for col in required_columns 
-                if col in headers
-            }
-
-        # 初始化连续空行计数器
-        MAX_CONSECUTIVE_EMPTY = 1000  # 最大允许连续空行数
-        empty_counter = 0
-        
-        for row_idx, row in enumerate(rs_input.iter_rows(min_row=2), start=2):
-            # 空行检测
-            row_data = {
-                headers[idx]: cell.value.strip() if isinstance(cell.value, str) else cell.value
-                for idx, cell in enumerate(row)
-            }
-            
-            if all(v in (None, "") for v in row_data.values()):
-                empty_counter += 1
-                if empty_counter >= MAX_CONSECUTIVE_EMPTY:
-                    Logger.debug(f"⏹ 检测到连续{empty_counter}行空行，提前终止读取（从第{row_idx}行起）")
-                    break  # 直接终止循环
-                continue
-            else:
-                empty_counter = 0  # 遇到非空行时重置计数器
-
-            # 必填列校验逻辑（原有逻辑保持不变）
-            if required_check:
-                missing_cols = [
-                    col for col, idx in required_check.items() 
-                    if row_data.get(col) in (None, "")
-                ]
-                if strict_flag and missing_cols:
+        yield from ExcelProcessor.value_row_generator_skipping(
+            headers, ExcelProcessor.iter_sheet_values(rs_input, min_row=2), required_columns, strict_flag
+        )
+    @staticmethod
+    def iter_sheet_values(ws, min_row=1):
+        """
+        按真实数据边界（最后有值的行、列）遍历工作表行值元组，不会遍历dimension虚高产生的末尾空行
+        """
+        max_row, max_col = SheetBounds.of(ws)
+        if max_row < min_row or max_col < 1:
+            return iter(())
+        return ws.iter_rows(min_row=min_row, max_row=max_row, max_col=max_col, values_only=True)
+    @staticmethod
+    def value_row_generator_skipping(headers, value_rows, required_columns=None, strict_flag=True):
+        """
+        基于行值元组（values_only，不含表头）的行数据生成器，语义与 excel_row_generator_skipping 一致
+        数据来源可以是工作表，也可以是旁路文件
+        """
+        schema = SheetSchema(headers)
+        for values in ExcelProcessor.schema_row_generator(schema, value_rows, required_columns, strict_flag):
+            yield schema.to_dict(values)
+    @staticmethod
+    def schema_row_generator(schema, value_rows, required_columns=None, strict_flag=True):
+        """
+        基于编译后工作表结构的行值元组生成器：必填列按列序号校验，不为每一行构建字典
+        生成与表头等宽、字符串已去空格的值元组
+        """
+        required_indices = schema.required_indices(required_columns)
+        for row_idx, values in schema.iter_values(value_rows):
+            if required_indices and not SheetSchema.keeps(values, required_indices, strict_flag):
+                if strict_flag:
+                    missing_cols = [schema.headers[idx] for idx in required_indices if values[idx] in (None, "")]
                     Logger.debug(f"严格模式跳过（第{row_idx}行），缺失字段：{', '.join(missing_cols)}")
-                    continue
-                elif not strict_flag and len(missing_cols) == len(required_check):
+                else:
                     Logger.debug(f"宽松模式跳过（第{row_idx}行），全部必填字段缺失")
-                    continue
-
-            yield row_data
-
-        Logger.debug(f"✅ 文件解析完成，实际处理到第{row_idx}行")
+                continue
+            yield values
     @staticmethod
     def excel_row_generator(rs_input, file_name, progress=None, required_columns=None, desc=None, strict_flag=True):
         """
@@ -172,6 +175,7 @@ class ExcelProcessor:
         """
         Logger.debug(f"📋 开始解析文件{file_name}")
         headers = [cell.value for cell in rs_input[1]]
+        max_row, max_col = SheetBounds.of(rs_input)
         
         # 预处理必填列索引
         required_indices = []
@@ -182,8 +186,10 @@ class ExcelProcessor:
                 if col in headers
             ]
         if progress:
-            progress.init_main_progress(desc=desc, total=rs_input.max_row - 1)
-        for row_idx, row in enumerate(rs_input.iter_rows(min_row=2), start=2):
+            progress.init_main_progress(desc=desc, total=max(max_row - 1, 0))
+        # 只遍历到真实的最后一行数据
+        rows = rs_input.iter_rows(min_row=2, max_row=max_row, max_col=max_col) if max_row >= 2 and max_col else ()
+        for row_idx, row in enumerate(rows, start=2):
             if progress:
                 progress.update()  # 保持进度更新
             
@@ -350,12 +356,13 @@ class ExcelProcessor:
         """
         global_po_mapping = {}
         Logger.info(f"📩 发现 {len(files)} 封{file_type}待处理文件")
-        with GlobalThreadPool.get_executor() as executor:
-            futures = [
-                executor.submit(self.process_single_excel, filename, map)
-                for filename in files
-            ]
-            
+        # 复用全局执行器，不在此处关闭
+        executor = GlobalThreadPool.get_executor()
+        futures = [
+            executor.submit(self.process_single_excel, filename, map)
+            for filename in files
+        ]
+
         for future in concurrent.futures.as_completed(futures):
             key_field_v, fields = future.result()
             if key_field_v:
@@ -627,6 +634,104 @@ class ExcelProcessor:
 
         return sheet_maps
     @staticmethod
+    def load_sheet_snapshots(file_path, sheet_names=None, key_fields=None, columnar=False, cache_dir=None, sidecar_dir=None):
+        """
+        一次性解析Excel文件中的相关工作表，生成内存快照，解析完成后立即关闭文件句柄
+
+        :param file_path: Excel文件路径
+        :param sheet_names: 需要解析的工作表名称列表（为空则解析全部工作表）
+        :param key_fields: 关键字段列表，用于建立快照的关键字段索引
+        :param columnar: 是否使用列式引擎（SheetFrame），否则为逐行值元组快照（SheetSnapshot）
+        :param cache_dir: 解析缓存目录，为空则不使用缓存；文件内容未变化时直接加载缓存，否则只解析发生变化的工作表
+        :param sidecar_dir: 列式旁路文件根目录，为空则不使用旁路文件（需要pyarrow）：旁路文件有效时直接读取，否则解析Excel后生成旁路文件
+        :return: (文件绝对路径, {工作表名称: SheetSnapshot/SheetFrame})，加载失败时快照字典为None
+        """
+        abs_path = str(Path(file_path).absolute())
+        if not cache_dir:
+            return abs_path, ExcelProcessor._parse_sheet_snapshots(abs_path, sheet_names, key_fields, columnar, sidecar_dir)
+
+        cache = ParseCache(cache_dir, sheet_names, key_fields, columnar)
+        content_hash = ParseCache.file_digest(abs_path)
+        snapshots = cache.load_file(content_hash)
+        if snapshots is not None:
+            Logger.debug(f"♻️ {Path(abs_path).name} 未变化，已从缓存加载 {len(snapshots)} 个工作表快照")
+            return abs_path, snapshots
+
+        fingerprints = cache.sheet_fingerprints(abs_path)
+        if fingerprints is None:
+            return abs_path, ExcelProcessor._parse_sheet_snapshots(abs_path, sheet_names, key_fields, columnar, sidecar_dir)
+        wanted = [name for name in fingerprints if not sheet_names or name in sheet_names]
+        cached = {name: cache.load_sheet(fingerprints[name]) for name in wanted}
+        changed = [name for name in wanted if cached[name] is None]
+        if changed:
+            parsed = ExcelProcessor._parse_sheet_snapshots(abs_path, changed, key_fields, columnar, sidecar_dir)
+            if parsed is None:
+                return abs_path, None
+            cached.update(parsed)
+        snapshots = {name: cached[name] for name in wanted if cached.get(name) is not None}
+        cache.store(content_hash, fingerprints, snapshots, [name for name in changed if name in snapshots])
+        Logger.debug(f"♻️ {Path(abs_path).name} 缓存命中 {len(wanted) - len(changed)} 个工作表，重新解析 {len(changed)} 个工作表")
+        return abs_path, snapshots
+
+    @staticmethod
+    def _build_snapshot(sheet_name, headers, value_rows, key_fields=None, columnar=False):
+        """由表头和数据行值元组生成工作表快照"""
+        if columnar:
+            return SheetFrame.from_values(sheet_name, itertools.chain([headers], value_rows), key_fields)
+        schema = SheetSchema(headers, key_fields)
+        rows = list(ExcelProcessor.schema_row_generator(schema, value_rows))
+        return SheetSnapshot(sheet_name, schema, rows)
+
+    @staticmethod
+    def _parse_sheet_snapshots(abs_path, sheet_names=None, key_fields=None, columnar=False, sidecar_dir=None):
+        """解析工作表生成快照（优先读取有效的旁路文件），加载失败时返回None"""
+        manifest = SheetSidecar.read_manifest(abs_path, sidecar_dir) if sidecar_dir else None
+        if manifest is not None:
+            wanted = [name for name in manifest["sheetnames"] if not sheet_names or name in sheet_names]
+            loaded = {name: SheetSidecar.load_values(abs_path, name, manifest, sidecar_dir) for name in wanted}
+            if all(values is not None for values in loaded.values()):
+                snapshots = {
+                    name: ExcelProcessor._build_snapshot(name, headers, rows, key_fields, columnar)
+                    for name, (headers, rows) in loaded.items()
+                }
+                Logger.debug(f"🗂️ {Path(abs_path).name} 已从旁路文件生成 {len(snapshots)} 个工作表快照")
+                return snapshots
+
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")  # 忽略openpyxl的警告
+                wb = load_workbook(
+                    filename=abs_path,
+                    read_only=True,
+                    data_only=True,
+                    keep_links=False  # 提高加载速度
+                )
+        except BadZipFile as e:
+            Logger.error(f"❌ 文件损坏无法打开: {Path(abs_path).name} ({str(e)})")
+            return None
+        except Exception as e:
+            Logger.error(f"❌ 加载失败: {Path(abs_path).name}\n{traceback.format_exc()}")
+            return None
+
+        try:
+            snapshots = {}
+            sidecar_sheets = {}
+            for sheet_name in wb.sheetnames:
+                if sheet_names and sheet_name not in sheet_names:
+                    continue
+                value_rows = ExcelProcessor.iter_sheet_values(wb[sheet_name])
+                headers = next(value_rows, ())
+                if sidecar_dir:
+                    value_rows = list(value_rows)
+                    sidecar_sheets[sheet_name] = (headers, value_rows)
+                snapshots[sheet_name] = ExcelProcessor._build_snapshot(sheet_name, headers, value_rows, key_fields, columnar)
+            Logger.debug(f"📸 {Path(abs_path).name} 已生成 {len(snapshots)} 个工作表快照")
+        finally:
+            wb.close()
+        if sidecar_sheets:
+            SheetSidecar.write(abs_path, sidecar_sheets, wb.sheetnames, root=sidecar_dir)
+        return snapshots
+    @staticmethod
     def load_excel_to_K_V(input_file, key_fields, progress = None):
         """
         将snt当前excel文件中active_sheet中关键字段keys——用于联系数据，的行写入内存{key_tuple,row}
@@ -2,6 +2,7 @@ from openpyxl.utils.exceptions import InvalidFileException
 from openpyxl import load_workbook, Workbook
 from sinotrans.utils.logger import Logger
 from sinotrans.core.rule import Rule
+from sinotrans.core.sheet_style import SheetStyler
 from deprecated import deprecated
 from typing import get_type_hints
 from pathlib import Path
@@ -115,37 +116,8 @@ class FileProcessor:
                 raise RuntimeError(f"❌ 处理失败: {str(e)}")
     @staticmethod
     def apply_default_style(output_ws):
-        """初始化Excel样式"""
-        wb = output_ws.parent  # 获取工作簿对象
-        
-        # 修复：直接使用 wb.style_names 获取样式名称列表
-        if "header_style" not in wb.style_names:
-            # 样式不存在则创建
-            header_style = openpyxl.styles.NamedStyle(name="header_style")
-            header_style.font = openpyxl.styles.Font(name="Calibri", bold=True, color="FFFFFF")
-            header_style.fill = openpyxl.styles.PatternFill(fill_type="solid", fgColor="4F81BD")
-            wb.add_named_style(header_style)  # 添加到工作簿
-        
-        # 应用冻结窗格和表头样式
-        output_ws.freeze_panes = "A2"
-        for cell in output_ws[1]:
-            cell.style = "header_style"  # 使用样式名称而不是对象
-        
-        # 设置固定列宽（优化版）
-        # 使用更高效的方式设置所有列的宽度
-        for col_letter in output_ws.column_dimensions:
-            output_ws.column_dimensions[col_letter].width = 40
-        
-        # 隔行填充背景色（优化版）
-        even_fill = openpyxl.styles.PatternFill(fill_type='solid', start_color='C8D7E9', end_color='C8D7E9')
-        base_font = openpyxl.styles.Font(name='Calibri', size=11)
-        
-        # 只遍历有数据的行
-        for row in output_ws.iter_rows(min_row=2):
-            for cell in row:
-                cell.font = base_font
-                if cell.row % 2 == 0:
-                    cell.fill = even_fill
+        """初始化Excel样式：数据字体、表头样式、冻结窗格、列宽（40），隔行填充使用条件格式"""
+        SheetStyler.apply(output_ws, column_width=40)
     @staticmethod
     def save_file_retryable(file, data=None, is_format_applied=False, save_mode='auto', is_append=False, sheet_name=None, max_retries=5, retry_interval=5, output_wb=None):
         """
@@ -0,0 +1,60 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import sys
+
+
+class KeyIndex:
+    """
+    关键字段索引：复合关键字段（folder,po,lot）→ 紧凑的整数行号
+    - normalize(): 读取阶段按类型统一关键字段的值，lot 为 1 / 1.0 / "1" 时都得到 "1"，避免类型不一致导致匹配失败
+    - 规范化后的字符串经 sys.intern 驻留，同一个关键字段值在所有快照中只保留一份
+    - 基准数据登记后，合并阶段只按行号访问基准行，不再以元组为键保存整行数据
+    """
+    def __init__(self):
+        self._ids: Dict[Tuple[str, ...], int] = {}
+        # 按行号排列的关键字段元组
+        self.keys: List[Tuple[str, ...]] = []
+
+    @staticmethod
+    def normalize(value) -> str:
+        """
+        关键字段值的规范化字符串：
+        - 整数值的浮点数按整数输出（1.0 -> "1"），其余数值、日期等按 str() 输出
+        - 文本保持原样（读取阶段已去空格），不做数值转换，保留 "0012" 这类编号的前导零
+        """
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        text = value if type(value) is str else str(value)
+        return sys.intern(text) if type(text) is str else text
+
+    @staticmethod
+    def key_of(values: Iterable) -> Tuple[str, ...]:
+        """由关键字段原值生成规范化的关键字段元组"""
+        return tuple(KeyIndex.normalize(value) for value in values)
+
+    def add(self, key: Tuple[str, ...]) -> Tuple[int, bool]:
+        """登记关键字段元组，返回 (行号, 是否为新关键字段)；重复登记返回已有行号"""
+        row_id = self._ids.get(key)
+        if row_id is not None:
+            return row_id, False
+        row_id = len(self.keys)
+        self._ids[key] = row_id
+        self.keys.append(key)
+        return row_id, True
+
+    def get(self, key: Tuple[str, ...]) -> Optional[int]:
+        """关键字段元组对应的行号，未登记时返回None"""
+        return self._ids.get(key)
+
+    def __getstate__(self):
+        # pickle（传给进程池任务）时只传递按行号排列的关键字段元组，反序列化后重建查找字典
+        return self.keys
+
+    def __setstate__(self, keys):
+        self.keys = keys
+        self._ids = {key: row_id for row_id, key in enumerate(keys)}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key) -> bool:
+        return key in self._ids
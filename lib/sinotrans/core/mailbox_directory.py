@@ -0,0 +1,127 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import base64
+import re
+
+
+class MailboxDirectory:
+    """
+    邮箱目录缓存（每个IMAP客户端一份）：LIST 结果只获取一次，按解码后的名称（不区分大小写）查询
+    - 执行 CREATE/DELETE/RENAME 后调用 invalidate()，下次查询时重新 LIST；也可随时 invalidate() 强制刷新
+    - 邮箱名按 RFC 3501 5.1.3 的修改版UTF-7编码/解码（"收件箱" <-> "&ZTZO9nux-"），
+      缓存中同时保存服务器返回的原始名称，命令中直接使用，大小写与服务器一致
+    """
+    LIST_RE = re.compile(r'^\((?P<flags>[^)]*)\) (?P<delimiter>"(?:\\.|[^"\\])*"|NIL) ?(?P<name>.*)$', re.S)
+
+    def __init__(self):
+        # {解码名称.casefold(): (解码名称, 服务器原始名称, 属性元组)}，None表示未加载
+        self._entries: Optional[Dict[str, Tuple[str, str, Tuple[str, ...]]]] = None
+
+    @staticmethod
+    def encode(name: str) -> str:
+        """修改版UTF-7编码：可打印ASCII原样保留（& 写作 &-），其余字符按UTF-16BE做base64（/ 换为 ,、无填充）并以 &...- 包裹"""
+        encoded = []
+        pending = []
+
+        def flush():
+            if pending:
+                raw = ''.join(pending).encode('utf-16-be')
+                encoded.append('&' + base64.b64encode(raw).decode('ascii').rstrip('=').replace('/', ',') + '-')
+                pending.clear()
+
+        for char in name:
+            if 0x20 <= ord(char) <= 0x7e:
+                flush()
+                encoded.append('&-' if char == '&' else char)
+            else:
+                pending.append(char)
+        flush()
+        return ''.join(encoded)
+
+    @staticmethod
+    def decode(name) -> str:
+        """修改版UTF-7解码（接受字符串或字节串），格式错误的片段原样保留"""
+        if isinstance(name, bytes):
+            name = name.decode('ascii', errors='replace')
+        decoded = []
+        pos = 0
+        while pos < len(name):
+            start = name.find('&', pos)
+            if start < 0:
+                decoded.append(name[pos:])
+                break
+            decoded.append(name[pos:start])
+            end = name.find('-', start)
+            if end < 0:
+                decoded.append(name[start:])
+                break
+            if end == start + 1:
+                decoded.append('&')
+            else:
+                chunk = name[start + 1:end].replace(',', '/')
+                try:
+                    decoded.append(base64.b64decode(chunk + '=' * (-len(chunk) % 4), validate=True).decode('utf-16-be'))
+                except ValueError:
+                    decoded.append(name[start:end + 1])
+            pos = end + 1
+        return ''.join(decoded)
+
+    @staticmethod
+    def quote(name: str) -> str:
+        """命令参数中的邮箱名：包含空格、引号等特殊字符时加引号（imaplib 不会自动加引号）"""
+        if name and re.match(r'^[^\s"\\(){}%*\x00-\x1f\x7f]+$', name):
+            return name
+        return '"' + name.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+    @classmethod
+    def parse_list_response(cls, folders: Iterable) -> List[Tuple[str, Tuple[str, ...]]]:
+        """
+        解析 LIST 的未标记响应（imaplib / AsyncImapConnection 格式），返回 [(服务器原始名称, 属性元组), ...]
+        兼容名称为带引号字符串、原子、字面量（(前缀, 名称字节) 元组）的各种服务器响应格式
+        """
+        entries = []
+        for folder_info in folders:
+            if folder_info is None:
+                continue
+            literal = None
+            if isinstance(folder_info, tuple):
+                folder_info, literal = folder_info
+            match = cls.LIST_RE.match(folder_info.decode('utf-8', errors='ignore'))
+            if not match:
+                continue
+            flags = tuple(match.group('flags').split())
+            if literal is not None:
+                name = literal.decode('utf-8', errors='ignore')
+            else:
+                name = match.group('name').strip()
+                if len(name) >= 2 and name.startswith('"') and name.endswith('"'):
+                    name = re.sub(r'\\(.)', r'\1', name[1:-1])
+            entries.append((name, flags))
+        return entries
+
+    @property
+    def loaded(self) -> bool:
+        return self._entries is not None
+
+    def load(self, folders: Iterable):
+        """用 LIST 响应填充缓存"""
+        entries = {}
+        for raw_name, flags in self.parse_list_response(folders):
+            name = self.decode(raw_name)
+            entries[name.casefold()] = (name, raw_name, flags)
+        self._entries = entries
+
+    def invalidate(self):
+        """清空缓存（CREATE/DELETE/RENAME 后、或需要获取其他客户端的变更时调用）"""
+        self._entries = None
+
+    def names(self) -> List[str]:
+        """解码后的邮箱名称列表"""
+        return [name for name, _, _ in (self._entries or {}).values()]
+
+    def __contains__(self, name: str) -> bool:
+        return self._entries is not None and name.casefold() in self._entries
+
+    def server_name(self, name: str) -> str:
+        """命令中使用的邮箱名：已缓存时为服务器原始名称，否则为修改版UTF-7编码"""
+        entry = (self._entries or {}).get(name.casefold())
+        return entry[1] if entry else self.encode(name)
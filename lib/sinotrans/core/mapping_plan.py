@@ -0,0 +1,112 @@
+from sinotrans.core.rule_memo import RuleMemo
+from sinotrans.core.sheet_schema import SheetSchema
+from sinotrans.utils.logger import Logger
+from typing import Dict, List, Optional, Tuple
+
+
+class MappingPlan:
+    """
+    字段映射执行计划：将映射配置（pending_po/response/report_mapping）按具体的工作表结构和模板表头编译为扁平的步骤列表
+    每一步为 (源列序号, 规则, 输出列序号元组, 是否considerEmpty)，逐行执行时直接写入按模板列顺序排列的输出行，
+    不再逐行遍历映射字典、也不再按表头逐列 dict.get 排序
+    - 目标字段不在模板表头中的规则直接丢弃
+    - 源列不存在时原值视为None：只保留 considerEmpty=True 的规则（写入None）
+    - 执行顺序与 ExcelProcessor.column_mapping 一致：按源列、规则顺序依次执行，后面的覆盖前面的
+    """
+    def __init__(self, steps: List[Tuple[Optional[int], object, Tuple[int, ...], bool]], width: int):
+        self.steps = steps
+        self.width = width
+
+    @staticmethod
+    def output_index(headers) -> Dict[object, Tuple[int, ...]]:
+        """{模板表头: 输出列序号元组}，重复表头的所有列都会写入"""
+        index = {}
+        for idx, header in enumerate(headers):
+            index.setdefault(header, ())
+            index[header] += (idx,)
+        return index
+
+    @staticmethod
+    def restrict(column_mapping: Dict, headers) -> Dict:
+        """只保留目标字段在模板表头中的规则（没有剩余规则的源列一并去掉）"""
+        header_set = set(headers)
+        restricted = {}
+        for src_col, rules in column_mapping.items():
+            kept = [rule for rule in rules if rule.field_name in header_set]
+            if kept:
+                restricted[src_col] = kept
+        return restricted
+
+    @classmethod
+    def compile(cls, column_mapping: Dict, schema: SheetSchema, headers) -> "MappingPlan":
+        """按工作表结构和模板表头编译映射配置"""
+        outputs = cls.output_index(headers)
+        steps = []
+        dropped = 0
+        for src_col, rules in column_mapping.items():
+            src_idx = schema.index.get(src_col)
+            for rule in rules:
+                dest = outputs.get(rule.field_name)
+                if dest is None:
+                    dropped += 1
+                    continue
+                if src_idx is None and not rule.considerEmpty:
+                    continue
+                steps.append((src_idx, rule, dest, bool(rule.considerEmpty)))
+        if dropped:
+            Logger.debug(f"🧹 映射计划丢弃 {dropped} 条目标字段不在模板中的规则")
+        return cls(steps, len(headers))
+
+    @staticmethod
+    def template_row(headers, fixed_mapping: Dict) -> list:
+        """按模板列顺序生成初始行：默认为空字符串，叠加固定映射（目标字段不在模板中的忽略）"""
+        outputs = MappingPlan.output_index(headers)
+        row = [''] * len(headers)
+        for dest_col, rule in fixed_mapping.items():
+            for idx in outputs.get(dest_col, ()):
+                row[idx] = rule.field_name
+        return row
+
+    def apply(self, values: Tuple, out: list) -> list:
+        """
+        对一行值元组执行计划，结果直接写入输出行（按模板列顺序）
+        映射语义与 ExcelProcessor.column_mapping 一致：原值为空时不更新，considerEmpty=True 时原值（含空值）直接覆盖
+        """
+        try:
+            for src_idx, rule, dest, consider_empty in self.steps:
+                raw_value = None if src_idx is None else values[src_idx]
+                if raw_value:
+                    mapped = RuleMemo.map(rule, raw_value)
+                    for idx in dest:
+                        out[idx] = mapped
+                if consider_empty:
+                    for idx in dest:
+                        out[idx] = raw_value
+            return out
+        except Exception as e:
+            Logger.error(f"❌ mapping映射失败: {str(e)}")
+            raise
+
+    def dest_columns(self) -> List[int]:
+        """计划会写入的输出列序号"""
+        return sorted({idx for _, _, dest, _ in self.steps for idx in dest})
+
+    def apply_to(self, values: Tuple, store, row_id: int):
+        """
+        对一行值元组执行计划，结果直接写入行存储（RowStore）中指定行号的各列
+        映射语义与 apply() 一致
+        """
+        columns = store.columns
+        try:
+            for src_idx, rule, dest, consider_empty in self.steps:
+                raw_value = None if src_idx is None else values[src_idx]
+                if raw_value:
+                    mapped = RuleMemo.map(rule, raw_value)
+                    for idx in dest:
+                        columns[idx][row_id] = mapped
+                if consider_empty:
+                    for idx in dest:
+                        columns[idx][row_id] = raw_value
+        except Exception as e:
+            Logger.error(f"❌ mapping映射失败: {str(e)}")
+            raise
@@ -0,0 +1,158 @@
+from sinotrans.core.key_index import KeyIndex
+from sinotrans.core.mapping_plan import MappingPlan
+from sinotrans.core.row_store import RowStore
+from sinotrans.utils.logger import Logger
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+
+
+class SntMergeEngine:
+    """
+    基于哈希连接的SNT合并引擎（按工作表使用）：
+    1. 以snt基准数据按关键字段（folder,po,lot）建立基准表base，列为模板表头
+    2. 按优先级顺序依次登记res/report数据源，每个数据源先整列完成字段映射
+    3. 一次性将所有数据源按关键字段与基准表做哈希连接，逐列取优先级最高（最后登记）的更新值
+
+    优先级规则（确定性，不受线程调度影响）：
+    - 后登记的数据源覆盖先登记的数据源
+    - 同一数据源内，后出现的行覆盖先出现的行
+    - 字段映射语义与 ExcelProcessor.column_mapping 一致：原值为空时不更新，considerEmpty=True 时原值（含空值）直接覆盖
+    - 目标字段不在模板表头中的映射规则不参与计算（MappingPlan.restrict）
+    """
+    # 单条规则最多逐个输出的失败元素数
+    MAX_REPORTED_ERRORS = 20
+
+    def __init__(self, key_fields: List[str], headers: List, fixed_mapping: Dict, snt_mapping: Dict):
+        self.key_fields = key_fields
+        self.headers = headers
+        self.fixed_mapping = fixed_mapping
+        self.snt_mapping = MappingPlan.restrict(snt_mapping, headers)
+        self.base = None
+        # 已登记的数据源：[(数据源名称, 关键字段索引, {目标字段: (值, 是否更新掩码)})]
+        self._sources: List[Tuple[str, pd.MultiIndex, Dict[str, Tuple[np.ndarray, np.ndarray]]]] = []
+
+    @staticmethod
+    def truthy_mask(values: pd.Series) -> np.ndarray:
+        """与 `if raw_value:` 等价的向量化判断：None/NaN/空字符串/0 视为空"""
+        return (values.notna() & values.ne("") & values.ne(0)).to_numpy()
+
+    @staticmethod
+    def map_columns(frame: pd.DataFrame, column_mapping: Dict) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        整列执行字段映射，返回 {目标字段: (映射值数组, 是否更新掩码)}
+        同一目标字段被多个源字段映射时，后面的映射覆盖前面的映射
+        """
+        n_rows = len(frame)
+        mapped = {}
+        for src_col, rules in column_mapping.items():
+            if src_col in frame.columns:
+                raw = frame[src_col]
+            else:
+                raw = pd.Series([None] * n_rows, index=frame.index, dtype=object)
+            truthy = SntMergeEngine.truthy_mask(raw)
+            for rule in rules:
+                if rule.considerEmpty:
+                    values, has = raw.to_numpy(dtype=object), np.ones(n_rows, dtype=bool)
+                else:
+                    values = np.full(n_rows, None, dtype=object)
+                    if truthy.any():
+                        values[truthy] = SntMergeEngine.map_batch(rule, raw[truthy]).to_numpy(dtype=object)
+                    has = truthy
+                if rule.field_name in mapped:
+                    prev_values, prev_has = mapped[rule.field_name]
+                    values = np.where(has, values, prev_values)
+                    has = has | prev_has
+                mapped[rule.field_name] = (values, has)
+        return mapped
+
+    @staticmethod
+    def map_batch(rule, raw: pd.Series) -> pd.Series:
+        """整列执行单条映射规则，逐个报告失败的元素后抛出异常（与逐行映射遇错即中止一致）"""
+        values, errors = rule.map_batch(raw)
+        if errors:
+            for pos, message in list(errors.items())[:SntMergeEngine.MAX_REPORTED_ERRORS]:
+                Logger.error(f"❌ [{rule.field_name}] 第{pos}行 {raw[pos]!r}: {message}")
+            raise ValueError(f"❌ 字段 [{rule.field_name}] 映射失败 {len(errors)} 处")
+        return values
+
+    def key_index(self, frame: pd.DataFrame) -> pd.MultiIndex:
+        """关键字段按类型规范化（KeyIndex.normalize）后构建联合索引，避免类型不一致导致匹配失败"""
+        return pd.MultiIndex.from_arrays(
+            [frame[field].map(KeyIndex.normalize).to_numpy(dtype=object) for field in self.key_fields],
+            names=self.key_fields,
+        )
+
+    def load_baseline(self, snt_frame: pd.DataFrame, source_name: str = "snt") -> int:
+        """
+        以snt基准数据初始化基准表：模板列默认为空字符串，依次叠加固定映射、snt字段映射
+        关键字段重复时，保留首次出现的位置、最后出现的数据（与逐行字典写入一致）
+        返回：有效基准数据条数
+        """
+        keys = self.key_index(snt_frame)
+        duplicated = keys.duplicated(keep='first')
+        for key in keys[duplicated]:
+            Logger.info(f"⚠️ 发现重复基准数据: {key}")
+
+        latest = snt_frame[~keys.duplicated(keep='last')]
+        latest_keys = keys[~keys.duplicated(keep='last')]
+        order = latest_keys.get_indexer(keys[~duplicated])
+        latest = latest.iloc[order]
+
+        base = pd.DataFrame('', index=keys[~duplicated], columns=pd.Index(self.headers, dtype=object), dtype=object)
+        for dest_col, rule in self.fixed_mapping.items():
+            if dest_col in base.columns:
+                base[dest_col] = rule.field_name
+        for dest_col, (values, has) in self.map_columns(latest, self.snt_mapping).items():
+            if dest_col in base.columns:
+                base[dest_col] = np.where(has, values, base[dest_col].to_numpy(dtype=object))
+        self.base = base
+        Logger.debug(f"📥 {source_name} 基准表已建立，共 {len(base)} 行")
+        return len(base)
+
+    def add_source(self, frame: pd.DataFrame, column_mapping: Dict, source_name: str) -> int:
+        """
+        登记一个更新数据源（已完成必填列过滤），登记顺序即优先级顺序
+        返回：能匹配到基准数据的行数
+        """
+        keys = self.key_index(frame)
+        self._sources.append((source_name, keys, self.map_columns(frame, MappingPlan.restrict(column_mapping, self.headers))))
+        matched = int((self.base.index.get_indexer(keys) >= 0).sum()) if len(frame) else 0
+        Logger.debug(f"{source_name} 匹配 {matched}/{len(frame)} 行数据")
+        return matched
+
+    def merge(self) -> pd.DataFrame:
+        """执行哈希连接：逐目标列取每个关键字段最后一次更新值，写回基准表"""
+        base = self.base
+        for dest_col in base.columns:
+            key_parts, value_parts = [], []
+            for _, keys, mapped in self._sources:
+                if dest_col not in mapped:
+                    continue
+                values, has = mapped[dest_col]
+                if has.any():
+                    key_parts.append(keys[has])
+                    value_parts.append(values[has])
+            if not key_parts:
+                continue
+            update_keys = key_parts[0].append(key_parts[1:]) if len(key_parts) > 1 else key_parts[0]
+            update_values = np.concatenate(value_parts)
+            # 保留每个关键字段最后一次（优先级最高）的更新
+            latest = ~update_keys.duplicated(keep='last')
+            positions = base.index.get_indexer(update_keys[latest])
+            matched = positions >= 0
+            column = base[dest_col].to_numpy(dtype=object).copy()
+            column[positions[matched]] = update_values[latest][matched]
+            base[dest_col] = column
+        self._sources.clear()
+        return base
+
+    def ordered_rows(self) -> List[list]:
+        """按模板列顺序输出行列表，可直接写入目标工作表"""
+        return self.base.to_numpy(dtype=object).tolist()
+
+    def row_store(self) -> RowStore:
+        """按模板列顺序输出列式行存储（不逐行展开为列表），可直接迭代写入目标工作表"""
+        return RowStore.from_columns(
+            self.headers, [self.base.iloc[:, pos].tolist() for pos in range(self.base.shape[1])]
+        )
@@ -0,0 +1,142 @@
+from openpyxl.reader.workbook import WorkbookParser
+from sinotrans.utils.logger import Logger
+from pathlib import Path
+from typing import Dict, List, Optional
+from zipfile import ZipFile, BadZipFile
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import warnings
+
+
+class ParseCache:
+    """
+    工作表解析结果的本地磁盘缓存：
+    - 文件级：按文件内容哈希（sha256）索引，文件未变化时直接加载全部工作表快照，不再打开工作簿
+    - 工作表级：按xlsx压缩包内工作表条目的CRC索引，文件变化时只重新解析内容发生变化的工作表
+      工作表的单元格值还依赖共享字符串表（sharedStrings）、样式表（styles，决定日期转换）和日期基准（1904），一并计入工作表指纹
+    - 解析参数（工作表范围、关键字段、读取引擎）不同的缓存互不干扰
+    缓存目录结构：
+    cache_dir/files/<内容哈希>_<参数指纹>.json  —— {工作表名称: 工作表指纹}
+    cache_dir/sheets/<工作表指纹>.pkl           —— 工作表快照（SheetSnapshot/SheetFrame）
+    """
+    # 快照结构变化时递增，使旧缓存自动失效
+    FORMAT_VERSION = 3
+    WORKBOOK_PART = "xl/workbook.xml"
+    SHARED_STRINGS_PART = "xl/sharedStrings.xml"
+    STYLES_PART = "xl/styles.xml"
+
+    def __init__(self, cache_dir: str, sheet_names=None, key_fields=None, columnar=False):
+        self.cache_dir = cache_dir
+        self.files_dir = os.path.join(cache_dir, "files")
+        self.sheets_dir = os.path.join(cache_dir, "sheets")
+        os.makedirs(self.files_dir, exist_ok=True)
+        os.makedirs(self.sheets_dir, exist_ok=True)
+        self.variant = self._digest(json.dumps(
+            [self.FORMAT_VERSION, sorted(sheet_names or []), list(key_fields or []), bool(columnar)],
+            ensure_ascii=False
+        ))
+
+    @staticmethod
+    def _digest(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def file_digest(file_path: str, chunk_size: int = 1 << 20) -> str:
+        """文件内容哈希"""
+        sha = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def sheet_fingerprints(self, file_path: str) -> Optional[Dict[str, str]]:
+        """
+        读取xlsx压缩包目录（不解压工作表数据），计算每个工作表的指纹
+        返回：{工作表名称: 工作表指纹}（按工作簿中的工作表顺序），不是有效xlsx文件时返回None
+        """
+        try:
+            with ZipFile(file_path) as archive:
+                parser = WorkbookParser(archive, self.WORKBOOK_PART, keep_links=False)
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")  # 忽略openpyxl的警告
+                    parser.parse()
+                    sheets = [(sheet.name, rel.target) for sheet, rel in parser.find_sheets()]
+                crcs = {info.filename: info.CRC for info in archive.infolist()}
+                shared = [
+                    crcs.get(self.SHARED_STRINGS_PART),
+                    crcs.get(self.STYLES_PART),
+                    parser.wb.epoch.isoformat(),
+                ]
+                return {
+                    name: self._digest(json.dumps([self.variant, name, crcs.get(target.lstrip("/"))] + shared, ensure_ascii=False))
+                    for name, target in sheets
+                }
+        except (BadZipFile, KeyError, OSError, ValueError, TypeError) as e:
+            Logger.debug(f"⚠️ 无法读取工作表指纹: {Path(file_path).name} ({str(e)})")
+            return None
+
+    def _file_index_path(self, content_hash: str) -> str:
+        return os.path.join(self.files_dir, f"{content_hash}_{self.variant}.json")
+
+    def _sheet_path(self, fingerprint: str) -> str:
+        return os.path.join(self.sheets_dir, f"{fingerprint}.pkl")
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes):
+        """先写临时文件再替换，多进程/多线程并发写入同一缓存项时不会产生半截文件"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load_file(self, content_hash: str) -> Optional[Dict[str, object]]:
+        """按文件内容哈希加载全部工作表快照，任一工作表缺失时返回None"""
+        index_path = self._file_index_path(content_hash)
+        if not os.path.exists(index_path):
+            return None
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                fingerprints = json.load(f)
+        except (OSError, ValueError):
+            return None
+        snapshots = {}
+        for sheet_name, fingerprint in fingerprints.items():
+            snapshot = self.load_sheet(fingerprint)
+            if snapshot is None:
+                return None
+            snapshots[sheet_name] = snapshot
+        return snapshots
+
+    def load_sheet(self, fingerprint: str):
+        """按工作表指纹加载快照，不存在或已损坏时返回None"""
+        sheet_path = self._sheet_path(fingerprint)
+        if not os.path.exists(sheet_path):
+            return None
+        try:
+            with open(sheet_path, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            Logger.debug(f"⚠️ 缓存读取失败，将重新解析: {sheet_path} ({str(e)})")
+            return None
+
+    def store(self, content_hash: str, fingerprints: Dict[str, str], snapshots: Dict[str, object], parsed: List[str]):
+        """保存新解析的工作表快照（parsed），并更新文件级索引"""
+        try:
+            for sheet_name in parsed:
+                self._atomic_write(
+                    self._sheet_path(fingerprints[sheet_name]),
+                    pickle.dumps(snapshots[sheet_name], protocol=pickle.HIGHEST_PROTOCOL)
+                )
+            index = {sheet_name: fingerprints[sheet_name] for sheet_name in snapshots}
+            self._atomic_write(self._file_index_path(content_hash), json.dumps(index, ensure_ascii=False).encode("utf-8"))
+        except Exception as e:
+            # 缓存写入失败不影响本次处理
+            Logger.debug(f"⚠️ 缓存写入失败: {str(e)}")
@@ -0,0 +1,98 @@
+from typing import Dict, Iterable, Iterator, List, Union
+import itertools
+
+
+class RowStore:
+    """
+    按行号（KeyIndex分配）存储的紧凑行数据，列式组织，替代每行一个按模板表头展开的字典/列表：
+    - 每个模板列一个容器：写入的行较少时为稀疏字典 {行号: 值}，未写入的行取该列默认值（模板初始值：固定映射或空字符串）
+    - 稀疏列写入的行数超过 DENSE_RATIO 后，compact() 将其转为与行数等长的稠密列表
+    - 从未写入的列（只有固定映射或空字符串）不占用逐行空间
+    - 字典和列表都支持按行号下标赋值，映射计划（MappingPlan.apply_to）直接写入列容器
+    - 可重复迭代：每次迭代按模板列顺序逐行拼装行列表，供写入输出工作表、旁路文件使用，不长期保存逐行列表
+    - 也用作并发文件任务的局部更新集：各任务写入自己的行存储，最后按文件顺序 merge() 到基准行存储
+    并发写入同一个行存储需要调用方加锁；compact()/densify()/merge() 只能在没有写入时调用
+    """
+    # 稀疏列写入比例超过该值时转为稠密列表（字典条目的内存占用约为列表槽位的8倍）
+    DENSE_RATIO = 1 / 8
+
+    def __init__(self, headers: Iterable, row_count: int, defaults: Iterable = None):
+        self.headers = list(headers)
+        self.row_count = row_count
+        self.defaults = list(defaults) if defaults is not None else [''] * len(self.headers)
+        self.columns: List[Union[Dict[int, object], list]] = [{} for _ in self.headers]
+
+    @classmethod
+    def from_columns(cls, headers: Iterable, columns: List[list]) -> "RowStore":
+        """由按模板列顺序排列的稠密列列表构建（如列式引擎的合并结果）"""
+        row_count = len(columns[0]) if columns else 0
+        store = cls(headers, row_count)
+        store.columns = list(columns)
+        return store
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def __iter__(self) -> Iterator[list]:
+        """按行号顺序生成按模板列顺序排列的行列表"""
+        n_rows = self.row_count
+        sources = []
+        for column, default in zip(self.columns, self.defaults):
+            if isinstance(column, list):
+                sources.append(column)
+            elif column:
+                sources.append(map(column.get, range(n_rows), itertools.repeat(default, n_rows)))
+            else:
+                sources.append(itertools.repeat(default, n_rows))
+        return map(list, zip(*sources))
+
+    def get(self, row_id: int, col_idx: int):
+        """读取单元格值"""
+        column = self.columns[col_idx]
+        if isinstance(column, list):
+            return column[row_id]
+        return column.get(row_id, self.defaults[col_idx])
+
+    def set(self, row_id: int, col_idx: int, value):
+        """写入单元格值"""
+        self.columns[col_idx][row_id] = value
+
+    def row(self, row_id: int) -> list:
+        """按模板列顺序读取一行"""
+        return [self.get(row_id, col_idx) for col_idx in range(len(self.columns))]
+
+    def merge(self, other: "RowStore"):
+        """
+        合并另一个行存储（局部更新集）中写入过的单元格，覆盖当前值；两者的行号、列顺序必须一致
+        只合并对方的稀疏列（写入过的单元格），稠密列视为整列写入
+        """
+        for col_idx, updates in enumerate(other.columns):
+            if not updates:
+                continue
+            column = self.columns[col_idx]
+            if isinstance(updates, list):
+                self.columns[col_idx] = list(updates)
+            elif isinstance(column, dict):
+                column.update(updates)
+            else:
+                for row_id, value in updates.items():
+                    column[row_id] = value
+
+    def densify(self, col_indices: Iterable[int]):
+        """将指定列转为稠密列表（预计几乎每行都会写入的列，如基准数据映射的目标列）"""
+        for col_idx in col_indices:
+            column = self.columns[col_idx]
+            if isinstance(column, list):
+                continue
+            dense = [self.defaults[col_idx]] * self.row_count
+            for row_id, value in column.items():
+                dense[row_id] = value
+            self.columns[col_idx] = dense
+
+    def compact(self):
+        """写入比例超过 DENSE_RATIO 的稀疏列转为稠密列表"""
+        threshold = max(1, int(self.row_count * self.DENSE_RATIO))
+        self.densify(
+            col_idx for col_idx, column in enumerate(self.columns)
+            if isinstance(column, dict) and len(column) > threshold
+        )
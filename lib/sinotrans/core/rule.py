@@ -1,7 +1,17 @@
 
 from sinotrans.utils.logger import Logger
+from typing import Dict, Tuple
+import itertools
+import numpy as np
+import pandas as pd
 import re
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow为可选依赖，未安装时批量分割使用逐元素 str.split
+    pa = pc = None
+
 class Rule:
     DEFAULT_SPLITTER = '#'
     """
@@ -72,4 +82,104 @@ class Rule:
                 processed_value = ""
                 raise ValueError(f"❌ 四舍五入失败: 值 '{processed_value}' 不是有效数字")
 
-        return processed_value
\ No newline at end of file
+        return processed_value
+
+    def map_batch(self, values) -> Tuple[pd.Series, Dict]:
+        """
+        map_action 的批量版本：对整列（pandas Series / Arrow数组 / 序列）一次性执行同一规则
+        - 空值（None/NaN/空字符串/0）结果为None，与 map_action 一致（NaN按空值处理，与 SntMergeEngine.truthy_mask 一致）
+        - 字段分割、四舍五入整列向量化完成
+        - 单个元素失败不中断整列：失败元素结果为None，错误信息按元素索引收集
+        返回：(映射结果Series（dtype=object，索引与输入一致）, {元素索引: 错误信息})
+        """
+        if not isinstance(values, pd.Series):
+            values = pd.Series(values.to_pylist() if hasattr(values, "to_pylist") else list(values), dtype=object)
+        labels = values.index
+        # 内部统一按位置处理，避免重复索引
+        values = pd.Series(values.to_numpy(dtype=object), dtype=object)
+        result = np.full(len(values), None, dtype=object)
+        errors = {}
+
+        truthy = (values.notna() & values.ne("") & values.ne(0)).to_numpy()
+        processed = values[truthy]
+        if self.splitter and not processed.empty:
+            processed = self._split_batch(processed, errors)
+        if self.method == 'round' and not processed.empty:
+            processed = self._round_batch(processed, errors)
+        result[processed.index.to_numpy()] = processed.to_numpy(dtype=object)
+        return pd.Series(result, index=labels, dtype=object), {labels[pos]: message for pos, message in errors.items()}
+
+    def _split_batch(self, processed: pd.Series, errors: Dict) -> pd.Series:
+        """整列字段分割：按 mode/index 取值，非字符串或index越界的元素记入errors"""
+        raw = processed.to_numpy(dtype=object)
+        is_str = np.fromiter(map(type, raw), dtype=object, count=len(raw)) == str
+        for pos in np.flatnonzero(~is_str):
+            # str子类（如numpy.str_）
+            is_str[pos] = isinstance(raw[pos], str)
+        for pos in np.flatnonzero(~is_str):
+            errors[processed.index[pos]] = f"❌ 字段分割失败: {self.field_name}={raw[pos]} 不是字符串"
+        strings = raw[is_str]
+        index = processed.index[is_str]
+        flat, offsets = self._split_parts(strings)
+        starts, counts = offsets[:-1], np.diff(offsets)
+        # 索引优先级更高
+        if self.index is not None:
+            valid = (counts >= self.index) & (self.index > 0)
+            for pos in index[~valid]:
+                errors[pos] = f"请检查index值：{self.index}"
+            return pd.Series(flat[starts[valid] + self.index - 1], index=index[valid], dtype=object)
+        if self.mode == "last":
+            return pd.Series(flat[offsets[1:] - 1], index=index, dtype=object)
+        if self.mode == "allbutlast":
+            # 去掉最后一段及其前面的分隔符，等价于 splitter.join(split_values[:-1])
+            last = flat[offsets[1:] - 1]
+            cut = [len(value) - len(tail) - len(self.splitter) for value, tail in zip(strings, last)]
+            values = [value[:stop] if count > 1 else "" for value, stop, count in zip(strings, cut, counts)]
+            return pd.Series(values, index=index, dtype=object)
+        return pd.Series(strings, index=index, dtype=object)
+
+    def _split_parts(self, strings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        整列按 splitter 分割，返回 (所有分割段的扁平数组, 每个元素的分割段偏移量)
+        第i个元素的分割段为 flat[offsets[i]:offsets[i+1]]；安装了pyarrow时使用Arrow计算内核
+        """
+        if pc is not None and len(strings):
+            parts = pc.split_pattern(pa.array(strings, type=pa.large_string()), pattern=self.splitter)
+            return parts.flatten().to_numpy(zero_copy_only=False), parts.offsets.to_numpy()
+        split_values = [value.split(self.splitter) for value in strings]
+        counts = np.fromiter(map(len, split_values), dtype=np.int64, count=len(split_values))
+        flat = np.empty(int(counts.sum()), dtype=object)
+        flat[:] = list(itertools.chain.from_iterable(split_values))
+        return flat, np.concatenate(([0], np.cumsum(counts)))
+
+    def _round_batch(self, processed: pd.Series, errors: Dict) -> pd.Series:
+        """
+        整列四舍五入：数值转换与 float() 语义一致，无法转换的元素记入errors
+        向量化舍入只在远离进位边界时与内置 round 完全一致，接近 .5 边界的元素逐个使用内置 round
+        """
+        raw = processed.to_numpy(dtype=object)
+        try:
+            numbers = raw.astype(np.float64)
+            valid = np.ones(len(raw), dtype=bool)
+        except (TypeError, ValueError):
+            numbers = np.full(len(raw), np.nan)
+            valid = np.zeros(len(raw), dtype=bool)
+            for pos, value in enumerate(raw):
+                try:
+                    numbers[pos] = float(value)
+                    valid[pos] = True
+                except (TypeError, ValueError):
+                    errors[processed.index[pos]] = f"❌ 四舍五入失败: 值 '{value}' 不是有效数字"
+
+        if isinstance(self.dp, int) and self.dp >= 0:
+            with np.errstate(invalid="ignore", over="ignore"):
+                scaled = numbers * (10.0 ** self.dp)
+                near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+                exact = ~np.isfinite(scaled) | near_half | (np.abs(scaled) >= 2 ** 52)
+            rounded = np.round(numbers, self.dp).astype(object)
+        else:
+            exact = np.ones(len(raw), dtype=bool)
+            rounded = np.full(len(raw), None, dtype=object)
+        for pos in np.flatnonzero(exact & valid):
+            rounded[pos] = round(float(numbers[pos]), self.dp)
+        return pd.Series(rounded[valid], index=processed.index[valid], dtype=object)
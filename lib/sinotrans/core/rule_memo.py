@@ -0,0 +1,100 @@
+from sinotrans.utils.logger import Logger
+from collections import OrderedDict
+from typing import Dict
+import threading
+
+
+class RuleMemo:
+    """
+    Rule.map_action 的记忆化缓存（按需开启，默认关闭）：
+    映射的列（status、bu、vendor、pol/pod、SHIPPING MODE等）取值种类很少，同一个值反复执行分割、四舍五入没有必要
+    - 缓存键为 (规则对象, 原值类型, 原值)：规则按对象身份区分；带上类型避免 1 / 1.0 / True 这类相等的值共用结果
+    - 有界LRU，超过容量时淘汰最久未使用的结果；原值不可哈希或映射抛出异常时不缓存
+    - 加锁访问，可在 GlobalThreadPool 的多线程中共用；进程池后端下每个进程各自维护缓存
+    用法：RuleMemo.enable(maxsize) 开启后，RuleMemo.map(rule, raw_value) 代替 rule.map_action(raw_value)
+    """
+    DEFAULT_MAXSIZE = 65536
+    _lock = threading.Lock()
+    _cache: "OrderedDict" = OrderedDict()
+    _enabled = False
+    _maxsize = DEFAULT_MAXSIZE
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def enable(cls, maxsize: int = DEFAULT_MAXSIZE):
+        """开启缓存（清空已有结果和计数）"""
+        if maxsize <= 0:
+            raise ValueError(f"❌ 缓存容量必须大于0: {maxsize}")
+        with cls._lock:
+            cls._maxsize = maxsize
+            cls._cache = OrderedDict()
+            cls.hits = cls.misses = 0
+            cls._enabled = True
+
+    @classmethod
+    def disable(cls):
+        """关闭缓存并释放已缓存的结果"""
+        with cls._lock:
+            cls._enabled = False
+            cls._cache = OrderedDict()
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return cls._enabled
+
+    @classmethod
+    def clear(cls):
+        """清空缓存结果和计数（映射配置重新加载后调用）"""
+        with cls._lock:
+            cls._cache.clear()
+            cls.hits = cls.misses = 0
+
+    @classmethod
+    def map(cls, rule, raw_value):
+        """带缓存的 rule.map_action(raw_value)，未开启缓存时直接调用"""
+        if not cls._enabled:
+            return rule.map_action(raw_value)
+        try:
+            key = (rule, type(raw_value), raw_value)
+            hash(key)
+        except TypeError:
+            return rule.map_action(raw_value)
+
+        with cls._lock:
+            if key in cls._cache:
+                cls._cache.move_to_end(key)
+                cls.hits += 1
+                return cls._cache[key]
+            cls.misses += 1
+        # 映射在锁外执行，多个线程同时未命中同一个值时只是重复计算，结果一致
+        value = rule.map_action(raw_value)
+        with cls._lock:
+            cls._cache[key] = value
+            if len(cls._cache) > cls._maxsize:
+                cls._cache.popitem(last=False)
+        return value
+
+    @classmethod
+    def stats(cls) -> Dict:
+        """命中/未命中次数、命中率、当前缓存条数"""
+        with cls._lock:
+            total = cls.hits + cls.misses
+            return {
+                "hits": cls.hits,
+                "misses": cls.misses,
+                "hit_rate": cls.hits / total if total else 0.0,
+                "size": len(cls._cache),
+                "maxsize": cls._maxsize,
+            }
+
+    @classmethod
+    def log_stats(cls):
+        """输出缓存统计（未开启时忽略）"""
+        if not cls._enabled:
+            return
+        stats = cls.stats()
+        Logger.debug(
+            f"🧠 映射缓存: 命中 {stats['hits']}，未命中 {stats['misses']}，"
+            f"命中率 {stats['hit_rate']:.1%}，缓存 {stats['size']}/{stats['maxsize']} 条"
+        )
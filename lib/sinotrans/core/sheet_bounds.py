@@ -0,0 +1,80 @@
+from openpyxl.utils import column_index_from_string
+from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+from sinotrans.utils.logger import Logger
+from typing import Optional, Tuple
+import re
+
+
+class SheetBounds:
+    """
+    工作表真实数据边界（最后一个有值单元格所在的行、列）：
+    很多客户文件因残留格式，dimension（max_row）被撑到 1048576 行，按 max_row 遍历会逐行生成大量空行
+    - 只读工作表：直接扫描压缩包中的工作表XML，只匹配带值（<v>/<is>/<f>）的单元格，跳过只有样式的空单元格
+    - 普通工作表：遍历已创建的单元格，只统计值不为空的单元格
+    - 无法扫描时（单元格缺少r属性等）退回工作表的dimension
+    """
+    CHUNK_SIZE = 4 << 20
+    # 跨块匹配的重叠字节数，需大于单个单元格开始标签的长度
+    OVERLAP = 512
+    # 带值的单元格开始标签：<c r="AB12" s="3" t="s"> 后紧跟 <v>/<is>/<f>，自闭合的空单元格 <c r="A5" s="3"/> 不匹配
+    VALUE_CELL_RE = re.compile(
+        rb'<(?:\w+:)?c\b[^>/]*?\br="([A-Z]{1,3})([0-9]+)"[^>/]*>(?=\s*<(?:\w+:)?(?:v|is|f)\b)'
+    )
+    # 单元格值标签（用于判断单元格是否缺少r属性：有值但没有匹配到带r属性的单元格）
+    VALUE_RE = re.compile(rb'<(?:\w+:)?(?:v|is)\b')
+
+    @staticmethod
+    def scan_xml(source) -> Optional[Tuple[int, int]]:
+        """
+        扫描工作表XML（二进制文件对象），返回 (最后有值行, 最后有值列)；没有数据时返回 (0, 0)
+        存在缺少r属性的单元格时无法定位，返回None
+        """
+        max_row = max_col = 0
+        columns = set()
+        has_values = False
+        tail = b""
+        while True:
+            chunk = source.read(SheetBounds.CHUNK_SIZE)
+            if not chunk:
+                break
+            buffer = tail + chunk
+            for match in SheetBounds.VALUE_CELL_RE.finditer(buffer):
+                columns.add(match.group(1))
+                row = int(match.group(2))
+                if row > max_row:
+                    max_row = row
+            tail = buffer[-SheetBounds.OVERLAP:]
+            if not has_values and SheetBounds.VALUE_RE.search(buffer):
+                has_values = True
+        if has_values and max_row == 0:
+            return None
+        if columns:
+            max_col = max(column_index_from_string(column.decode()) for column in columns)
+        return max_row, max_col
+
+    @staticmethod
+    def of(ws) -> Tuple[int, int]:
+        """工作表真实数据边界 (最后有值行, 最后有值列)"""
+        if isinstance(ws, ReadOnlyWorksheet):
+            try:
+                with ws.parent._archive.open(ws._worksheet_path) as source:
+                    bounds = SheetBounds.scan_xml(source)
+                if bounds is not None:
+                    if ws.max_row and bounds[0] < ws.max_row:
+                        Logger.debug(f"📐 工作表 [{ws.title}] dimension为 {ws.max_row} 行，实际数据 {bounds[0]} 行")
+                    return bounds
+            except Exception as e:
+                Logger.debug(f"⚠️ 工作表 [{ws.title}] XML扫描失败，使用dimension: {str(e)}")
+            return ws.max_row or 0, ws.max_column or 0
+
+        cells = getattr(ws, "_cells", None)
+        if cells is None:
+            return ws.max_row, ws.max_column
+        max_row = max_col = 0
+        for (row, col), cell in cells.items():
+            if cell.value is not None:
+                if row > max_row:
+                    max_row = row
+                if col > max_col:
+                    max_col = col
+        return max_row, max_col
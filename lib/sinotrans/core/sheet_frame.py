@@ -0,0 +1,108 @@
+from sinotrans.core.key_index import KeyIndex
+from sinotrans.core.sheet_schema import SheetSchema
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+
+
+class SheetFrame:
+    """
+    列式工作表快照，与 SheetSnapshot 接口一致：
+    - frame: 按表头索引的DataFrame（dtype=object，保留单元格原始类型）
+    - schema: 按frame列（重复表头已去重）编译的工作表结构，iter_keyed_rows 生成的行值元组按其列序号取值
+    - keys: 与frame行一一对应的规范化关键字段元组（KeyIndex.normalize），表头缺少关键字段时为None
+    空行检测、必填列校验都通过向量化掩码完成，不再逐行构建字典
+    """
+    # 最大允许连续空行数，与 ExcelProcessor.excel_row_generator_skipping 保持一致
+    MAX_CONSECUTIVE_EMPTY = 1000
+
+    def __init__(self, title: str, headers: List, frame: pd.DataFrame, key_fields: Optional[List[str]] = None):
+        self.title = title
+        self.headers = headers
+        self.frame = frame
+        self.schema = SheetSchema(list(frame.columns), key_fields)
+        self.key_fields = key_fields
+        self.keys = None
+        if key_fields and self.has_fields(key_fields):
+            # 如果不用字符串格式存储和读取，就会发生丢数据，匹配更新失败的情况！
+            self.keys = list(zip(*(frame[field].map(KeyIndex.normalize) for field in key_fields)))
+
+    @classmethod
+    def from_values(cls, title, value_rows, key_fields=None):
+        """
+        由 values_only 行元组构建列式快照（首行为表头）
+        - 字符串列整列去空格
+        - 剔除全空行，连续空行超过 MAX_CONSECUTIVE_EMPTY 时截断后续数据
+        """
+        value_rows = iter(value_rows)
+        headers = list(next(value_rows, ()))
+        # dtype=object：避免含空值的整数列被转换为浮点数（1 -> 1.0）
+        frame = pd.DataFrame(list(value_rows), columns=range(len(headers)), dtype=object)
+        frame = frame.where(frame.notna(), None)
+        frame.columns = headers
+        # 重复表头与逐行字典语义一致：后出现的列覆盖前面的列
+        frame = frame.loc[:, ~pd.Index(headers).duplicated(keep='last')]
+
+        # 字符串整列去空格，非字符串单元格保持原值
+        for pos in range(frame.shape[1]):
+            column = frame.iloc[:, pos]
+            try:
+                stripped = column.str.strip()
+            except AttributeError:
+                # 整列不含字符串（数字、日期、全空），无需处理
+                continue
+            frame.iloc[:, pos] = stripped.where(stripped.notna(), column)
+
+        empty_mask = cls.empty_mask(frame)
+        non_empty_pos = np.flatnonzero(~empty_mask.all(axis=1).to_numpy())
+        # 连续空行截断：两行有效数据之间的空行数 >= MAX_CONSECUTIVE_EMPTY 时，后续数据不再读取
+        gaps = np.diff(np.concatenate(([-1], non_empty_pos))) - 1
+        cut = np.flatnonzero(gaps >= cls.MAX_CONSECUTIVE_EMPTY)
+        if cut.size:
+            non_empty_pos = non_empty_pos[:cut[0]]
+        frame = frame.iloc[non_empty_pos].reset_index(drop=True)
+        return cls(title, headers, frame, key_fields)
+
+    @staticmethod
+    def empty_mask(frame: pd.DataFrame) -> pd.DataFrame:
+        """单元格为空（None/NaN/空字符串）的布尔掩码"""
+        return frame.isna() | frame.eq("")
+
+    @property
+    def row_count(self) -> int:
+        """数据行数（不实现__len__，避免空快照被当作无效工作表）"""
+        return len(self.frame)
+
+    def has_fields(self, fields) -> bool:
+        """表头是否包含全部指定字段"""
+        return all(field in self.headers for field in fields)
+
+    def required_mask(self, required_columns=None, strict_flag=True) -> np.ndarray:
+        """
+        必填列校验掩码（True为保留）：
+        严格模式：存在任一必填列缺失即跳过
+        宽松模式：仅当全部必填列缺失时跳过
+        """
+        required_check = [col for col in (required_columns or []) if col in self.frame.columns]
+        if not required_check:
+            return np.ones(len(self.frame), dtype=bool)
+        missing = self.empty_mask(self.frame[required_check])
+        keep = ~missing.any(axis=1) if strict_flag else ~missing.all(axis=1)
+        return keep.to_numpy()
+
+    def has_rows(self, required_columns=None, strict_flag=True) -> bool:
+        """是否存在通过必填列校验的行"""
+        return bool(self.required_mask(required_columns, strict_flag).any())
+
+    def filtered(self, required_columns=None, strict_flag=True) -> pd.DataFrame:
+        """返回通过必填列校验的行"""
+        return self.frame[self.required_mask(required_columns, strict_flag)]
+
+    def iter_keyed_rows(self, required_columns=None, strict_flag=True):
+        """按必填列规则遍历快照，生成 (关键字段元组, 行值元组)"""
+        if self.keys is None:
+            raise KeyError(f"工作表 [{self.title}] 缺少关键字段: {self.key_fields}")
+        mask = self.required_mask(required_columns, strict_flag)
+        rows = self.frame[mask].itertuples(index=False, name=None)
+        keys = (key for key, keep in zip(self.keys, mask) if keep)
+        yield from zip(keys, rows)
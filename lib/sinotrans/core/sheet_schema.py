@@ -0,0 +1,93 @@
+from sinotrans.core.key_index import KeyIndex
+from sinotrans.utils.logger import Logger
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class SheetSchema:
+    """
+    编译后的工作表结构，每个工作表只构建一次：
+    - index: {表头: 列序号}，重复表头与逐行字典语义一致，取最后出现的列
+    - key_indices: 关键字段列序号，表头缺少关键字段时为None
+    - required_indices(): 必填列序号
+    行数据统一为与表头等宽的值元组（values_only），按列序号取值，不再为每一行构建字典
+    """
+    # 最大允许连续空行数，与 ExcelProcessor.excel_row_generator_skipping 保持一致
+    MAX_CONSECUTIVE_EMPTY = 1000
+
+    def __init__(self, headers, key_fields: Optional[List[str]] = None):
+        self.headers = list(headers)
+        self.width = len(self.headers)
+        self.index: Dict[object, int] = {}
+        for idx, header in enumerate(self.headers):
+            self.index[header] = idx
+        # 实际生效的列（重复表头只保留最后一列），空行检测只看这些列
+        self.effective_indices = tuple(sorted(self.index.values()))
+        self.key_fields = key_fields
+        self.key_indices: Optional[Tuple[int, ...]] = None
+        if key_fields and self.has_fields(key_fields):
+            self.key_indices = tuple(self.index[field] for field in key_fields)
+
+    def has_fields(self, fields) -> bool:
+        """表头是否包含全部指定字段"""
+        return all(field in self.index for field in fields)
+
+    def required_indices(self, required_columns=None) -> Tuple[int, ...]:
+        """表头中存在的必填列序号"""
+        return tuple(self.index[col] for col in (required_columns or []) if col in self.index)
+
+    def key_of(self, values: Tuple) -> Tuple[str, ...]:
+        """规范化的关键字段元组（按类型统一为字符串，避免类型不一致导致匹配失败）"""
+        return KeyIndex.key_of(values[idx] for idx in self.key_indices)
+
+    def value(self, values: Tuple, column, default=None):
+        """按表头取值，表头不存在时返回默认值"""
+        idx = self.index.get(column)
+        return default if idx is None else values[idx]
+
+    def to_dict(self, values: Tuple) -> Dict:
+        """转换为 {表头: 值} 字典（兼容按字典处理的旧接口）"""
+        return {header: values[idx] for header, idx in self.index.items()}
+
+    @staticmethod
+    def missing(values: Tuple, indices: Tuple[int, ...]) -> int:
+        """指定列中为空（None/空字符串）的列数"""
+        return sum(1 for idx in indices if values[idx] in (None, ""))
+
+    @staticmethod
+    def keeps(values: Tuple, required_indices: Tuple[int, ...], strict_flag=True) -> bool:
+        """
+        必填列校验：
+        严格模式：存在任一必填列缺失即跳过
+        宽松模式：仅当全部必填列缺失时跳过
+        """
+        if not required_indices:
+            return True
+        missing = SheetSchema.missing(values, required_indices)
+        if strict_flag:
+            return not missing
+        return missing != len(required_indices)
+
+    def iter_values(self, value_rows: Iterable[Tuple], start_row: int = 2):
+        """
+        清洗数据行（不含表头），生成 (行号, 值元组)：
+        - 行补齐/截断为表头宽度，字符串去空格
+        - 跳过全空行，连续空行达到 MAX_CONSECUTIVE_EMPTY 时提前终止
+        """
+        width = self.width
+        effective = self.effective_indices
+        empty_counter = 0
+        row_idx = start_row - 1
+        for row_idx, row in enumerate(value_rows, start=start_row):
+            values = tuple(value.strip() if isinstance(value, str) else value for value in row[:width])
+            if len(values) < width:
+                values += (None,) * (width - len(values))
+
+            if all(values[idx] in (None, "") for idx in effective):
+                empty_counter += 1
+                if empty_counter >= self.MAX_CONSECUTIVE_EMPTY:
+                    Logger.debug(f"⏹ 检测到连续{empty_counter}行空行，提前终止读取（从第{row_idx}行起）")
+                    break
+                continue
+            empty_counter = 0
+            yield row_idx, values
+        Logger.debug(f"✅ 文件解析完成，实际处理到第{row_idx}行")
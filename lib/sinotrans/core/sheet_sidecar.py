@@ -0,0 +1,208 @@
+from sinotrans.utils.logger import Logger
+from collections.abc import Sized
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import datetime
+import hashlib
+import json
+import os
+import pandas as pd
+from pandas.io.parsers import TextParser
+import shutil
+import tempfile
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow为可选依赖，未安装时不生成/读取旁路文件
+    pa = None
+
+
+class SheetSidecar:
+    """
+    工作簿的列式旁路文件（Arrow IPC，可内存映射）：
+    - 每个工作表一个 .arrow 文件，保存表头和原始单元格值（values_only，未清洗），读取时无需再解析XML
+    - 旁路目录：<旁路根目录>/<源文件名>_<源文件绝对路径哈希>/，manifest.json 记录源文件大小、修改时间和工作表列表
+      旁路根目录由调用方指定（默认为工作目录下的 .cache/sidecar，与解析缓存同在 .cache 下），不向源文件所在目录写入任何文件
+    - 源文件大小或修改时间变化时旁路文件自动失效，下次解析时重建
+    - 单元格类型保持不变：单一类型列直接存为对应Arrow类型，混合类型列（如数字和文本混合的PO号）按类型拆分为结构体子列
+    - 表头同样保持类型（日期、数字表头不会变为字符串），读取后与openpyxl解析的表头相等
+    pyarrow 为可选依赖，未安装时 available() 返回False，调用方回退到直接解析Excel
+    """
+    # 默认旁路根目录（相对于当前工作目录）
+    DEFAULT_DIR = os.path.join(".cache", "sidecar")
+    MANIFEST = "manifest.json"
+    FORMAT_VERSION = 2
+    HEADERS_KEY = b"sinotrans.headers"
+    # 按类型编码的表头值：JSON不能直接表示的类型保存为 [类型名, ISO字符串]
+    HEADER_TYPES = {"datetime": datetime.datetime, "date": datetime.date, "time": datetime.time}
+
+    @staticmethod
+    def available() -> bool:
+        """pyarrow是否可用"""
+        return pa is not None
+
+    @staticmethod
+    def default_root(base_dir: str) -> str:
+        """工作目录下的默认旁路根目录（处理器写入、分析界面读取使用同一目录）"""
+        return os.path.join(base_dir, SheetSidecar.DEFAULT_DIR)
+
+    @staticmethod
+    def sidecar_dir(source: str, root: str = None) -> str:
+        """源文件的旁路目录，root为旁路根目录（为空时使用 DEFAULT_DIR）"""
+        source = Path(source).absolute()
+        digest = hashlib.sha256(str(source).encode("utf-8")).hexdigest()[:16]
+        return str(Path(root or SheetSidecar.DEFAULT_DIR).absolute() / f"{source.name}_{digest}")
+
+    @staticmethod
+    def _source_state(source: str) -> Dict:
+        stat = os.stat(source)
+        return {"version": SheetSidecar.FORMAT_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    @staticmethod
+    def read_manifest(source: str, root: str = None) -> Optional[Dict]:
+        """读取与源文件一致的旁路清单，不存在或已失效时返回None"""
+        if not SheetSidecar.available():
+            return None
+        manifest_path = os.path.join(SheetSidecar.sidecar_dir(source, root), SheetSidecar.MANIFEST)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("source") != SheetSidecar._source_state(source):
+                return None
+            return manifest
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _encode_header(value):
+        """表头值编码为JSON值：字符串、数字、布尔、None原样保存，日期时间保存为 [类型名, ISO字符串]，其他类型显式转为字符串"""
+        if value is None or isinstance(value, (str, bool, int, float)):
+            return value
+        for type_name, value_type in SheetSidecar.HEADER_TYPES.items():
+            if type(value) is value_type:
+                return [type_name, value.isoformat()]
+        return str(value)
+
+    @staticmethod
+    def _decode_header(value):
+        if isinstance(value, list):
+            type_name, text = value
+            return SheetSidecar.HEADER_TYPES[type_name].fromisoformat(text)
+        return value
+
+    @staticmethod
+    def _encode_column(values: List):
+        """单一类型列直接转换；混合类型列拆分为 {类型名: 子列} 结构体，每行只有对应类型的子列有值"""
+        types = {type(value) for value in values if value is not None}
+        if len(types) <= 1:
+            return pa.array(values, from_pandas=True)
+        children = {
+            value_type.__name__: pa.array([value if type(value) is value_type else None for value in values], from_pandas=True)
+            for value_type in types
+        }
+        return pa.StructArray.from_arrays(list(children.values()), names=list(children.keys()))
+
+    @staticmethod
+    def _decode_column(column) -> List:
+        if pa.types.is_struct(column.type):
+            return [
+                next((value for value in cell.values() if value is not None), None) if cell is not None else None
+                for cell in column.to_pylist()
+            ]
+        if pa.types.is_floating(column.type):
+            # 浮点列经pandas转换后空值为NaN，直接转为Python对象以保留None
+            return column.to_pylist()
+        series = column.to_pandas(integer_object_nulls=True, date_as_object=True, timestamp_as_object=True)
+        return series.astype(object).tolist()
+
+    @staticmethod
+    def _write_table(path: str, headers: List, rows: Iterable[Tuple]):
+        width = len(headers)
+        columns = [[None] * len(rows) for _ in range(width)]
+        for row_idx, row in enumerate(rows):
+            for col_idx in range(min(width, len(row))):
+                columns[col_idx][row_idx] = row[col_idx]
+        arrays = [SheetSidecar._encode_column(column) for column in columns]
+        table = pa.Table.from_arrays(arrays, names=[f"c{idx}" for idx in range(width)])
+        encoded_headers = [SheetSidecar._encode_header(header) for header in headers]
+        table = table.replace_schema_metadata({SheetSidecar.HEADERS_KEY: json.dumps(encoded_headers, ensure_ascii=False)})
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    @staticmethod
+    def write(source: str, sheets: Dict[str, Tuple[List, Iterable[Tuple]]], sheetnames: List[str] = None, merge: bool = True,
+              root: str = None):
+        """
+        为源文件写入工作表旁路文件
+        :param sheets: {工作表名称: (表头, 数据行)}，数据行不含表头
+        :param sheetnames: 源文件全部工作表名称（用于判断某个工作表是否存在）
+        :param merge: 源文件未变化时，保留已有旁路文件中的其他工作表
+        :param root: 旁路根目录（为空时使用 DEFAULT_DIR）
+        写入失败只记录日志，不影响调用方
+        """
+        if not SheetSidecar.available():
+            return
+        target_dir = SheetSidecar.sidecar_dir(source, root)
+        try:
+            manifest = SheetSidecar.read_manifest(source, root) if merge else None
+            if manifest is None:
+                shutil.rmtree(target_dir, ignore_errors=True)
+                manifest = {"sheets": {}}
+            os.makedirs(target_dir, exist_ok=True)
+            manifest["source"] = SheetSidecar._source_state(source)
+            if sheetnames is not None:
+                manifest["sheetnames"] = list(sheetnames)
+            for sheet_name, (headers, rows) in sheets.items():
+                file_name = manifest["sheets"].get(sheet_name) or f"sheet{len(manifest['sheets'])}.arrow"
+                # 已知行数的行集合（列表、RowStore）直接遍历，不再复制
+                rows = rows if isinstance(rows, Sized) else list(rows)
+                SheetSidecar._write_table(os.path.join(target_dir, file_name), list(headers), rows)
+                manifest["sheets"][sheet_name] = file_name
+            manifest.setdefault("sheetnames", list(manifest["sheets"]))
+            # 清单最后写入并原子替换：清单存在即代表旁路文件完整
+            fd, tmp_path = tempfile.mkstemp(dir=target_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            os.replace(tmp_path, os.path.join(target_dir, SheetSidecar.MANIFEST))
+            Logger.debug(f"🗂️ {Path(source).name} 已写入 {len(sheets)} 个工作表旁路文件")
+        except Exception as e:
+            Logger.debug(f"⚠️ 旁路文件写入失败: {Path(source).name} ({str(e)})")
+
+    @staticmethod
+    def load_values(source: str, sheet_name: str, manifest: Dict = None, root: str = None) -> Optional[Tuple[List, List[Tuple]]]:
+        """
+        读取工作表旁路文件（内存映射），返回 (表头, 数据行元组列表)
+        旁路文件不存在、已失效或读取失败时返回None
+        """
+        manifest = manifest or SheetSidecar.read_manifest(source, root)
+        if manifest is None or sheet_name not in manifest["sheets"]:
+            return None
+        path = os.path.join(SheetSidecar.sidecar_dir(source, root), manifest["sheets"][sheet_name])
+        try:
+            with pa.memory_map(path, "r") as source_map:
+                table = pa.ipc.open_file(source_map).read_all()
+                headers = [
+                    SheetSidecar._decode_header(header)
+                    for header in json.loads(table.schema.metadata[SheetSidecar.HEADERS_KEY])
+                ]
+                columns = [SheetSidecar._decode_column(column) for column in table.columns]
+            return headers, list(zip(*columns)) if columns else [()] * table.num_rows
+        except Exception as e:
+            Logger.debug(f"⚠️ 旁路文件读取失败: {path} ({str(e)})")
+            return None
+
+    @staticmethod
+    def load_frame(source: str, sheet_name: str, root: str = None) -> Optional[pd.DataFrame]:
+        """
+        以DataFrame形式读取工作表旁路文件，旁路文件不可用时返回None
+        与 pd.read_excel 结果一致：首行为列名，去掉末尾空行，经同一个TextParser推断列类型
+        """
+        loaded = SheetSidecar.load_values(source, sheet_name, root=root)
+        if loaded is None:
+            return None
+        headers, rows = loaded
+        data = [list(row) for row in rows]
+        while data and all(value in (None, "") for value in data[-1]):
+            data.pop()
+        return TextParser([list(headers)] + data, header=0).read()
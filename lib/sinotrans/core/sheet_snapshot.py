@@ -0,0 +1,57 @@
+from sinotrans.core.sheet_schema import SheetSchema
+from typing import List, Optional, Tuple
+
+
+class SheetSnapshot:
+    """
+    单个工作表的内存快照，一次解析、多次读取：
+    - schema: 编译后的工作表结构（表头→列序号、关键字段列序号）
+    - rows: 已清洗（字符串去空格、剔除全空行）的行值元组 [(值, ...), ...]，与表头等宽
+    - keys: 与rows一一对应的规范化关键字段元组（KeyIndex.normalize），表头缺少关键字段时为None
+    """
+    def __init__(self, title: str, schema: SheetSchema, rows: List[Tuple]):
+        self.title = title
+        self.schema = schema
+        self.headers = schema.headers
+        self.rows = rows
+        self.key_fields = schema.key_fields
+        self.keys: Optional[List[Tuple[str, ...]]] = None
+        if schema.key_indices is not None:
+            # 如果不用字符串格式存储和读取，就会发生丢数据，匹配更新失败的情况！
+            self.keys = [schema.key_of(row) for row in rows]
+
+    @property
+    def row_count(self) -> int:
+        """数据行数（不实现__len__，避免空快照被当作无效工作表）"""
+        return len(self.rows)
+
+    def has_fields(self, fields) -> bool:
+        """表头是否包含全部指定字段（替代重新读取首行的表头校验）"""
+        return self.schema.has_fields(fields)
+
+    def iter_rows(self, required_columns=None, strict_flag=True):
+        """
+        按必填列规则遍历快照，生成 (行序号, 行值元组)
+        过滤语义与 ExcelProcessor.excel_row_generator_skipping 保持一致：
+        严格模式：存在任一必填列缺失即跳过
+        宽松模式：仅当全部必填列缺失时跳过
+        """
+        required_indices = self.schema.required_indices(required_columns)
+        if not required_indices:
+            yield from enumerate(self.rows)
+            return
+        keeps = SheetSchema.keeps
+        for pos, row in enumerate(self.rows):
+            if keeps(row, required_indices, strict_flag):
+                yield pos, row
+
+    def has_rows(self, required_columns=None, strict_flag=True) -> bool:
+        """是否存在通过必填列校验的行"""
+        return next(self.iter_rows(required_columns, strict_flag), None) is not None
+
+    def iter_keyed_rows(self, required_columns=None, strict_flag=True):
+        """按必填列规则遍历快照，生成 (关键字段元组, 行值元组)"""
+        if self.keys is None:
+            raise KeyError(f"工作表 [{self.title}] 缺少关键字段: {self.key_fields}")
+        for pos, row in self.iter_rows(required_columns, strict_flag):
+            yield self.keys[pos], row
@@ -0,0 +1,92 @@
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.styles import Font, NamedStyle, PatternFill
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.indexed_list import IndexedList
+from typing import Callable, Dict
+
+
+def _build_header_style() -> NamedStyle:
+    header_style = NamedStyle(name=SheetStyler.HEADER_STYLE)
+    header_style.font = Font(name="Calibri", bold=True, color="FFFFFF")
+    header_style.fill = PatternFill(fill_type="solid", fgColor="4F81BD")
+    return header_style
+
+
+class SheetStyler:
+    """
+    声明式工作表样式：
+    - 共享样式注册表：命名样式按名称注册一次，工作簿内按名称引用，不再为每个单元格创建样式对象
+    - 表头样式、冻结窗格、列宽只涉及表头行/列，与数据行数无关
+    - 隔行填充使用条件格式（MOD(ROW(),2)=0），整个数据区域只需一条规则
+    - 数据单元格字体 Calibri 11：设置为工作簿默认字体（模板的默认字体为宋体 11），未单独设置字体的单元格都使用该字体，
+      不再逐个单元格设置；write-only新建的工作簿同样设置，两种输出方式的数据字体一致
+    """
+    HEADER_STYLE = "header_style"
+    BAND_COLOR = 'C8D7E9'
+    BAND_FORMULA = "MOD(ROW(),2)=0"
+    DEFAULT_COLUMN_WIDTH = 20
+    DATA_FONT = Font(name="Calibri", size=11)
+
+    # 样式注册表：{样式名称: 样式构建函数}
+    _registry: Dict[str, Callable[[], NamedStyle]] = {HEADER_STYLE: _build_header_style}
+
+    @staticmethod
+    def register_style(name: str, factory: Callable[[], NamedStyle]):
+        """注册命名样式，factory返回的NamedStyle名称须与name一致"""
+        SheetStyler._registry[name] = factory
+
+    @staticmethod
+    def ensure_named_style(wb, name: str = HEADER_STYLE) -> str:
+        """确保命名样式已添加到工作簿（NamedStyle只能绑定一个工作簿，每个工作簿构建一份），返回样式名称"""
+        if name not in wb.style_names:
+            if name not in SheetStyler._registry:
+                raise KeyError(f"未注册的样式: {name}")
+            wb.add_named_style(SheetStyler._registry[name]())
+        return name
+
+    @staticmethod
+    def apply_default_font(wb, font: Font = DATA_FONT):
+        """
+        将工作簿默认字体（字体表第0项，默认单元格格式及"常规"样式引用的字体）替换为font
+        openpyxl没有设置默认字体的公开接口，按序号重建字体表，已有单元格、命名样式引用的字体序号不变
+        """
+        if wb._fonts and wb._fonts[0] == font:
+            return
+        wb._fonts = IndexedList([font, *wb._fonts[1:]])
+        for style in wb._named_styles:
+            if style.builtinId == 0:
+                style.font = font
+
+    @staticmethod
+    def band_rule() -> FormulaRule:
+        """隔行填充的条件格式规则"""
+        fill = PatternFill(fill_type='solid', start_color=SheetStyler.BAND_COLOR, end_color=SheetStyler.BAND_COLOR)
+        return FormulaRule(formula=[SheetStyler.BAND_FORMULA], fill=fill)
+
+    @staticmethod
+    def apply_layout(ws, column_count: int, column_width=DEFAULT_COLUMN_WIDTH, freeze_panes="A2"):
+        """
+        设置冻结窗格和固定列宽（write-only模式下须在写入第一行之前调用）
+        column_width为None时不设置列宽
+        """
+        ws.freeze_panes = freeze_panes
+        if column_width is not None:
+            for col_idx in range(1, column_count + 1):
+                ws.column_dimensions[get_column_letter(col_idx)].width = column_width
+
+    @staticmethod
+    def apply_banding(ws, column_count: int, last_row: int):
+        """对数据区域（第2行至last_row）添加一条隔行填充条件格式"""
+        if column_count < 1 or last_row < 2:
+            return
+        ws.conditional_formatting.add(f"A2:{get_column_letter(column_count)}{last_row}", SheetStyler.band_rule())
+
+    @staticmethod
+    def apply(ws, column_width=DEFAULT_COLUMN_WIDTH, freeze_panes="A2", header_style: str = HEADER_STYLE):
+        """对已写入数据的普通工作表应用数据字体、表头样式、冻结窗格、列宽和隔行填充"""
+        SheetStyler.apply_default_font(ws.parent)
+        style_name = SheetStyler.ensure_named_style(ws.parent, header_style)
+        for cell in ws[1]:
+            cell.style = style_name
+        SheetStyler.apply_layout(ws, ws.max_column, column_width, freeze_panes)
+        SheetStyler.apply_banding(ws, ws.max_column, ws.max_row)
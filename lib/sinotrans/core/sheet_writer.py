@@ -0,0 +1,89 @@
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from sinotrans.core.sheet_style import SheetStyler
+from sinotrans.utils.logger import Logger
+from typing import Dict, Iterable, List
+import warnings
+
+
+class StreamingWorkbookWriter:
+    """
+    基于openpyxl write-only模式的流式输出写入器：
+    - 按模板工作表顺序创建输出工作表，复制模板表头并应用表头样式、冻结窗格、固定列宽
+    - 数据行逐行直接写入磁盘临时文件，内存占用与行数无关
+    - 隔行填充在保存时以一条条件格式规则覆盖整个数据区域
+    - 保存前任一环节失败，调用discard()丢弃即可，不会产生不完整的结果文件
+    注意：write-only模式下，列宽、冻结窗格等工作表属性必须在写入第一行之前设置
+    """
+    def __init__(self, template_file: str, target_file: str, header_style: str = SheetStyler.HEADER_STYLE,
+                 column_width: int = SheetStyler.DEFAULT_COLUMN_WIDTH, freeze_panes: str = "A2"):
+        self.target_file = target_file
+        self.wb = Workbook(write_only=True)
+        self._headers: Dict[str, List] = {}
+        self._sheets = {}
+        self._row_counts: Dict[str, int] = {}
+        self._header_style = None
+        SheetStyler.apply_default_font(self.wb)
+        if header_style is not None:
+            self._header_style = SheetStyler.ensure_named_style(self.wb, header_style)
+
+        # 读取模板所有工作表的表头
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # 忽略openpyxl的警告
+            template_wb = load_workbook(template_file, read_only=True)
+        try:
+            for sheet_name in template_wb.sheetnames:
+                header = next(template_wb[sheet_name].iter_rows(min_row=1, max_row=1, values_only=True), ())
+                # 去掉表头末尾的空列
+                header = list(header)
+                while header and header[-1] is None:
+                    header.pop()
+                self._headers[sheet_name] = header
+        finally:
+            template_wb.close()
+
+        for sheet_name, header in self._headers.items():
+            ws = self.wb.create_sheet(sheet_name)
+            SheetStyler.apply_layout(ws, len(header), column_width, freeze_panes)
+            ws.append([self._header_cell(ws, value) for value in header])
+            self._sheets[sheet_name] = ws
+            self._row_counts[sheet_name] = 0
+
+    def _header_cell(self, ws, value):
+        cell = WriteOnlyCell(ws, value=value)
+        if self._header_style is not None:
+            cell.style = self._header_style
+        return cell
+
+    def headers(self, sheet_name: str) -> List:
+        """获取输出工作表的表头（即模板表头）"""
+        return self._headers[sheet_name]
+
+    def write_rows(self, sheet_name: str, ordered_rows: Iterable[list]) -> int:
+        """
+        将排好序的行流式写入指定工作表
+        返回：本次写入的行数
+        """
+        ws = self._sheets[sheet_name]
+        count = 0
+        for row in ordered_rows:
+            ws.append(row)
+            count += 1
+        self._row_counts[sheet_name] += count
+        return count
+
+    def save(self):
+        """保存输出文件（write-only工作簿只能保存一次）"""
+        for sheet_name, ws in self._sheets.items():
+            # 表头占第1行，数据行号从2开始
+            SheetStyler.apply_banding(ws, len(self._headers[sheet_name]), self._row_counts[sheet_name] + 1)
+        self.wb.save(self.target_file)
+        Logger.debug(f"💾 流式写入完成: {self.target_file}，各表行数：{self._row_counts}")
+
+    def discard(self):
+        """放弃本次写入，关闭所有工作表的临时文件"""
+        for ws in self._sheets.values():
+            try:
+                ws.close()
+            except Exception as e:
+                Logger.debug(f"关闭工作表 {ws.title} 临时文件失败: {str(e)}")
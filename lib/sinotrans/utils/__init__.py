@@ -1,3 +1,4 @@
 from sinotrans.utils.logger import Logger
 from sinotrans.utils.global_thread_pool import GlobalThreadPool
-from sinotrans.utils.progress_manager import ProgressManager, ExcelProgressTracker
\ No newline at end of file
+from sinotrans.utils.progress_manager import ProgressManager, ExcelProgressTracker
+from sinotrans.utils.tracer import Tracer, Span
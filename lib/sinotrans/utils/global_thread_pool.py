@@ -3,12 +3,28 @@ from typing import Optional, Dict, Any
 import threading
 import concurrent.futures
 
+def _init_process_worker(debug_path, initializer, initargs):
+    """
+    进程池子进程初始化：子进程（spawn方式启动时）需要重新初始化日志系统，再执行用户自定义的初始化函数
+    必须定义在模块级别，保证可被pickle
+    """
+    if debug_path:
+        Logger(debug_path=debug_path)
+    if initializer:
+        initializer(*initargs)
+
 class GlobalThreadPool:
     """
     全局线程池管理器
+    支持两种执行后端：
+    - thread: 线程池（默认），适合IO密集型任务
+    - process: 进程池，适合openpyxl/BeautifulSoup解析等受GIL限制的CPU密集型任务
+      进程池要求提交的任务函数、参数和返回值都可以被pickle（模块级函数、静态方法、可pickle对象的绑定方法）
     """
+    BACKEND_THREAD = "thread"
+    BACKEND_PROCESS = "process"
     # 线程池实例
-    _executor: Optional[concurrent.futures.ThreadPoolExecutor] = None # 延迟初始化
+    _executor: Optional[concurrent.futures.Executor] = None # 延迟初始化
     # 锁对象，用于确保线程安全
     _lock = threading.Lock()
     # 线程池配置参数
@@ -16,7 +32,8 @@ class GlobalThreadPool:
         'max_workers': None,
         'thread_name_prefix': '',
         'initializer': None, # 初始化函数方法
-        'initargs': () # 初始化函数的参数
+        'initargs': (), # 初始化函数的参数
+        'backend': BACKEND_THREAD # 执行后端
     }
 
     @classmethod
@@ -25,33 +42,64 @@ class GlobalThreadPool:
         Logger.debug(f"尝试获取锁以初始化线程池，当前线程: {threading.current_thread().name}")
         try:
             with cls._lock:
-                if cls._executor is not None and not cls._executor._shutdown:
+                if cls._is_alive():
                     cls._executor.shutdown(wait=True)
                 
                 # 更新配置参数
-                valid_keys = {'max_workers', 'thread_name_prefix', 'initializer', 'initargs'}
+                valid_keys = {'max_workers', 'thread_name_prefix', 'initializer', 'initargs', 'backend'}
                 cls._config.update((k, v) for k, v in kwargs.items() if k in valid_keys)
                 
-                cls._executor = concurrent.futures.ThreadPoolExecutor(
-                    max_workers=cls._config['max_workers'],
-                    thread_name_prefix=cls._config['thread_name_prefix'],
-                    initializer=cls._config['initializer'],
-                    initargs=cls._config['initargs']
-                )
+                if cls._config['backend'] == cls.BACKEND_PROCESS:
+                    debug_path = getattr(Logger._instance, 'DEBUG_PATH', None)
+                    cls._executor = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=cls._config['max_workers'],
+                        initializer=_init_process_worker,
+                        initargs=(debug_path, cls._config['initializer'], cls._config['initargs'])
+                    )
+                elif cls._config['backend'] == cls.BACKEND_THREAD:
+                    cls._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=cls._config['max_workers'],
+                        thread_name_prefix=cls._config['thread_name_prefix'],
+                        initializer=cls._config['initializer'],
+                        initargs=cls._config['initargs']
+                    )
+                else:
+                    raise ValueError(f"❌ 不支持的执行后端: {cls._config['backend']}")
         finally:
             Logger.debug(f"释放锁，当前线程: {threading.current_thread().name}")
 
     @classmethod
-    def get_executor(cls) -> concurrent.futures.ThreadPoolExecutor:
-        """获取线程池实例，若没有则创建实例，延迟加载"""
-        if cls._executor is None or cls._executor._shutdown:
+    def get_executor(cls) -> concurrent.futures.Executor:
+        """获取线程池/进程池实例，若没有则创建实例，延迟加载"""
+        if not cls._is_alive():
             cls.initialize()
         return cls._executor
 
+    @classmethod
+    def use_backend(cls, backend: str) -> concurrent.futures.Executor:
+        """切换到指定执行后端并返回执行器；后端未变化且执行器仍可用时直接复用，不重新创建"""
+        if cls._config['backend'] != backend or not cls._is_alive():
+            cls.initialize(backend=backend)
+        return cls._executor
+
+    @classmethod
+    def _is_alive(cls) -> bool:
+        """执行器是否已创建且未关闭（线程池为_shutdown，进程池为_shutdown_thread）"""
+        if cls._executor is None:
+            return False
+        if isinstance(cls._executor, concurrent.futures.ProcessPoolExecutor):
+            return not cls._executor._shutdown_thread
+        return not cls._executor._shutdown
+
+    @classmethod
+    def is_process_backend(cls) -> bool:
+        """当前是否使用进程池后端（提交的任务需要可pickle）"""
+        return cls._config['backend'] == cls.BACKEND_PROCESS
+
     @classmethod
     def shutdown(cls, wait: bool = True) -> None: # 在声明类方法时没有写 cls 参数，Python 解释器会抛出异常
         """关闭线程池并释放资源"""
         with cls._lock:
-            if cls._executor and not cls._executor._shutdown:
+            if cls._is_alive():
                 cls._executor.shutdown(wait=wait)
                 cls._executor = None
\ No newline at end of file
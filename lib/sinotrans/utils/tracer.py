@@ -0,0 +1,199 @@
+from sinotrans.utils.logger import Logger
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+import functools
+import json
+import os
+import threading
+import time
+
+
+class Span:
+    """
+    一个计时区间：墙钟耗时、当前线程CPU耗时、处理行数、附加属性、子区间
+    """
+    __slots__ = ("name", "attrs", "rows", "thread", "start", "wall", "cpu", "children", "_cpu_start")
+
+    def __init__(self, name: str, attrs: Dict):
+        self.name = name
+        self.attrs = attrs
+        self.rows = 0
+        self.thread = threading.current_thread().name
+        self.start = time.time()
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.children: List["Span"] = []
+        self._cpu_start = 0.0
+
+    def add_rows(self, count: int):
+        """累加处理行数"""
+        self.rows += count
+
+    def set(self, **attrs):
+        """设置附加属性"""
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "thread": self.thread,
+            "start": self.start,
+            "wall": round(self.wall, 6),
+            "cpu": round(self.cpu, 6),
+            "rows": self.rows,
+            "attrs": {key: str(value) for key, value in self.attrs.items()},
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class Tracer:
+    """
+    流水线阶段计时：
+    - 上下文管理器：with Tracer.span("merge", sheet=sheet_name) as span: ... span.add_rows(n)
+    - 装饰器：@Tracer.trace("load_mappings")
+    - 区间可嵌套，每个线程维护自己的区间栈；提交到线程池的函数经 propagate() 包装后，其中的区间记录为提交方区间的子区间
+    - 运行结束后 write_report() 在调试日志旁写入JSON计时报告，print_summary() 在控制台输出按区间名称汇总的表格
+    - 每次 reset()（即每次运行开始）生成新的运行时间戳，同一进程中多次运行的计时报告不会互相覆盖
+    """
+    RUN_ID_FORMAT = "%Y%m%d_%H%M%S_%f"
+    _local = threading.local()
+    _lock = threading.Lock()
+    _roots: List[Span] = []
+    _run_id = datetime.now().strftime(RUN_ID_FORMAT)
+
+    @staticmethod
+    def _stack() -> List[Span]:
+        stack = getattr(Tracer._local, "stack", None)
+        if stack is None:
+            stack = Tracer._local.stack = []
+        return stack
+
+    @staticmethod
+    def reset():
+        """清空已记录的区间，开始新的一次运行（生成新的运行时间戳）"""
+        with Tracer._lock:
+            Tracer._roots = []
+            Tracer._run_id = datetime.now().strftime(Tracer.RUN_ID_FORMAT)
+
+    @staticmethod
+    def run_id() -> str:
+        """当前运行的时间戳（计时报告文件名使用）"""
+        return Tracer._run_id
+
+    @staticmethod
+    def current() -> Optional[Span]:
+        """当前线程正在计时的区间"""
+        stack = Tracer._stack()
+        return stack[-1] if stack else None
+
+    @staticmethod
+    def add_rows(count: int):
+        """为当前区间累加处理行数（当前线程没有区间时忽略）"""
+        span = Tracer.current()
+        if span is not None:
+            span.add_rows(count)
+
+    @staticmethod
+    @contextmanager
+    def span(name: str, **attrs):
+        """计时区间（上下文管理器）"""
+        stack = Tracer._stack()
+        span = Span(name, attrs)
+        if stack:
+            stack[-1].children.append(span)
+        else:
+            with Tracer._lock:
+                Tracer._roots.append(span)
+        stack.append(span)
+        wall_start = time.perf_counter()
+        span._cpu_start = time.thread_time()
+        try:
+            yield span
+        finally:
+            span.wall = time.perf_counter() - wall_start
+            span.cpu = time.thread_time() - span._cpu_start
+            stack.pop()
+
+    @staticmethod
+    def trace(name: str = None):
+        """计时装饰器，区间名称默认为函数名"""
+        def decorator(func):
+            span_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with Tracer.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def propagate(func):
+        """
+        将当前区间传递给在其他线程中执行的函数（提交到线程池前调用），函数内的区间记录为当前区间的子区间
+        """
+        parent = Tracer.current()
+        if parent is None:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack = Tracer._stack()
+            stack.append(parent)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stack.pop()
+        return wrapper
+
+    @staticmethod
+    def report() -> List[Dict]:
+        """所有根区间的计时树"""
+        with Tracer._lock:
+            return [span.to_dict() for span in Tracer._roots]
+
+    @staticmethod
+    def summary() -> List[Dict]:
+        """按区间名称汇总：次数、墙钟耗时、CPU耗时、行数（按首次出现顺序）"""
+        totals: Dict[str, Dict] = {}
+
+        def walk(span: Span):
+            item = totals.setdefault(span.name, {"name": span.name, "count": 0, "wall": 0.0, "cpu": 0.0, "rows": 0})
+            item["count"] += 1
+            item["wall"] += span.wall
+            item["cpu"] += span.cpu
+            item["rows"] += span.rows
+            for child in span.children:
+                walk(child)
+
+        with Tracer._lock:
+            for root in Tracer._roots:
+                walk(root)
+        return list(totals.values())
+
+    @staticmethod
+    def write_report(path: str = None) -> str:
+        """将计时报告写入JSON文件，默认与调试日志同目录：timing_<运行时间戳>.json"""
+        if path is None:
+            path = os.path.join(Logger().DEBUG_PATH, f"timing_{Tracer.run_id()}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"summary": Tracer.summary(), "spans": Tracer.report()}, f, ensure_ascii=False, indent=2)
+        Logger.debug(f"⏱️ 计时报告已保存: {path}")
+        return path
+
+    @staticmethod
+    def print_summary():
+        """控制台输出汇总表格"""
+        rows = Tracer.summary()
+        if not rows:
+            return
+        width = max(len("阶段"), *(len(row["name"]) for row in rows)) + 2
+        Logger.info(f"{'='*75}")
+        Logger.info(f"{'阶段':<{width}}{'次数':>6}{'墙钟(s)':>12}{'CPU(s)':>12}{'行数':>12}{'行/秒':>12}")
+        for row in rows:
+            rate = f"{row['rows'] / row['wall']:.0f}" if row["rows"] and row["wall"] else "-"
+            Logger.info(
+                f"{row['name']:<{width}}{row['count']:>6}{row['wall']:>12.3f}{row['cpu']:>12.3f}{row['rows']:>12}{rate:>12}"
+            )
+        Logger.info(f"{'='*75}")
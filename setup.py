@@ -10,4 +10,8 @@ setup(
         "openpyxl>=3.1.0",
         "plotly>=5.15.0",
     ],
+    extras_require={
+        "sidecar": ["pyarrow>=12.0.0"],
+        "test": ["pytest>=7.0"],
+    },
 )
\ No newline at end of file
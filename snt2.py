@@ -2,15 +2,18 @@ from datetime import datetime
 import os
 import sys
 import concurrent.futures
+import contextlib
+import functools
 import openpyxl
 from pathlib import Path
 from collections import defaultdict
 from openpyxl import load_workbook
-from sinotrans.core import FileProcessor, ExcelProcessor
-from sinotrans.utils import Logger, GlobalThreadPool, ExcelProgressTracker
+from sinotrans.core import FileProcessor, ExcelProcessor, SntMergeEngine, StreamingWorkbookWriter, SheetStyler, SheetSidecar, MappingPlan, RuleMemo, KeyIndex, RowStore, SheetSchema
+from sinotrans.utils import Logger, GlobalThreadPool, Tracer
 import warnings
 import traceback
 import threading
+import queue
 
 warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
 
@@ -24,16 +27,58 @@ class AutoSntProcessor:
     KEY_FIELDS = "key_fields"
     # 用于检验表中数据的有效性，通常和strice_flag配合使用
     REQUIRED_FIELDS = "required_fields"
-
-    def __init__(self):
+    # 读取引擎：row——逐行字典快照，逐行更新合并；columnar——列式DataFrame快照（向量化空行/必填列校验），哈希连接合并
+    ENGINE_ROW = "row"
+    ENGINE_COLUMNAR = "columnar"
+    # 进程池任务不传递的运行期数据（已解析的快照、输出缓冲），任务所需的快照切片作为参数单独传入
+    TRANSIENT_STATE = ("sheet_snapshots", "output_sheets")
+
+    def __init__(self, engine=ENGINE_ROW, pool_backend=GlobalThreadPool.BACKEND_THREAD, concurrent_sheets=False,
+                 streaming_output=False, parse_cache=True, sidecar=True, map_memo=False,
+                 streaming_merge=False, stream_chunk_size=1000, stream_queue_size=8, base_dir=None,
+                 sidecar_dir=None):
         # 初始化路径配置os.path.dirname(os.path.realpath(sys.executable))os.path.abspath(__file__)
+        if engine not in (self.ENGINE_ROW, self.ENGINE_COLUMNAR):
+            raise ValueError(f"❌ 不支持的读取引擎: {engine}")
+        if streaming_merge and engine != self.ENGINE_ROW:
+            raise ValueError("❌ 流式合并仅支持逐行引擎")
+        self.engine = engine
+        # 执行后端：thread——线程池；process——进程池（文件解析真正并行，不受GIL限制）
+        self.pool_backend = pool_backend
+        # 是否并发处理所有工作表（各表写入独立的行缓冲，最后一次性写入输出工作簿）
+        self.concurrent_sheets = concurrent_sheets
+        # 是否使用write-only流式写入输出文件（内存占用与行数无关）
+        self.streaming_output = streaming_output
+        # 是否使用本地解析缓存（未变化的文件/工作表直接加载缓存，不再重新解析）
+        self.parse_cache = parse_cache
+        # 是否为输入/输出工作簿生成列式旁路文件（需要pyarrow，未安装时自动关闭）
+        self.sidecar = sidecar and SheetSidecar.available()
+        # 旁路文件根目录，默认为工作目录下的 .cache/sidecar（不写入输入文件所在目录）
+        self.sidecar_dir = sidecar_dir
+        # 是否缓存字段映射结果（映射列取值种类少时减少重复的分割、四舍五入计算）
+        self.map_memo = map_memo
+        # 是否流式合并：只有snt基准数据常驻内存，res/report文件由读取线程逐个打开，有效行按块经有界队列送入合并
+        # 内存占用只取决于基准数据大小和 块大小×队列容量，与res/report文件数量无关
+        self.streaming_merge = streaming_merge
+        self.stream_chunk_size = stream_chunk_size
+        self.stream_queue_size = stream_queue_size
+        # 输出工作表数据 {工作表名称: (表头, 行数据)}，保存结果文件后写入旁路文件
+        self.output_sheets = {}
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.current_dir = os.path.dirname(os.path.abspath(__file__))
+        # 工作目录（conf/snt/res/report/target/template.xlsx所在目录），默认为脚本所在目录
+        self.current_dir = base_dir or os.path.dirname(os.path.abspath(__file__))
         self._init_paths()
         self._init_logger()
         self._init_thread_pool()
         self._init_styles()
 
+    def __getstate__(self):
+        """pickle时只保留配置（映射、关键字段、路径、开关等），提交到进程池的任务不携带全部快照"""
+        state = self.__dict__.copy()
+        for name in self.TRANSIENT_STATE:
+            state.pop(name, None)
+        return state
+
     def _init_paths(self):
         """初始化所有路径配置"""
         self.target_path = os.path.join(self.current_dir, "target")
@@ -41,6 +86,8 @@ class AutoSntProcessor:
         self.snt_path = os.path.join(self.current_dir, "snt")
         self.response_path = os.path.join(self.current_dir, "res")
         self.report_path = os.path.join(self.current_dir, "report")
+        self.cache_path = os.path.join(self.current_dir, ".cache", "parse")
+        self.sidecar_path = self.sidecar_dir or SheetSidecar.default_root(self.current_dir)
         
         self.template_file = os.path.join(self.current_dir, "template.xlsx")
         self.target_file = os.path.join(self.target_path, f"PendingPoSnt_{self.timestamp}.xlsx")
@@ -65,58 +112,18 @@ class AutoSntProcessor:
         """初始化全局线程池"""
         GlobalThreadPool.initialize(
             max_workers=16,
-            thread_name_prefix='AutoSNTThreadPool'
+            thread_name_prefix='AutoSNTThreadPool',
+            backend=self.pool_backend
         )
     def _init_styles(self):
-        """初始化Excel样式"""
-        self.header_style = openpyxl.styles.NamedStyle(name="header_style")
-        self.header_style.font = openpyxl.styles.Font(name="Calibri", bold=True, color="FFFFFF")
-        self.header_style.fill = openpyxl.styles.PatternFill(fill_type="solid", fgColor="4F81BD")
-        # self.header_style.alignment = openpyxl.styles.Alignment(horizontal="center", vertical="center")
+        """初始化Excel样式（表头样式由共享样式注册表按名称提供）"""
+        self.header_style = SheetStyler.HEADER_STYLE
+    @Tracer.trace("style")
     def _style_apply(self, output_ws):
-        output_ws.freeze_panes = "A2"
-        for cell in output_ws[1]:
-            cell.style = self.header_style
-        # 设置固定列宽（所有列宽度为15）
-        list(map(lambda col: setattr(output_ws.column_dimensions[col], 'width', 20), ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'AA', 'AB', 'AC']))
-        # 隔行填充背景色
-        fill = openpyxl.styles.PatternFill(fill_type='solid', start_color='C8D7E9', end_color='C8D7E9')
-        for row_num in range(2, output_ws.max_row + 1):  # 从第2行开始（第1行是表头）
-            if row_num % 2 == 0:
-                for col_num in range(1, output_ws.max_column + 1):
-                    cell = output_ws.cell(row=row_num, column=col_num)
-                    cell.fill = fill
-                    cell.font = openpyxl.styles.Font(name='Calibri', size=11)
-            else:
-                for col_num in range(1, output_ws.max_column + 1):
-                    cell = output_ws.cell(row=row_num, column=col_num)
-                    cell.font = openpyxl.styles.Font(name='Calibri', size=11)
-
+        """表头样式、冻结窗格、固定列宽、隔行填充（条件格式），耗时与数据行数无关"""
+        SheetStyler.apply(output_ws, column_width=20)
 
-    def _thread_safe_process_sheet(self, sheet_name, template_wb):
-        """线程安全的工作表处理方法"""
-        try:
-            # 创建临时工作簿副本
-            thread_wb = openpyxl.Workbook()
-            template_ws = template_wb[sheet_name]
-            new_ws = thread_wb.create_sheet(sheet_name)
-            
-            # 复制表头
-            for row in template_ws.iter_rows():
-                new_ws.append([cell.value for cell in row])
-            
-            # 执行实际处理（操作临时工作簿）
-            success = self._process_single_sheet(sheet_name, thread_wb)
-            
-            # 提取处理后的数据
-            processed_data = []
-            for row in new_ws.iter_rows(min_row=2):  # 跳过标题行
-                processed_data.append([cell.value for cell in row])
-                
-            return (success, processed_data)
-        except Exception as e:
-            Logger.error(f"线程处理异常: {traceback.format_exc()}")
-            return (False, None)
+    @Tracer.trace("load_mappings")
     def _load_mappings(self):
         """加载所有映射配置"""
         try:
@@ -137,35 +144,64 @@ class AutoSntProcessor:
             Logger.error(f"❌ 映射文件加载失败: {str(e)}")
             raise
 
+    @Tracer.trace("validate_input_files")
     def _validate_input_files(self):
         """验证输入文件完整性"""
         try:
-            self.snt_files = FileProcessor.read_files(self.snt_path, [".xlsx", ".xls"])
-            self.response_files = FileProcessor.read_files(self.response_path, [".xlsx", ".xls"])
-            self.report_files = FileProcessor.read_files(self.report_path, [".xlsx", ".xls"])
+            # 文件按名称排序，保证合并优先级确定：同一文件夹内，排序靠后的文件覆盖靠前的文件
+            self.snt_files = sorted(FileProcessor.read_files(self.snt_path, [".xlsx", ".xls"]))
+            self.response_files = sorted(FileProcessor.read_files(self.response_path, [".xlsx", ".xls"]))
+            self.report_files = sorted(FileProcessor.read_files(self.report_path, [".xlsx", ".xls"]))
 
-            # 校验所有文件的工作表结构
+            # 校验所有文件的工作表结构，并一次性解析为内存快照
+            # 流式合并时只解析snt基准文件，res/report文件在合并阶段按优先级顺序逐个流式读取
             all_files = self.snt_files + self.response_files + self.report_files
-            # 预设模板文件检查（保持严格校验）
-            self.sheet_maps = ExcelProcessor.get_excel_sheets(
-                file_paths=all_files,
-                preset_sheets=self.sheet_names,  # 用于生成警告信息
-                read_only=True,
-                verbose=False
-            )
+            if self.streaming_merge:
+                self.stream_files = self.response_files + self.report_files
+                all_files = self.snt_files
+            self._ingest_input_files(all_files)
             Logger.info("✅ 文件验证通过")
         except Exception as e:
             Logger.error(f"❌ 文件验证失败: {str(e)}")
             raise
 
+    def _ingest_input_files(self, all_files):
+        """
+        读取阶段：每个输入工作簿只解析一次，将需要的工作表（目标表+回退表）生成内存快照
+        self.sheet_snapshots结构：{文件绝对路径: {工作表名称: SheetSnapshot}}
+        后续每个工作表的处理都只读取快照，不再重复解析XML
+        列式引擎下快照为SheetFrame，与SheetSnapshot接口一致，合并逻辑可直接使用
+        解析任务为可pickle的静态方法，进程池后端下各文件在独立进程中并行解析，快照通过pickle传回主进程
+        启用解析缓存时，内容未变化的文件直接从缓存加载，变化的文件只重新解析CRC发生变化的工作表
+        """
+        load_snapshots = functools.partial(
+            ExcelProcessor.load_sheet_snapshots,
+            sheet_names=self.sheet_names + self.default_fallback_sheets,
+            key_fields=self.key_fields,
+            columnar=self.engine == self.ENGINE_COLUMNAR,
+            cache_dir=self.cache_path if self.parse_cache else None,
+            sidecar_dir=self.sidecar_path if self.sidecar else None
+        )
+        self.sheet_snapshots = {}
+        with Tracer.span("ingest", files=len(all_files)) as span:
+            # 全局执行器在整个流程中复用，由_run_pipeline结束时统一关闭
+            executor = GlobalThreadPool.get_executor()
+            results = list(executor.map(load_snapshots, all_files))
+            # 按输入文件顺序保存，保证后续文件优先级稳定
+            for abs_path, snapshots in results:
+                if snapshots is not None:
+                    self.sheet_snapshots[abs_path] = snapshots
+                    span.add_rows(sum(snapshot.row_count for snapshot in snapshots.values()))
+        Logger.info(f"📸 已解析 {len(self.sheet_snapshots)} 个文件的工作表快照")
+
     def _get_valid_sheet(self, file_sheets, sheet_name):
         """
         动态获取有效工作表
         参数：
-        file_sheets: 工作表字典
+        file_sheets: 工作表快照字典
         sheet_name: 目标工作表名
         返回值：
-        - 工作表对象
+        - 工作表快照
         - 是否有使用回退表
         - 使用的回退表名
         """
@@ -182,12 +218,10 @@ class AutoSntProcessor:
         
         return None, None, None
 
-    def _validate_sheet_headers(self, worksheet):
+    def _validate_sheet_headers(self, snapshot):
         """验证工作表表头是否包含关键字段"""
         try:
-            # 读取首行作为表头
-            header_row = next(worksheet.iter_rows(min_row=1, max_row=1, values_only=True))
-            return all(field in header_row for field in self.key_fields)
+            return snapshot.has_fields(self.key_fields)
         except Exception as e:
             Logger.error(f"表头验证失败: {str(e)}")
             return False
@@ -224,229 +258,636 @@ class AutoSntProcessor:
     #         base_data[key].update(ExcelProcessor.column_mapping(row, column_mapping))
     #         # Logger.info(f"更新 {key} 的 {column_mapping} 列")
     #     return has_valid_data
-    def _process_single_row(self, input_ws, fp, snt_data, base_data, column_mapping, data_lock=None):
-        """处理单个工作表的行数据（线程安全版本）"""
-        # 获取当前有效工作表的行生成器
+    def _process_single_row(self, input_ws, fp, key_index, partial, column_mapping, headers):
+        """处理单个工作表快照的行数据，映射结果写入当前文件任务独立的局部更新集（不涉及共享数据，无需加锁）"""
+        # 从快照读取当前有效工作表的行值元组，关键字段元组已在读取阶段生成
+        # 映射配置按工作表结构和模板表头编译为执行计划，映射结果按基准行号、模板列写入局部更新集
+        plan = MappingPlan.compile(column_mapping, input_ws.schema, headers)
         count = 0
-        data_gen = ExcelProcessor.excel_row_generator_skipping(
-            input_ws,
-            fp,
-            None,
-            self.required_fields,
-            strict_flag=False
-        )
+        total = 0
+        data_gen = input_ws.iter_keyed_rows(self.required_fields, strict_flag=False)
         
         has_valid_data = False
-        for row in data_gen:
+        for key, row in data_gen:
             has_valid_data = True
-            # 如果不用字符串格式存储和读取，就会发生丢数据，匹配更新失败的情况！
-            key = tuple(str(row[field]) for field in self.key_fields)
-            if key not in snt_data:
+            total += 1
+            # 按规范化的关键字段元组查找基准行号，之后只按行号访问基准行
+            row_id = key_index.get(key)
+            if row_id is None:
                 Logger.debug(f"未找到匹配项: {key}，跳过更新")
                 continue
-            
-            # 使用锁保护共享数据的更新操作
-            if data_lock:
-                with data_lock:
-                    base_data[key].update(ExcelProcessor.column_mapping(row, column_mapping))
-            else:
-                # 非并发场景下的原始逻辑
-                base_data[key].update(ExcelProcessor.column_mapping(row, column_mapping))
+            plan.apply_to(row, partial, row_id)
             count += 1 
 
         Logger.debug(f"{fp} 更新 {count} 行数据")
+        Tracer.add_rows(total)
         return has_valid_data
     
-    def _process_single_file(self, sheets_wb_map, sheet_name, fp, snt_data, base_data, column_mapping, data_lock):
+    def _process_single_file(self, sheets_wb_map, sheet_name, fp, key_index, column_mapping, headers):
         """
-        并发处理单个文件的数据，并安全地更新共享的 base_data 字典。
+        并发处理单个文件的数据，生成该文件独立的局部更新集（map阶段），由 _reduce_partials 按文件顺序归并到 base_data。
 
         参数:
-        - sheets_wb_map (dict): self.sheet_maps[fp]，值为 Worksheet 对象。
+        - sheets_wb_map (dict): self.sheet_snapshots[fp]，值为 SheetSnapshot 对象。
         - sheet_name (str): 需要处理的目标工作表名称。
         - fp (str): 文件路径。
-        - snt_data (dict): 基准数据（来自 SNT 文件），用于匹配关键字段。
-        - base_data (dict): 共享字典，用于存储最终合并后的数据，key 为 key_fields 的元组。
+        - key_index (KeyIndex): 基准数据（来自 SNT 文件）的关键字段索引，用于匹配关键字段、获取基准行号（只读）。
         - column_mapping (dict): 列映射配置，用于将输入列与目标列对齐。
-        - data_lock (threading.Lock): 线程锁对象，确保多线程环境下对 base_data 的安全访问。
+        - headers (list): 模板表头，映射配置按其编译为执行计划。
 
         返回值:
-        - None: 结果直接写入 base_data。
+        - RowStore: 局部更新集（只包含本文件写入的单元格，可pickle）；文件中无有效工作表时返回None。
 
         异常处理:
-        - 如果处理过程中发生错误，会记录日志但不会中断主线程。
+        - 如果处理过程中发生错误，记录日志后重新抛出原始异常，由归并阶段获取结果时抛出。
         
         日志输出:
         - 如果找不到有效工作表或未找到有效数据，会记录警告信息。
         """
         try:
-            # 获取有效工作表(如果找不到Sheet_name，则使用默认回退表)
-            input_ws, is_defalut_sheet, rollback_sheet_name = self._get_valid_sheet(sheets_wb_map, sheet_name)
-            if not input_ws:
-                Logger.error(f"🛑 文件 {Path(fp).name} 无有效工作表")
-                return
-                
-            # 调用原有的行处理方法（线程安全版本）
-            roll_back = not self._process_single_row(input_ws, fp, snt_data, base_data, column_mapping, data_lock)
-            
-            # 若表中无数据，且使用的不是默认表，则尝试获取默认表数据
-            if not is_defalut_sheet and roll_back:
-                has_valid_data = False
-                # 获取默认表
-                for default_sheet_name in self.default_fallback_sheets:
-                    input_ws, is_defalut_sheet, rollback_sheet_name = self._get_valid_sheet(sheets_wb_map, default_sheet_name)
-                    # 默认表名有效——input_ws有值且is_defalut_sheet为false
-                    if input_ws and not is_defalut_sheet and self._validate_sheet_headers(input_ws):
-                        Logger.info(f"🛑 文件{fp}⏩ 使用回退表 [{default_sheet_name}]")
-                        # 不短路
-                        has_valid_data = has_valid_data | self._process_single_row(
-                            input_ws, fp, snt_data, base_data, column_mapping, data_lock
-                        )
-                if not has_valid_data:
-                    # 存在业务场景，sheet_name就是没有业务数据，也不存在默认表
-                    Logger.info(f"⚠️ 文件{fp}:【{sheet_name}】中无有效数据")
+            with Tracer.span("process_file", file=Path(fp).name, sheet=sheet_name):
+                # 获取需要合并的工作表(如果找不到Sheet_name或无有效数据，则使用默认回退表)
+                input_sheets = self._resolve_source_sheets(sheets_wb_map, sheet_name, fp)
+                if input_sheets is None:
+                    return None
 
-            elif is_defalut_sheet and not roll_back:
-                Logger.info(f"🛑 文件{fp}⏩ 使用回退表 [{rollback_sheet_name}]")
+                # 同一文件内按工作表顺序写入，后写入的覆盖先写入的
+                partial = RowStore(headers, len(key_index))
+                for input_ws in input_sheets:
+                    self._process_single_row(input_ws, fp, key_index, partial, column_mapping, headers)
 
             Logger.info(f"✅ 文件{fp}⏩ 更新完成")
+            return partial
         except Exception as e:
             Logger.error(f"处理文件 {fp} 时发生错误: {str(e)}")
-            raise RuntimeError ("测试")
+            raise
+
+    @staticmethod
+    def _reduce_partials(base_data, partials):
+        """
+        reduce阶段：按文件优先级顺序（即partials的顺序）依次将局部更新集归并到 base_data，靠后的文件覆盖靠前的文件
+        归并顺序固定，结果与线程调度无关；归并后的局部更新集即可释放
+        """
+        for partial in partials:
+            if partial is not None:
+                base_data.merge(partial)
+        # 写入较多的稀疏列转为稠密列表
+        base_data.compact()
+
+    def _resolve_source_sheets(self, sheets_wb_map, sheet_name, fp):
+        """
+        解析单个文件中需要合并的工作表快照（按合并顺序排列）
+        - 目标表存在且有有效数据：[目标表]
+        - 目标表存在但无有效数据：所有表头有效的默认回退表
+        - 目标表不存在：第一个表头有效的默认回退表
+        返回值：
+        - 工作表快照列表；文件中无有效工作表时返回None
+        """
+        # 获取有效工作表(如果找不到Sheet_name，则使用默认回退表)
+        input_ws, is_defalut_sheet, rollback_sheet_name = self._get_valid_sheet(sheets_wb_map, sheet_name)
+        if not input_ws:
+            Logger.error(f"🛑 文件 {Path(fp).name} 无有效工作表")
+            return None
+
+        roll_back = not input_ws.has_rows(self.required_fields, strict_flag=False)
+        if is_defalut_sheet:
+            if not roll_back:
+                Logger.info(f"🛑 文件{fp}⏩ 使用回退表 [{rollback_sheet_name}]")
+            return [input_ws]
+        if not roll_back:
+            return [input_ws]
 
+        # 若表中无数据，且使用的不是默认表，则尝试获取默认表数据
+        fallback_sheets = []
+        for default_sheet_name in self.default_fallback_sheets:
+            input_ws, is_defalut_sheet, rollback_sheet_name = self._get_valid_sheet(sheets_wb_map, default_sheet_name)
+            # 默认表名有效——input_ws有值且is_defalut_sheet为false
+            if input_ws and not is_defalut_sheet and self._validate_sheet_headers(input_ws):
+                Logger.info(f"🛑 文件{fp}⏩ 使用回退表 [{default_sheet_name}]")
+                fallback_sheets.append(input_ws)
+        if not any(ws.has_rows(self.required_fields, strict_flag=False) for ws in fallback_sheets):
+            # 存在业务场景，sheet_name就是没有业务数据，也不存在默认表
+            Logger.info(f"⚠️ 文件{fp}:【{sheet_name}】中无有效数据")
+        return fallback_sheets
+
+    def _sheet_slice(self, sheets_wb_map, sheet_name):
+        """
+        单个文件中处理 sheet_name 时用到的工作表快照，作为进程池任务的参数：
+        目标表有有效数据时只包含目标表，否则再加上默认回退表（与 _resolve_source_sheets 的选择规则一致）
+        """
+        snapshot = sheets_wb_map.get(sheet_name)
+        if snapshot is not None and snapshot.has_rows(self.required_fields, strict_flag=False):
+            return {sheet_name: snapshot}
+        wanted = {sheet_name, *self.default_fallback_sheets}
+        return {name: snapshot for name, snapshot in sheets_wb_map.items() if name in wanted}
+
+    def _sheet_snapshots_for(self, sheet_name):
+        """处理 sheet_name 时用到的所有文件的快照切片 {文件绝对路径: {工作表名称: 快照}}，保持文件顺序"""
+        return {fp: self._sheet_slice(sheets_wb_map, sheet_name) for fp, sheets_wb_map in self.sheet_snapshots.items()}
+
+    def _get_snt_file(self):
+        """获取snt文件夹下的基准文件（取第一个）"""
+        snt_file = next((fp for fp in self.sheet_snapshots.keys() if self._get_folder_type(fp) == os.path.basename(self.snt_path)), None)
+        if not snt_file:
+            raise RuntimeError(f"未找到{self.snt_path}文件夹下的基准文件")
+        return snt_file
+
+    def _get_folder_sources(self, snt_file):
+        """将sheet_snapshots——{fp_path:sheet_name:snapshot}中的fp按文件夹分类，返回 {文件夹类型: [文件路径, ...]}"""
+        folder_sources = defaultdict(list)
+        for fp in self.sheet_snapshots.keys():
+            if fp == snt_file:
+                continue
+            folder_sources[self._get_folder_type(fp)].append(fp)
+        return folder_sources
+
+    def _get_column_mapping(self, folder):
+        """获取文件夹对应的列映射配置"""
+        column_mapping = self.response_mapping if folder == 'res' else (self.report_mapping if folder == 'report' else None)
+        # column_mapping =  self.response_mapping if folder == 'res' # TODO 扩充至report_mapping
+        if not column_mapping:
+            raise RuntimeError (f"⚠️ 未找到 [{folder}] 的列映射配置")
+        return column_mapping
+
+    @Tracer.trace("load_snt_data")
     def _load_snt_data(self, sheet_name, headers):
         """
-        将snt当前sheet_name数据存在关键字段keys——用于联系数据，的行写入内存{key_tuple,row}，并生成snt_map和fix_map映射后的结果数据base_data
+        将snt当前sheet_name数据中存在关键字段keys——用于联系数据，的行登记到关键字段索引（关键字段元组→行号），
+        并生成snt_map和fix_map映射后的结果数据base_data（RowStore，按行号、模板列组织）
         """
         try:
-            snt_file = next((fp for fp in self.sheet_maps.keys() if self._get_folder_type(fp) == os.path.basename(self.snt_path)), None)
-            if not snt_file:
-                raise RuntimeError(f"未找到{self.snt_path}文件夹下的基准文件")
-
-            snt_data = {}
-            base_data = {}
-            progress = ExcelProgressTracker()
-            snt_ws = self.sheet_maps[snt_file][sheet_name]
-            snt_gen = ExcelProcessor.excel_row_generator(
-                snt_ws,
-                snt_file,
-                progress,
-                self.key_fields,
-                strict_flag=False
-            )
-            for row in snt_gen:
-                # 如果不用字符串格式存储和读取，就会发生丢数据，匹配更新失败的情况！
-                key = tuple(str(row[field]) for field in self.key_fields)
-                if key in snt_data:
+            snt_file = self._get_snt_file()
+            key_index = KeyIndex()
+            snt_rows = []
+            snt_snapshot = self.sheet_snapshots[snt_file][sheet_name]
+            for key, row in snt_snapshot.iter_keyed_rows(self.key_fields, strict_flag=False):
+                row_id, is_new = key_index.add(key)
+                if is_new:
+                    snt_rows.append(row)
+                else:
                     Logger.info(f"⚠️ 发现重复基准数据: {key}")
-                snt_data[key] = row
-
-            for key, snt_row in snt_data.items():
-                # 获取目标列格式——也就是模板列格式
-                base_row = {header: '' for header in headers}
-                base_row.update(ExcelProcessor.fixed_mapping(self.fixed_mapping))
-                base_row.update(ExcelProcessor.column_mapping(snt_row, self.snt_mapping))
-                base_data[key] = base_row
+                    snt_rows[row_id] = row
+
+            # 获取目标列格式——也就是模板列格式，固定映射作为各列默认值，不再逐行展开
+            template_row = MappingPlan.template_row(headers, self.fixed_mapping)
+            plan = MappingPlan.compile(self.snt_mapping, snt_snapshot.schema, headers)
+            base_data = RowStore(headers, len(snt_rows), template_row)
+            # 基准映射几乎写入每一行，目标列直接使用稠密列表
+            base_data.densify(plan.dest_columns())
+            for row_id, snt_row in enumerate(snt_rows):
+                plan.apply_to(snt_row, base_data, row_id)
                 
-            progress.close()
-            Logger.info(f"📥 已加载 {len(snt_data)} 条有效基准数据")
-            return snt_file, snt_data, base_data
+            Logger.info(f"📥 已加载 {len(key_index)} 条有效基准数据")
+            Tracer.add_rows(len(key_index))
+            return snt_file, key_index, base_data
         except Exception as e:
             raise RuntimeError (f"❌ 内存加载{snt_file}基准数据失败: {str(e)}")
 
+    def _merge_sheet_rows(self, sheet_name, headers):
+        """
+        逐行引擎：各文件并发生成局部更新集，按文件顺序归并到base_data，返回按模板表头顺序迭代的行存储（RowStore）
+        线程池、进程池后端下文件任务都并行执行（进程池中不记录计时区间）；工作表并发模式下按文件顺序执行
+        """
+        snt_file, key_index, base_data = self._load_snt_data(sheet_name, headers)
+        folder_sources = self._get_folder_sources(snt_file)
+
+        # 所有文件夹
+        for folder, fps in folder_sources.items():
+            Logger.info(f"🔄 正在处理 [{folder}] 文件夹内数据...")
+            column_mapping = self._get_column_mapping(folder)
+
+            # map：每个文件任务生成独立的局部更新集，不共享base_data，无需加锁
+            # reduce：按文件顺序（同一文件夹内按文件名排序）归并，结果与线程调度无关
+            # 工作表并发模式下，并行度已在工作表层面，文件按顺序执行，避免嵌套使用全局线程池/进程池
+            if self.concurrent_sheets:
+                self._reduce_partials(base_data, (
+                    self._process_single_file(self.sheet_snapshots[fp], sheet_name, fp, key_index, column_mapping, headers)
+                    for fp in fps
+                ))
+                continue
+
+            # 使用全局线程池/进程池并发处理文件
+            # 进程池后端提交模块级任务函数，只传递处理器配置、该文件的工作表切片和关键字段索引，局部更新集经pickle传回
+            # 复用全局执行器，不在每个文件夹/工作表结束时关闭（进程池后端避免重复创建子进程）
+            executor = GlobalThreadPool.get_executor()
+            if GlobalThreadPool.is_process_backend():
+                futures = [
+                    executor.submit(
+                        _process_file_task,
+                        self,
+                        self._sheet_slice(self.sheet_snapshots[fp], sheet_name),
+                        sheet_name,
+                        fp,
+                        key_index,
+                        column_mapping,
+                        headers
+                    )
+                    for fp in fps
+                ]
+            else:
+                futures = [
+                    executor.submit(
+                        Tracer.propagate(self._process_single_file), 
+                        self.sheet_snapshots[fp], 
+                        sheet_name, 
+                        fp, 
+                        key_index, 
+                        column_mapping, 
+                        headers
+                        ) 
+                        for fp in fps
+                        ]
+            # 按提交顺序归并（获取结果时触发可能的异常），靠前的文件完成后即可归并，不必等待全部任务
+            self._reduce_partials(base_data, (future.result() for future in futures))
+
+        # 行存储按模板列顺序迭代输出
+        return base_data
+
+    @Tracer.trace("load_snt_data")
+    def _load_snt_baseline(self, sheet_name, headers):
+        """列式引擎：以snt当前sheet_name数据建立合并引擎的基准表"""
+        snt_file = self._get_snt_file()
+        merge_engine = SntMergeEngine(self.key_fields, headers, self.fixed_mapping, self.snt_mapping)
+        snt_frame = self.sheet_snapshots[snt_file][sheet_name].filtered(self.key_fields, strict_flag=False)
+        count = merge_engine.load_baseline(snt_frame, snt_file)
+        Logger.info(f"📥 已加载 {count} 条有效基准数据")
+        Tracer.add_rows(count)
+        return snt_file, merge_engine
+
+    def _merge_sheet_frames(self, sheet_name, headers):
+        """
+        列式引擎：基准数据与所有res/report数据按关键字段做一次哈希连接，返回按模板表头顺序迭代的行存储（RowStore）
+        合并优先级：res < report，同一文件夹内按文件名排序，靠后的覆盖靠前的
+        """
+        snt_file, merge_engine = self._load_snt_baseline(sheet_name, headers)
+        for folder, fps in self._get_folder_sources(snt_file).items():
+            Logger.info(f"🔄 正在处理 [{folder}] 文件夹内数据...")
+            column_mapping = self._get_column_mapping(folder)
+            for fp in fps:
+                with Tracer.span("process_file", file=Path(fp).name, sheet=sheet_name) as span:
+                    input_sheets = self._resolve_source_sheets(self.sheet_snapshots[fp], sheet_name, fp)
+                    if input_sheets is None:
+                        continue
+                    for input_ws in input_sheets:
+                        frame = input_ws.filtered(self.required_fields, strict_flag=False)
+                        merge_engine.add_source(frame, column_mapping, f"{fp}[{input_ws.title}]")
+                        span.add_rows(len(frame))
+                Logger.info(f"✅ 文件{fp}⏩ 更新完成")
+
+        with Tracer.span("hash_join"):
+            merge_engine.merge()
+        return merge_engine.row_store()
+
+    def _build_sheet_rows(self, sheet_name, headers):
+        """合并单个工作表的数据，返回按模板表头顺序迭代的行存储（RowStore，独立的行缓冲，不操作输出工作簿）"""
+        Logger.info(f"{'='*75}")
+        Logger.info(f"🔨 开始处理工作表 [{sheet_name}]")
+        with Tracer.span("merge_sheet", sheet=sheet_name) as span:
+            if self.engine == self.ENGINE_COLUMNAR:
+                ordered_rows = self._merge_sheet_frames(sheet_name, headers)
+            else:
+                ordered_rows = self._merge_sheet_rows(sheet_name, headers)
+            span.add_rows(len(ordered_rows))
+        return ordered_rows
+
+    def _get_output_headers(self, output_wb, sheet_name):
+        """获取输出工作表的表头（模板表头）"""
+        if self.streaming_output:
+            return output_wb.headers(sheet_name)
+        return [cell.value for cell in output_wb[sheet_name][1]]
+
+    def _write_sheet_rows(self, output_wb, sheet_name, ordered_rows):
+        """将排好序的行写入输出工作表，并设置格式（流式写入时样式在写入过程中完成）"""
+        if self.sidecar:
+            self.output_sheets[sheet_name] = (self._get_output_headers(output_wb, sheet_name), ordered_rows)
+        with Tracer.span("write_sheet", sheet=sheet_name) as span:
+            span.add_rows(len(ordered_rows))
+            if self.streaming_output:
+                output_wb.write_rows(sheet_name, ordered_rows)
+                return
+            output_ws = output_wb[sheet_name]
+            list(map(lambda row: output_ws.append(row), ordered_rows))
+            # 格式设置
+            self._style_apply(output_ws)
+
     def _process_single_sheet(self, sheet_name, output_wb):
         """处理单个工作表"""
         try:
-            # 获取当前sheet_name工作表的输出句柄、表头列表，用于后续处理
-            output_ws = output_wb[sheet_name]
-            headers = [cell.value for cell in output_ws[1]]
-            Logger.info(f"{'='*75}")
-            Logger.info(f"🔨 开始处理工作表 [{sheet_name}]")
-            snt_file, snt_data, base_data = self._load_snt_data(sheet_name, headers)
-
-            # 将sheet_maps——{fp_path:sheet_name:wb}中的fp按文件夹分类
-            folder_sources = defaultdict(list)
-            for fp in self.sheet_maps.keys():
-                if fp == snt_file:
-                    continue
-                folder_sources[self._get_folder_type(fp)].append(fp)
-
-            # 所有文件夹
-            for folder, fps in folder_sources.items():
-                Logger.info(f"🔄 正在处理 [{folder}] 文件夹内数据...")
-                column_mapping = self.response_mapping if folder == 'res' else (self.report_mapping if folder == 'report' else None)
-                # column_mapping =  self.response_mapping if folder == 'res' # TODO 扩充至report_mapping
-                if not column_mapping:
-                    raise RuntimeError (f"⚠️ 未找到 [{folder}] 的列映射配置")
-
-                # 使用线程池并发处理文件
-                data_lock = threading.Lock()
-                with GlobalThreadPool.get_executor() as executor:
-                    futures = [
-                        executor.submit(
-                            self._process_single_file, 
-                            self.sheet_maps[fp], 
-                            sheet_name, 
-                            fp, 
-                            snt_data, 
-                            base_data, # 共享变量，线程安全
-                            column_mapping, 
-                            data_lock
-                            ) 
-                            for fp in fps
-                            ]
-                
-                done, not_done = concurrent.futures.wait(futures, timeout = 60)
+            # 获取当前sheet_name工作表的表头列表，用于后续处理
+            headers = self._get_output_headers(output_wb, sheet_name)
+            ordered_rows = self._build_sheet_rows(sheet_name, headers)
 
-                # 等待所有任务完成
-                for future in futures:
-                    future.result()  # 获取结果，触发可能的异常
-                    
             # ----------------------------
             # 阶段三：写入最终数据
             # ----------------------------
-            # 排序按表头排序
-            headers = [cell.value for cell in output_ws[1]]
-            ordered_rows = ExcelProcessor.sort_generated_rows(base_data.values(), headers)
-            list(map(lambda row: output_ws.append(row), ordered_rows))
-            # 格式设置
-            self._style_apply(output_ws)
-            Logger.info(f"✅ 工作表 [{sheet_name}] 处理完成，共更新 {len(base_data.values())} 行数据")
+            self._write_sheet_rows(output_wb, sheet_name, ordered_rows)
+            Logger.info(f"✅ 工作表 [{sheet_name}] 处理完成，共更新 {len(ordered_rows)} 行数据")
             return True
 
         except Exception as e:
             Logger.error(f"❌ 工作表 [{sheet_name}] 处理失败: {str(e)}")
             Logger.debug(f"{traceback.format_exc()}")
             return False
+
+    def _process_sheets_concurrently(self, output_wb):
+        """
+        并发处理所有工作表：各表并行合并到独立的行缓冲，全部完成后按配置顺序一次性写入输出工作簿
+        - 线程池后端：使用独立的线程池（不占用全局线程池，避免嵌套提交导致死锁）
+        - 进程池后端：使用全局进程池，各表真正并行，总耗时接近最慢的工作表；
+          任务只携带处理器配置和该表用到的快照切片（目标表+默认回退表），不pickle全部快照
+        返回：各工作表的处理结果标志列表
+        """
+        sheet_headers = {
+            sheet_name: self._get_output_headers(output_wb, sheet_name)
+            for sheet_name in self.sheet_names
+        }
+        # 进程池后端复用全局执行器（不在此处关闭），线程后端使用独立的工作表线程池，用完即关闭
+        if GlobalThreadPool.is_process_backend():
+            executor = GlobalThreadPool.get_executor()
+            sheet_pool = contextlib.nullcontext()
+        else:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(self.sheet_names),
+                thread_name_prefix='AutoSNTSheetPool'
+            )
+            sheet_pool = executor
+        with sheet_pool:
+            if GlobalThreadPool.is_process_backend():
+                # 进程池无法传递计时区间（闭包不可pickle），子进程内的区间不计入报告，以sheet_tasks区间记录提交及等待的耗时
+                with Tracer.span("sheet_tasks", sheets=len(sheet_headers)):
+                    futures = {
+                        sheet_name: executor.submit(
+                            _build_sheet_rows_task, self, sheet_name, headers, self._sheet_snapshots_for(sheet_name)
+                        )
+                        for sheet_name, headers in sheet_headers.items()
+                    }
+                    concurrent.futures.wait(futures.values())
+            else:
+                build_sheet_rows = Tracer.propagate(self._build_sheet_rows)
+                futures = {
+                    sheet_name: executor.submit(build_sheet_rows, sheet_name, headers)
+                    for sheet_name, headers in sheet_headers.items()
+                }
+
+        success_flags = []
+        for sheet_name, future in futures.items():
+            try:
+                ordered_rows = future.result()
+                self._write_sheet_rows(output_wb, sheet_name, ordered_rows)
+                Logger.info(f"✅ 工作表 [{sheet_name}] 处理完成，共更新 {len(ordered_rows)} 行数据")
+                success_flags.append(True)
+            except Exception as e:
+                Logger.error(f"❌ 工作表 [{sheet_name}] 处理失败: {str(e)}")
+                Logger.debug(f"{traceback.format_exc()}")
+                success_flags.append(False)
+        return success_flags
+
+    def _process_sheets_streaming(self, output_wb):
+        """
+        流式合并所有工作表：一次遍历res/report文件完成所有工作表的合并，再按配置顺序写入输出工作簿
+        返回：各工作表的处理结果标志列表（流式合并失败时所有工作表均视为失败）
+        """
+        sheet_headers = {
+            sheet_name: self._get_output_headers(output_wb, sheet_name)
+            for sheet_name in self.sheet_names
+        }
+        try:
+            with Tracer.span("stream_merge", files=len(self.stream_files)):
+                sheet_rows = self._stream_merge(sheet_headers)
+        except Exception as e:
+            Logger.error(f"❌ 流式合并失败: {str(e)}")
+            Logger.debug(f"{traceback.format_exc()}")
+            return [False]
+
+        for sheet_name, base_data in sheet_rows.items():
+            self._write_sheet_rows(output_wb, sheet_name, base_data)
+            Logger.info(f"✅ 工作表 [{sheet_name}] 处理完成，共更新 {len(base_data)} 行数据")
+        return [True] * len(sheet_rows)
+
+    def _stream_merge(self, sheet_headers):
+        """
+        流式合并（消费者）：加载各工作表的snt基准数据后，从有界队列中依次取出读取线程送来的行块，按基准行号写入基准行存储
+        只有一个读取线程按文件优先级顺序送出行块，写入顺序与逐文件顺序合并一致（靠后的文件覆盖靠前的文件）
+        队列已满时读取线程阻塞（背压），队列中最多 stream_queue_size 个行块
+        返回：{工作表名称: RowStore}
+        """
+        baselines = {}
+        for sheet_name, headers in sheet_headers.items():
+            Logger.info(f"🔨 加载工作表 [{sheet_name}] 基准数据")
+            _, key_index, base_data = self._load_snt_data(sheet_name, headers)
+            baselines[sheet_name] = (key_index, base_data)
+
+        chunks = queue.Queue(maxsize=self.stream_queue_size)
+        stop = threading.Event()
+        reader = threading.Thread(
+            target=Tracer.propagate(self._stream_source_rows),
+            args=(sheet_headers, chunks, stop),
+            name="AutoSNTStreamReader",
+            daemon=True,
+        )
+        reader.start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                sheet_name, plan, rows = item
+                key_index, base_data = baselines[sheet_name]
+                for key, values in rows:
+                    row_id = key_index.get(key)
+                    if row_id is None:
+                        Logger.debug(f"未找到匹配项: {key}，跳过更新")
+                        continue
+                    plan.apply_to(values, base_data, row_id)
+                Tracer.add_rows(len(rows))
+        finally:
+            # 合并异常退出时通知读取线程停止，避免其阻塞在已满的队列上
+            stop.set()
+            reader.join()
+
+        for _, base_data in baselines.values():
+            base_data.compact()
+        return {sheet_name: base_data for sheet_name, (_, base_data) in baselines.items()}
+
+    def _stream_source_rows(self, sheet_headers, chunks, stop):
+        """读取线程（生产者）：按文件优先级顺序逐个打开res/report文件，处理完一个文件后立即关闭，结束时放入None"""
+        try:
+            for fp in self.stream_files:
+                if stop.is_set():
+                    return
+                with Tracer.span("stream_file", file=Path(fp).name):
+                    self._stream_single_file(fp, sheet_headers, chunks, stop)
+            self._put_chunk(chunks, stop, None)
+        except Exception as e:
+            self._put_chunk(chunks, stop, e)
+
+    @staticmethod
+    def _put_chunk(chunks, stop, item):
+        """放入行块，队列已满时等待（背压）；合并已停止时放弃并返回False"""
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _stream_single_file(self, fp, sheet_headers, chunks, stop):
+        """
+        流式读取单个文件：各目标工作表按与 _resolve_source_sheets 相同的规则选择工作表
+        - 目标表存在且有有效数据：目标表
+        - 目标表存在但无有效数据：所有表头有效的默认回退表
+        - 目标表不存在：第一个表头有效的默认回退表
+        """
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")  # 忽略openpyxl的警告
+                wb = load_workbook(filename=fp, read_only=True, data_only=True, keep_links=False)
+        except Exception as e:
+            Logger.error(f"❌ 加载失败: {Path(fp).name}\n{traceback.format_exc()}")
+            return
+
+        try:
+            column_mapping = self._get_column_mapping(self._get_folder_type(fp))
+            for sheet_name, headers in sheet_headers.items():
+                stream = functools.partial(
+                    self._stream_sheet, wb, fp, sheet_name, column_mapping, headers, chunks, stop
+                )
+                if sheet_name in wb.sheetnames:
+                    if stream(sheet_name):
+                        continue
+                    # 若表中无数据，且使用的不是默认表，则尝试获取默认表数据
+                    streamed = False
+                    for default_sheet_name in self.default_fallback_sheets:
+                        if default_sheet_name in wb.sheetnames and stream(default_sheet_name, validate=True):
+                            streamed = True
+                    if not streamed:
+                        Logger.info(f"⚠️ 文件{fp}:【{sheet_name}】中无有效数据")
+                    continue
+
+                for default_sheet_name in self.default_fallback_sheets:
+                    if default_sheet_name in wb.sheetnames and stream(default_sheet_name, validate=True) is not None:
+                        break
+                else:
+                    Logger.error(f"🛑 文件 {Path(fp).name} 无有效工作表")
+            Logger.info(f"✅ 文件{fp}⏩ 更新完成")
+        finally:
+            wb.close()
+
+    def _stream_sheet(self, wb, fp, sheet_name, column_mapping, headers, chunks, stop, source_name=None,
+                      validate=False):
+        """
+        将一个源工作表中通过必填列校验的行按块送入队列（行块为 (目标工作表, 映射计划, [(关键字段元组, 行值元组), ...])）
+        validate=True 时先校验表头是否包含关键字段，不包含时返回None
+        返回：送出的有效行数
+        """
+        source_name = source_name or sheet_name
+        value_rows = ExcelProcessor.iter_sheet_values(wb[source_name])
+        schema = SheetSchema(next(value_rows, ()), self.key_fields)
+        if validate and schema.key_indices is None:
+            return None
+        if source_name != sheet_name:
+            Logger.info(f"🛑 文件{fp}⏩ 使用回退表 [{source_name}]")
+
+        plan = MappingPlan.compile(column_mapping, schema, headers)
+        count = 0
+        chunk = []
+        for values in ExcelProcessor.schema_row_generator(schema, value_rows, self.required_fields, strict_flag=False):
+            if schema.key_indices is None:
+                raise KeyError(f"工作表 [{source_name}] 缺少关键字段: {self.key_fields}")
+            chunk.append((schema.key_of(values), values))
+            count += 1
+            if len(chunk) >= self.stream_chunk_size:
+                if not self._put_chunk(chunks, stop, (sheet_name, plan, chunk)):
+                    raise RuntimeError("流式合并已停止")
+                chunk = []
+        if chunk and not self._put_chunk(chunks, stop, (sheet_name, plan, chunk)):
+            raise RuntimeError("流式合并已停止")
+        Logger.debug(f"{fp} [{source_name}] 读取 {count} 行有效数据")
+        return count
+
+    @Tracer.trace("create_output")
+    def _create_output_workbook(self):
+        """
+        创建输出工作簿
+        - 流式写入：write-only模式的StreamingWorkbookWriter，模板表头及样式在创建时写入
+        - 默认：按模板创建结果文件后完整加载
+        """
+        if self.streaming_output:
+            return StreamingWorkbookWriter(self.template_file, self.target_file, self.header_style)
+        absolute_path = FileProcessor.create_newfile_by_template(
+            self.template_file,
+            self.target_file,
+            # 直接改模板文件就行
+            # additional_columns=["列1", "列2"] 
+        )
+        return load_workbook(absolute_path)
+
+    @Tracer.trace("save")
+    def _save_output(self, output_wb):
+        """保存结果文件"""
+        if self.streaming_output:
+            output_wb.save()
+        else:
+            output_wb.save(self.target_file)
+        Logger.info(f"💾 结果文件保存成功: {self.target_file}")
+        if self.sidecar:
+            # 结果文件的旁路文件，分析界面直接读取
+            SheetSidecar.write(self.target_file, self.output_sheets, merge=False, root=self.sidecar_path)
+
     def run(self):
-        """主执行流程"""
+        """主执行流程（全程计时，结束后输出计时报告）"""
+        Tracer.reset()
+        if self.map_memo:
+            RuleMemo.enable()
+        try:
+            with Tracer.span("run"):
+                return self._run_pipeline()
+        finally:
+            self._report_timing()
+            if self.map_memo:
+                RuleMemo.log_stats()
+                RuleMemo.disable()
+
+    def _report_timing(self):
+        """在调试日志旁写入JSON计时报告，并在控制台输出汇总表格"""
+        try:
+            Tracer.write_report()
+            Tracer.print_summary()
+        except Exception as e:
+            Logger.debug(f"⚠️ 计时报告输出失败: {str(e)}")
+
+    def _run_pipeline(self):
+        """执行各处理阶段"""
         try:
             # 阶段1：初始化配置
             self._load_mappings()
             self._validate_input_files()
 
             # 阶段2：准备输出文件——给用户反馈的snt文件
-            absolute_path = FileProcessor.create_newfile_by_template(
-                self.template_file,
-                self.target_file,
-                # 直接改模板文件就行
-                # additional_columns=["列1", "列2"] 
-            )
-            output_wb = load_workbook(absolute_path)
+            output_wb = self._create_output_workbook()
 
             # 阶段3：多表处理
-            success_flags = []
-            for sheet_name in self.sheet_names:
-                success_flags.append(
-                    self._process_single_sheet(sheet_name, output_wb)
-                )
+            if self.streaming_merge:
+                success_flags = self._process_sheets_streaming(output_wb)
+            elif self.concurrent_sheets:
+                success_flags = self._process_sheets_concurrently(output_wb)
+            else:
+                success_flags = []
+                for sheet_name in self.sheet_names:
+                    success_flags.append(
+                        self._process_single_sheet(sheet_name, output_wb)
+                    )
 
             # 阶段4：保存结果，但凡有一个sheet处理失败，则删除不完整的输出文件
             if all(success_flags):
-                output_wb.save(self.target_file)
-                Logger.info(f"💾 结果文件保存成功: {self.target_file}")
+                self._save_output(output_wb)
                 return True
             else:
+                if self.streaming_output:
+                    output_wb.discard()
                 raise RuntimeError("部分工作表处理失败")
                 
         except Exception as e:
@@ -459,6 +900,18 @@ class AutoSntProcessor:
         finally:
             GlobalThreadPool.shutdown()
 
+
+def _process_file_task(processor, sheets_wb_map, sheet_name, fp, key_index, column_mapping, headers):
+    """进程池任务：在子进程中生成单个文件的局部更新集（模块级函数，保证可被pickle）"""
+    return processor._process_single_file(sheets_wb_map, sheet_name, fp, key_index, column_mapping, headers)
+
+
+def _build_sheet_rows_task(processor, sheet_name, headers, sheet_snapshots):
+    """进程池任务：在子进程中合并单个工作表，sheet_snapshots 为该表的快照切片（模块级函数，保证可被pickle）"""
+    processor.sheet_snapshots = sheet_snapshots
+    return processor._build_sheet_rows(sheet_name, headers)
+
+
 if __name__ == "__main__":
     processor = AutoSntProcessor()
     if processor.run():
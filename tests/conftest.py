@@ -0,0 +1,87 @@
+import os
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "lib"))
+sys.path.insert(0, REPO_ROOT)
+
+import pytest
+from openpyxl import Workbook
+from sinotrans.utils import Logger
+
+# 日志写入临时目录，不在仓库中生成logs
+# Logger为单例，只有第一次创建时的目录生效：必须在任何测试（及其创建的处理器、进程池子进程）使用Logger之前创建
+LOG_DIR = tempfile.mkdtemp(prefix="sinotrans_test_logs_")
+Logger(debug_path=LOG_DIR)
+assert Logger().DEBUG_PATH == LOG_DIR, f"测试日志未写入临时目录: {Logger().DEBUG_PATH}"
+
+
+@pytest.fixture
+def make_workbook(tmp_path):
+    """按 {工作表名称: [表头, 行, ...]} 生成xlsx文件，返回文件路径"""
+    def make(sheets, name="book.xlsx"):
+        wb = Workbook()
+        wb.remove(wb.active)
+        for sheet_name, rows in sheets.items():
+            ws = wb.create_sheet(sheet_name)
+            for row in rows:
+                ws.append(row)
+        path = tmp_path / name
+        wb.save(path)
+        return str(path)
+    return make
+
+
+@pytest.fixture
+def snt_workspace(tmp_path):
+    """小规模的SNT工作目录（conf、模板、snt/res/report合成数据），关键字段冲突和回退表比例较高"""
+    from benchmarks.synthetic_data import SyntheticSntGenerator
+    work_dir = tmp_path / "workspace"
+    SyntheticSntGenerator(
+        work_dir, snt_rows=60, res_files=4, report_files=2, rows_per_file=40, sheets=2,
+        collision_rate=0.4, unmatched_rate=0.1, fallback_rate=0.3, seed=7,
+    ).generate()
+    return work_dir
+
+
+@pytest.fixture
+def run_snt(snt_workspace):
+    """按指定参数运行 AutoSntProcessor，返回结果文件内容 {工作表名称: [行, ...]}（空字符串按None比较）"""
+    from openpyxl import load_workbook
+    from snt2 import AutoSntProcessor
+
+    def run(**kwargs):
+        processor = AutoSntProcessor(base_dir=str(snt_workspace), **kwargs)
+        # 同一秒内多次运行时结果文件名不冲突
+        processor.target_file = str(snt_workspace / "target" / f"out_{len(os.listdir(snt_workspace / 'target'))}.xlsx")
+        assert processor.run()
+        wb = load_workbook(processor.target_file, read_only=True)
+        try:
+            return {
+                ws.title: [tuple(None if value == '' else value for value in row) for row in ws.iter_rows(values_only=True)]
+                for ws in wb.worksheets
+            }
+        finally:
+            wb.close()
+    return run
+
+
+@pytest.fixture
+def imap_server(monkeypatch):
+    """后台线程中运行的最小IMAP服务器（明文），重试退避不等待；同步客户端的SSL连接替换为明文连接"""
+    import asyncio
+    import imaplib
+    from fake_imap import FakeImapServer
+
+    original_sleep = asyncio.sleep
+
+    async def no_backoff(delay, *args, **kwargs):
+        return await original_sleep(0, *args, **kwargs)
+    monkeypatch.setattr("sinotrans.core.async_imap.asyncio.sleep", no_backoff)
+    monkeypatch.setattr("sinotrans.core.eml.time.sleep", lambda delay: None)
+    monkeypatch.setattr(imaplib, "IMAP4_SSL", imaplib.IMAP4)
+
+    server = FakeImapServer().start()
+    yield server
+    server.stop()
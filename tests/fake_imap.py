@@ -0,0 +1,171 @@
+"""测试用的最小IMAP服务器（明文TCP，在后台线程的事件循环中运行），只实现邮箱目录、按UID批量操作和获取邮件用到的命令"""
+import asyncio
+import re
+import threading
+
+
+class FakeImapServer:
+    """
+    - boxes: {邮箱名称: {UID: 标记集合}}
+    - commands: 收到的命令（UID命令记为 "UID XXX"）
+    - drop_after: {命令: 第n次}，第n次执行该命令后不回复、直接断开连接（模拟执行成功但响应丢失）
+    - hold_tagged: {命令: n}，该命令的完成响应攒齐n条（或0.2秒内没有新命令）后再一起发送，
+      模拟服务器并行执行流水线命令、各命令的未标记响应先于完成响应交错返回
+    - bodies: {(邮箱, UID): 邮件内容}，未设置时 UID FETCH 返回按UID生成的邮件
+    - fetch_cut: {第n次: k}，第n次 UID FETCH 只完整返回前k封邮件，第k+1封只发送一半后断开连接（模拟获取中途失败）
+    """
+    def __init__(self, capabilities=("IMAP4rev1", "MOVE", "UIDPLUS"), boxes=("INBOX", "Archive")):
+        self.capabilities = list(capabilities)
+        self.boxes = {name: {} for name in boxes}
+        self.next_uid = {}
+        self.commands = []
+        self.drop_after = {}
+        self.hold_tagged = {}
+        self.bodies = {}
+        self.fetch_cut = {}
+        self.loop = asyncio.new_event_loop()
+        self.port = None
+
+    def add(self, box, count=1):
+        uids = []
+        for _ in range(count):
+            uid = self.next_uid.get(box, 1)
+            self.next_uid[box] = uid + 1
+            self.boxes[box][uid] = set()
+            uids.append(uid)
+        return uids
+
+    def start(self):
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            server = self.loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+            self.port = server.sockets[0].getsockname()[1]
+            ready.set()
+            self.loop.run_forever()
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    @staticmethod
+    def parse_set(uid_set, uids):
+        """按IMAP UID集合（如 "1:3,7"、"5:*"）选出存在的UID"""
+        selected = set()
+        top = max(uids) if uids else 0
+        for part in uid_set.split(","):
+            low, _, high = part.partition(":")
+            low = top if low == "*" else int(low)
+            high = low if not high else (top if high == "*" else int(high))
+            low, high = min(low, high), max(low, high)
+            selected.update(uid for uid in uids if low <= uid <= high)
+        return sorted(selected)
+
+    def body(self, box, uid):
+        return self.bodies.get((box, uid), f"Subject: message {uid}\r\n\r\nbody of {box} {uid}\r\n".encode())
+
+    @staticmethod
+    def tokens(text):
+        return [token.strip('"') for token in re.findall(r'"(?:[^"\\]|\\.)*"|\([^)]*\)|\S+', text)]
+
+    async def _handle(self, reader, writer):
+        selected = None
+        held = []
+
+        def flush():
+            while held:
+                writer.write(held.pop(0))
+        writer.write(b"* OK fake imap ready\r\n")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            tag, *args = self.tokens(line.decode().rstrip("\r\n"))
+            command = args.pop(0).upper()
+            if command == "UID":
+                command = f"UID {args.pop(0).upper()}"
+            self.commands.append(command)
+            box = self.boxes.get(selected)
+            out = []
+            status = "OK"
+            cut = False
+            if command == "CAPABILITY":
+                out.append("* CAPABILITY " + " ".join(self.capabilities))
+            elif command in ("SELECT", "EXAMINE"):
+                if args[0] in self.boxes:
+                    selected = args[0]
+                    out.append(f"* {len(self.boxes[selected])} EXISTS")
+                else:
+                    status = "NO"
+            elif command == "LIST":
+                out.extend(f'* LIST (\\HasNoChildren) "/" "{name}"' for name in self.boxes)
+            elif command == "CREATE":
+                if args[0] in self.boxes:
+                    status = "NO"
+                else:
+                    self.boxes[args[0]] = {}
+            elif command == "DELETE":
+                self.boxes.pop(args[0], None)
+            elif command == "RENAME":
+                self.boxes[args[1]] = self.boxes.pop(args[0])
+            elif command == "UID SEARCH":
+                uids = self.parse_set(args[1], sorted(box)) if args and args[0].upper() == "UID" else sorted(box)
+                out.append("* SEARCH" + "".join(f" {uid}" for uid in uids))
+            elif command == "UID FETCH":
+                uids = sorted(box)
+                complete = self.fetch_cut.get(self.commands.count(command))
+                for count, uid in enumerate(self.parse_set(args[0], uids)):
+                    payload = self.body(selected, uid)
+                    message = (f"* {uids.index(uid) + 1} FETCH (UID {uid} BODY[] {{{len(payload)}}}\r\n".encode()
+                               + payload + b")\r\n")
+                    if count == complete:
+                        out.append(message[:len(message) // 2])
+                        cut = True
+                        break
+                    out.append(message)
+            elif command in ("UID COPY", "UID MOVE"):
+                if args[1] not in self.boxes:
+                    status = "NO"
+                else:
+                    for uid in self.parse_set(args[0], sorted(box)):
+                        self.add(args[1])
+                        if command == "UID MOVE":
+                            del box[uid]
+                            out.append("* 1 EXPUNGE")
+            elif command == "UID STORE":
+                for uid in self.parse_set(args[0], sorted(box)):
+                    box[uid].add("\\Deleted")
+            elif command in ("EXPUNGE", "UID EXPUNGE"):
+                targets = self.parse_set(args[0], sorted(box)) if command == "UID EXPUNGE" else sorted(box)
+                for uid in targets:
+                    if "\\Deleted" in box[uid]:
+                        del box[uid]
+                        out.append("* 1 EXPUNGE")
+            elif command == "LOGOUT":
+                out.append("* BYE")
+            elif command not in ("LOGIN", "NOOP"):
+                status = "BAD"
+            if cut:
+                writer.write(b"".join(out))
+                await writer.drain()
+                break
+            if self.commands.count(command) == self.drop_after.get(command):
+                break
+            tagged = f"{tag} {status} {command} completed\r\n".encode()
+            writer.write(b"".join(item if isinstance(item, bytes) else f"{item}\r\n".encode() for item in out))
+            if command in self.hold_tagged:
+                held.append(tagged)
+                if len(held) >= self.hold_tagged[command]:
+                    flush()
+                else:
+                    self.loop.call_later(0.2, flush)
+            else:
+                flush()
+                writer.write(tagged)
+            await writer.drain()
+            if command == "LOGOUT":
+                break
+        writer.close()
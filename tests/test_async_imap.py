@@ -0,0 +1,168 @@
+from sinotrans.core import AsyncEmailClient, EmailClient
+import asyncio
+import pytest
+import re
+
+
+@pytest.mark.parametrize("uids, size, expected", [
+    ([3, "1", b"2", 5, 6, 7, 10], 1000, ["1:3,5:7,10"]),
+    (["4", "2", "4", "3"], 2, ["2:3", "4"]),
+    ([9], 1, ["9"]),
+    ([], 10, []),
+    (range(1, 2501), 1000, ["1:1000", "1001:2000", "2001:2500"]),
+])
+def test_uid_chunks(uids, size, expected):
+    assert AsyncEmailClient.uid_chunks(uids, size) == expected
+
+
+def run_async(server, action, *args, **kwargs):
+    async def main():
+        async with AsyncEmailClient("127.0.0.1", server.port, "user", "secret", use_ssl=False) as client:
+            return await getattr(client, action)(*args, **kwargs)
+    return asyncio.run(main())
+
+
+def run_sync(server, action, *args, batch_size=1000):
+    client = EmailClient("127.0.0.1", server.port, "user", "secret")
+    client.BATCH_SIZE = batch_size
+    client.connect_imap("INBOX")
+    try:
+        return getattr(client, action)(*args)
+    finally:
+        client._reset_connection()
+
+
+CAPABILITIES = [("IMAP4rev1", "MOVE", "UIDPLUS"), ("IMAP4rev1", "UIDPLUS"), ("IMAP4rev1",)]
+
+
+@pytest.mark.parametrize("capabilities", CAPABILITIES, ids=["move", "uidplus", "plain"])
+def test_async_move_uses_one_command_per_chunk(imap_server, capabilities):
+    imap_server.capabilities = list(capabilities)
+    imap_server.add("INBOX", 12)
+    uids = [str(uid) for uid in range(1, 11)]
+
+    assert run_async(imap_server, "move_emails_by_uids", uids, "Archive", batch_size=4)
+    assert sorted(imap_server.boxes["INBOX"]) == [11, 12]
+    assert len(imap_server.boxes["Archive"]) == 10
+    if "MOVE" in capabilities:
+        assert imap_server.commands.count("UID MOVE") == 3
+    else:
+        assert imap_server.commands.count("UID COPY") == imap_server.commands.count("UID STORE") == 3
+        expunge = "UID EXPUNGE" if "UIDPLUS" in capabilities else "EXPUNGE"
+        assert imap_server.commands.count(expunge) == 3
+
+
+@pytest.mark.parametrize("capabilities", CAPABILITIES[1:], ids=["uidplus", "plain"])
+def test_async_delete(imap_server, capabilities):
+    imap_server.capabilities = list(capabilities)
+    imap_server.add("INBOX", 5)
+
+    assert run_async(imap_server, "delete_email_by_uids", ["1", "2", "4"], batch_size=2)
+    assert sorted(imap_server.boxes["INBOX"]) == [3, 5]
+    assert imap_server.commands.count("UID STORE") == 2
+
+
+def test_uids_still_present_are_reported_as_failed():
+    assert AsyncEmailClient.report_removed(["1", b"2", 3], {"2"}, "删除") is False
+    assert AsyncEmailClient.report_removed(["1", b"2", 3], set(), "删除") is True
+
+
+def test_async_copy(imap_server):
+    imap_server.add("INBOX", 6)
+    run_async(imap_server, "copy_emails_by_uids", ["1", "2", "5"], "Archive", batch_size=2)
+    assert len(imap_server.boxes["Archive"]) == 3
+    assert len(imap_server.boxes["INBOX"]) == 6
+    with pytest.raises(RuntimeError):
+        run_async(imap_server, "copy_emails_by_uids", ["1"], "Missing")
+
+
+@pytest.mark.parametrize("capabilities, dropped", [
+    (("IMAP4rev1", "UIDPLUS"), "UID STORE"),
+    (("IMAP4rev1", "UIDPLUS"), "UID EXPUNGE"),
+    (("IMAP4rev1",), "EXPUNGE"),
+    (("IMAP4rev1", "MOVE"), "UID MOVE"),
+])
+@pytest.mark.parametrize("client", ["async", "sync"])
+def test_move_retry_does_not_duplicate_messages(imap_server, capabilities, dropped, client):
+    """第二段执行后连接断开：重连后只处理仍在源邮箱中的UID，已复制的段不再复制"""
+    imap_server.capabilities = list(capabilities)
+    imap_server.add("INBOX", 12)
+    imap_server.drop_after = {dropped: 2}
+    uids = [str(uid) for uid in range(1, 10)]
+
+    if client == "async":
+        moved = run_async(imap_server, "move_emails_by_uids", uids, "Archive", batch_size=3)
+    else:
+        moved = run_sync(imap_server, "move_emails_by_uids", uids, "Archive", batch_size=3)
+
+    assert moved
+    assert imap_server.commands.count("LOGIN") == 2
+    assert sorted(imap_server.boxes["INBOX"]) == [10, 11, 12]
+    assert len(imap_server.boxes["Archive"]) == 9
+
+
+@pytest.mark.parametrize("capabilities", CAPABILITIES, ids=["move", "uidplus", "plain"])
+def test_sync_batched_move_and_delete(imap_server, capabilities):
+    imap_server.capabilities = list(capabilities)
+    imap_server.add("INBOX", 10)
+
+    assert run_sync(imap_server, "move_emails_by_uids", [1, "2", b"3", "7"], "Archive", batch_size=2)
+    assert run_sync(imap_server, "delete_email_by_uids", ["4", "5", "6"], batch_size=2)
+    assert sorted(imap_server.boxes["INBOX"]) == [8, 9, 10]
+    assert len(imap_server.boxes["Archive"]) == 4
+
+
+def test_move_of_missing_uids_is_a_no_op(imap_server):
+    imap_server.add("INBOX", 2)
+    assert run_async(imap_server, "move_emails_by_uids", ["99"], "Archive")
+    assert len(imap_server.boxes["INBOX"]) == 2 and not imap_server.boxes["Archive"]
+
+
+def fetched_uids(data):
+    return [re.search(rb"UID (\d+)", entry[0]).group(1).decode() for entry in data if isinstance(entry, tuple)]
+
+
+@pytest.mark.parametrize("method", ["uid", "stream"])
+def test_pipelined_fetches_get_their_own_messages(imap_server, method):
+    """两条 UID FETCH 流水线发送、服务器交错返回未标记响应时，各命令只收到自己UID集合中的邮件"""
+    imap_server.add("INBOX", 6)
+    imap_server.hold_tagged = {"UID FETCH": 2}
+
+    async def fetch(mail, uid_set):
+        if method == "uid":
+            status, data = await mail.uid('FETCH', uid_set, '(BODY.PEEK[])')
+            return fetched_uids(data)
+        received = []
+        await mail.uid_fetch_stream(uid_set, '(BODY.PEEK[])', lambda uid, payload: received.append(uid))
+        return received
+
+    async def main():
+        async with AsyncEmailClient("127.0.0.1", imap_server.port, "user", "secret", use_ssl=False) as client:
+            async with client.pool.session() as mail:
+                return await asyncio.gather(fetch(mail, "1:3"), fetch(mail, "4:6"))
+
+    assert asyncio.run(main()) == [["1", "2", "3"], ["4", "5", "6"]]
+
+
+def test_fetch_emails_by_uids_matches_messages_to_uids(imap_server):
+    imap_server.add("INBOX", 4)
+    imap_server.hold_tagged = {"UID FETCH": 4}
+    results = run_async(imap_server, "fetch_emails_by_uids", ["3", "1", "4", "2"], "(BODY.PEEK[])")
+    assert [fetched_uids(data) for _, data in results] == [["3"], ["1"], ["4"], ["2"]]
+    assert results[0][1][0][1] == imap_server.body("INBOX", 3)
+
+
+def test_pipelined_searches_are_sent_one_at_a_time(imap_server):
+    """* SEARCH 响应无法区分所属命令：同一连接上的 UID SEARCH 依次执行"""
+    imap_server.add("INBOX", 6)
+    imap_server.hold_tagged = {"UID SEARCH": 2}
+
+    async def main():
+        async with AsyncEmailClient("127.0.0.1", imap_server.port, "user", "secret", use_ssl=False) as client:
+            async with client.pool.session() as mail:
+                return await asyncio.gather(
+                    mail.uid('SEARCH', 'UID', '1:2'), mail.uid('SEARCH', 'UID', '5:6'), mail.noop())
+
+    first, second, noop = asyncio.run(main())
+    assert first == ('OK', [b"1 2"]) and second == ('OK', [b"5 6"])
+    assert noop[0] == 'OK'
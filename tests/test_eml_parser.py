@@ -0,0 +1,39 @@
+from sinotrans.core import EmlParser, Rule
+from sinotrans.utils import GlobalThreadPool
+import pytest
+
+HTML = "<table><tr><th>项目</th><th>值</th></tr><tr><td>Vessel</td><td>EVER GIVEN</td></tr></table>"
+
+
+def write_eml(directory, name):
+    (directory / name).write_text(
+        "Subject: test\nMIME-Version: 1.0\nContent-Type: text/html; charset=utf-8\n\n" + HTML,
+        encoding="utf-8"
+    )
+
+
+@pytest.fixture
+def eml_dir(tmp_path):
+    for po in ("1001", "1002", "1003"):
+        write_eml(tmp_path, f"PO{po}.eml")
+    yield tmp_path
+    GlobalThreadPool.shutdown()
+    GlobalThreadPool.initialize(backend=GlobalThreadPool.BACKEND_THREAD)
+
+
+@pytest.mark.parametrize("backend", [GlobalThreadPool.BACKEND_THREAD, GlobalThreadPool.BACKEND_PROCESS])
+def test_parse_eml_files_on_selected_backend(eml_dir, backend):
+    parser = EmlParser({"Vessel": [Rule(field_name="船名")]}, str(eml_dir))
+    result = parser.parse_eml_files("PO号", backend=backend)
+    assert result == {po: {"船名": "EVER GIVEN"} for po in ("1001", "1002", "1003")}
+    assert GlobalThreadPool.is_process_backend() == (backend == GlobalThreadPool.BACKEND_PROCESS)
+
+
+def test_parse_eml_files_keeps_executor_open(eml_dir):
+    """执行器在多次解析间复用，不在每次调用后关闭"""
+    parser = EmlParser({}, str(eml_dir))
+    parser.parse_eml_files("PO号", backend=GlobalThreadPool.BACKEND_PROCESS)
+    executor = GlobalThreadPool._executor
+    parser.parse_eml_files("PO号", backend=GlobalThreadPool.BACKEND_PROCESS)
+    assert GlobalThreadPool._executor is executor
+    assert GlobalThreadPool._is_alive()
@@ -0,0 +1,54 @@
+from datetime import datetime
+from sinotrans.core import KeyIndex
+import pickle
+import pytest
+
+
+@pytest.mark.parametrize("value, expected", [
+    (1, "1"),
+    (1.0, "1"),
+    ("1", "1"),
+    (2.5, "2.5"),
+    ("0012", "0012"),
+    (7000001, "7000001"),
+    (7000001.0, "7000001"),
+    (datetime(2025, 8, 1), "2025-08-01 00:00:00"),
+    (None, "None"),
+])
+def test_normalize(value, expected):
+    assert KeyIndex.normalize(value) == expected
+
+
+def test_normalized_keys_are_interned():
+    built = "".join(["F", "1"])
+    assert KeyIndex.normalize(built) is KeyIndex.normalize("F1")
+    assert KeyIndex.key_of([70.0, "P", 3])[0] is KeyIndex.normalize(70)
+
+
+def test_keys_of_mixed_types_match():
+    assert KeyIndex.key_of(["F1", 7000001, 1.0]) == KeyIndex.key_of(["F1", "7000001", "1"])
+
+
+def test_add_and_get():
+    index = KeyIndex()
+    assert index.add(("F1", "P1", "1")) == (0, True)
+    assert index.add(("F2", "P2", "1")) == (1, True)
+    assert index.add(("F1", "P1", "1")) == (0, False)
+
+    assert len(index) == 2
+    assert index.get(("F2", "P2", "1")) == 1
+    assert index.get(("F3", "P3", "1")) is None
+    assert ("F1", "P1", "1") in index and ("F3", "P3", "1") not in index
+    assert index.keys == [("F1", "P1", "1"), ("F2", "P2", "1")]
+
+
+def test_pickle_round_trip_rebuilds_lookup():
+    index = KeyIndex()
+    for idx in range(100):
+        index.add(KeyIndex.key_of([f"F{idx}", 7000000 + idx, idx % 3 + 1]))
+
+    restored = pickle.loads(pickle.dumps(index))
+    assert restored.keys == index.keys
+    assert all(restored.get(key) == row_id for row_id, key in enumerate(index.keys))
+    assert restored.add(("new",)) == (100, True)
+    assert len(index) == 100
@@ -0,0 +1,93 @@
+from sinotrans.core import AsyncEmailClient, MailboxDirectory
+import asyncio
+import pytest
+
+
+@pytest.mark.parametrize("name, encoded", [
+    ("INBOX", "INBOX"),
+    ("收件箱", "&ZTZO9nux-"),
+    ("~peter/mail/台北/日本語", "~peter/mail/&U,BTFw-/&ZeVnLIqe-"),
+    ("Tom & Jerry", "Tom &- Jerry"),
+    ("归档 2025/已处理", "&X1JoYw- 2025/&XfJZBHQG-"),
+    ("emoji 📦", "emoji &2D3c5g-"),
+    ("", ""),
+])
+def test_encode_decode(name, encoded):
+    assert MailboxDirectory.encode(name) == encoded
+    assert MailboxDirectory.decode(encoded) == name
+    assert MailboxDirectory.decode(encoded.encode("ascii")) == name
+
+
+def test_malformed_segments_are_kept():
+    assert MailboxDirectory.decode("a&b") == "a&b"
+    assert MailboxDirectory.decode("a&!!-b") == "a&!!-b"
+    # UTF-16 字节数为奇数
+    assert MailboxDirectory.decode("&AGE-&AG-") == "a&AG-"
+
+
+@pytest.mark.parametrize("name, quoted", [
+    ("INBOX", "INBOX"),
+    ("&ZTZO9nux-", "&ZTZO9nux-"),
+    ("My Folder", '"My Folder"'),
+    ('say "hi"', '"say \\"hi\\""'),
+    ("back\\slash", '"back\\\\slash"'),
+    ("", '""'),
+])
+def test_quote(name, quoted):
+    assert MailboxDirectory.quote(name) == quoted
+
+
+def test_parse_list_response_formats():
+    folders = [
+        b'(\\HasNoChildren) "/" "INBOX"',
+        b'(\\HasChildren \\Noselect) "/" &ZTZO9nux-',
+        b'() NIL "Quoted \\"name\\""',
+        (b'(\\HasNoChildren) "/" {7}', b"Literal"),
+        None,
+        b"garbage",
+    ]
+    assert MailboxDirectory.parse_list_response(folders) == [
+        ("INBOX", ("\\HasNoChildren",)),
+        ("&ZTZO9nux-", ("\\HasChildren", "\\Noselect")),
+        ('Quoted "name"', ()),
+        ("Literal", ("\\HasNoChildren",)),
+    ]
+
+
+def test_cache_lookup_and_invalidate():
+    directory = MailboxDirectory()
+    assert not directory.loaded and "INBOX" not in directory and directory.names() == []
+    assert directory.server_name("收件箱") == "&ZTZO9nux-"
+
+    directory.load([b'(\\HasNoChildren) "/" "Inbox"', b'(\\HasNoChildren) "/" "&ZTZO9nux-"'])
+    assert directory.names() == ["Inbox", "收件箱"]
+    assert "INBOX" in directory and "收件箱" in directory
+    # 已缓存时使用服务器返回的原始名称（大小写与服务器一致）
+    assert directory.server_name("INBOX") == "Inbox"
+
+    directory.invalidate()
+    assert not directory.loaded and "INBOX" not in directory
+
+
+def test_client_lists_once_and_refreshes_after_changes(imap_server):
+    async def main():
+        async with AsyncEmailClient("127.0.0.1", imap_server.port, "user", "secret", use_ssl=False) as client:
+            assert await client.list_mailboxes() == ["INBOX", "Archive"]
+            assert await client.check_exist_mailbox("archive")
+            assert imap_server.commands.count("LIST") == 1
+
+            await client.create_mailbox("已处理 2025")
+            assert "&XfJZBHQG- 2025" in imap_server.boxes
+            assert await client.list_mailboxes() == ["INBOX", "Archive", "已处理 2025"]
+
+            await client.rename_mailbox("已处理 2025", "归档")
+            assert await client.check_exist_mailbox("归档")
+            assert not await client.check_exist_mailbox("已处理 2025")
+
+            # 其他客户端创建的文件夹：缓存中没有时重新LIST一次
+            imap_server.boxes["Other"] = {}
+            assert await client.check_exist_mailbox("Other")
+
+            await client.delete_mailbox("归档")
+            assert await client.list_mailboxes() == ["INBOX", "Archive", "Other"]
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+from sinotrans.core import ExcelProcessor, MappingPlan, RowStore, Rule, SheetSchema
+import pytest
+
+
+HEADERS = ["po", "lot", "status", "remark", "qty"]
+
+
+def mapping():
+    return {
+        "PO": [Rule("po", splitter="-", index=1)],
+        "LOT": [Rule("lot")],
+        "STATUS": [Rule("status"), Rule("not_in_template")],
+        "NOTE": [Rule("remark", considerEmpty=True)],
+        "MISSING": [Rule("qty"), Rule("status", considerEmpty=True)],
+        "QTY": [Rule("qty", method="round", dp=1)],
+    }
+
+
+def expected_row(values, schema, column_mapping, headers=HEADERS):
+    """逐行字典映射（ExcelProcessor.column_mapping）按模板表头排列的结果"""
+    mapped = ExcelProcessor.column_mapping(values, column_mapping, schema)
+    return [mapped.get(header, '') for header in headers]
+
+
+@pytest.mark.parametrize("values", [
+    ("P1-A", 1, "OPEN", "note", "2.26"),
+    ("P2-B", None, "", None, 0),
+    ("", "", None, "x", None),
+])
+def test_apply_matches_column_mapping(values):
+    schema = SheetSchema(["PO", "LOT", "STATUS", "NOTE", "QTY"])
+    plan = MappingPlan.compile(mapping(), schema, HEADERS)
+    assert plan.apply(values, [''] * len(HEADERS)) == expected_row(values, schema, mapping())
+
+
+def test_compile_drops_rules_outside_template_and_missing_sources():
+    schema = SheetSchema(["PO", "LOT", "STATUS", "NOTE", "QTY"])
+    plan = MappingPlan.compile(mapping(), schema, HEADERS)
+    fields = [rule.field_name for _, rule, _, _ in plan.steps]
+
+    assert "not_in_template" not in fields
+    # 源列不存在：只保留 considerEmpty=True 的规则（写入None）
+    assert (None, "status") in [(src_idx, rule.field_name) for src_idx, rule, _, _ in plan.steps]
+    assert fields.count("qty") == 1
+    assert plan.width == len(HEADERS)
+
+
+def test_later_rules_overwrite_earlier_ones():
+    schema = SheetSchema(["STATUS", "MISSING"])
+    plan = MappingPlan.compile(mapping(), schema, HEADERS)
+    # 源列MISSING的considerEmpty规则排在STATUS之后，覆盖为None
+    assert plan.apply(("OPEN", None), [''] * len(HEADERS))[HEADERS.index("status")] is None
+
+
+def test_duplicate_template_headers_are_all_written():
+    headers = ["po", "status", "po"]
+    plan = MappingPlan.compile({"PO": [Rule("po")]}, SheetSchema(["PO"]), headers)
+    assert MappingPlan.output_index(headers) == {"po": (0, 2), "status": (1,)}
+    assert plan.apply(("P1",), [''] * 3) == ["P1", '', "P1"]
+    assert plan.dest_columns() == [0, 2]
+
+
+def test_restrict_keeps_only_template_fields():
+    restricted = MappingPlan.restrict({"A": [Rule("po"), Rule("other")], "B": [Rule("other")]}, HEADERS)
+    assert list(restricted) == ["A"]
+    assert [rule.field_name for rule in restricted["A"]] == ["po"]
+
+
+def test_template_row_applies_fixed_mapping():
+    row = MappingPlan.template_row(HEADERS, {"status": Rule("FIXED"), "unknown": Rule("X")})
+    assert row == ['', '', "FIXED", '', '']
+
+
+def test_apply_to_matches_apply():
+    schema = SheetSchema(["PO", "LOT", "STATUS", "NOTE", "QTY"])
+    plan = MappingPlan.compile(mapping(), schema, HEADERS)
+    rows = [("P1-A", 1, "OPEN", "note", "2.26"), ("P2-B", None, "", None, 0)]
+    store = RowStore(HEADERS, len(rows))
+    for row_id, values in enumerate(rows):
+        plan.apply_to(values, store, row_id)
+    assert list(store) == [plan.apply(values, [''] * len(HEADERS)) for values in rows]
+
+
+def test_mapping_errors_are_raised():
+    plan = MappingPlan.compile({"QTY": [Rule("qty", method="round")]}, SheetSchema(["QTY"]), HEADERS)
+    with pytest.raises(ValueError):
+        plan.apply(("abc",), [''] * len(HEADERS))
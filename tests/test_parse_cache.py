@@ -0,0 +1,98 @@
+from sinotrans.core import ExcelProcessor, ParseCache
+from zipfile import ZipFile
+import pytest
+
+
+HEADERS = ["folder", "po", "lot", "qty"]
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    """记录实际解析Excel时请求的工作表"""
+    calls = []
+    original = ExcelProcessor._parse_sheet_snapshots
+
+    def spy(abs_path, sheet_names=None, *args, **kwargs):
+        calls.append(sorted(sheet_names or []))
+        return original(abs_path, sheet_names, *args, **kwargs)
+
+    monkeypatch.setattr(ExcelProcessor, "_parse_sheet_snapshots", staticmethod(spy))
+    return calls
+
+
+def load(path, cache_dir, key_fields=("folder", "po", "lot")):
+    _, snapshots = ExcelProcessor.load_sheet_snapshots(
+        path, sheet_names=["A", "B"], key_fields=list(key_fields), cache_dir=str(cache_dir)
+    )
+    return snapshots
+
+
+def test_unchanged_file_is_served_from_cache(make_workbook, tmp_path, parse_calls):
+    path = make_workbook({"A": [HEADERS, ["F1", "P1", 1, 10]], "B": [HEADERS, ["F2", "P2", 2, 20]]})
+    first = load(path, tmp_path / "cache")
+    second = load(path, tmp_path / "cache")
+
+    assert parse_calls == [["A", "B"]]
+    assert {name: snapshot.rows for name, snapshot in second.items()} == \
+        {name: snapshot.rows for name, snapshot in first.items()}
+    assert second["A"].keys == [("F1", "P1", "1")]
+
+
+def test_only_changed_sheet_is_reparsed(make_workbook, tmp_path, parse_calls):
+    path = make_workbook({"A": [HEADERS, ["F1", "P1", 1, 10]], "B": [HEADERS, ["F2", "P2", 2, 20]]})
+    load(path, tmp_path / "cache")
+    # 只修改B表的数字单元格：共享字符串表不变，A表指纹不变
+    make_workbook({"A": [HEADERS, ["F1", "P1", 1, 10]], "B": [HEADERS, ["F2", "P2", 2, 99]]})
+    snapshots = load(path, tmp_path / "cache")
+
+    assert parse_calls == [["A", "B"], ["B"]]
+    assert snapshots["B"].rows == [("F2", "P2", 2, 99)]
+    assert snapshots["A"].rows == [("F1", "P1", 1, 10)]
+
+
+def with_shared_strings(path, text):
+    """替换xlsx中的共享字符串表条目（工作表引用的字符串可能在其中，内容变化时所有工作表都要重新解析）"""
+    with ZipFile(path) as archive:
+        entries = {info.filename: archive.read(info) for info in archive.infolist()}
+    entries[ParseCache.SHARED_STRINGS_PART] = text.encode("utf-8")
+    with ZipFile(path, "w") as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data)
+
+
+def test_shared_strings_change_invalidates_every_sheet(make_workbook, tmp_path):
+    path = make_workbook({"A": [HEADERS, ["F1", "P1", 1, 10]], "B": [HEADERS, ["F2", "P2", 2, 20]]})
+    cache = ParseCache(str(tmp_path / "cache"), ["A", "B"], ["folder", "po", "lot"])
+    with_shared_strings(path, "<sst><si><t>P2</t></si></sst>")
+    before = cache.sheet_fingerprints(path)
+    with_shared_strings(path, "<sst><si><t>P3</t></si></sst>")
+    after = cache.sheet_fingerprints(path)
+
+    assert list(before) == ["A", "B"]
+    assert before["A"] != after["A"] and before["B"] != after["B"]
+
+
+def test_parse_options_use_separate_entries(make_workbook, tmp_path, parse_calls):
+    path = make_workbook({"A": [HEADERS, ["F1", "P1", 1, 10]]})
+    load(path, tmp_path / "cache")
+    snapshots = load(path, tmp_path / "cache", key_fields=("folder", "po"))
+
+    assert len(parse_calls) == 2
+    assert snapshots["A"].keys == [("F1", "P1")]
+
+
+def test_corrupt_entry_is_reparsed(make_workbook, tmp_path, parse_calls):
+    path = make_workbook({"A": [HEADERS, ["F1", "P1", 1, 10]]})
+    load(path, tmp_path / "cache")
+    for entry in (tmp_path / "cache" / "sheets").iterdir():
+        entry.write_bytes(b"not a pickle")
+    snapshots = load(path, tmp_path / "cache")
+
+    assert len(parse_calls) == 2
+    assert snapshots["A"].rows == [("F1", "P1", 1, 10)]
+
+
+def test_non_xlsx_file_has_no_fingerprints(tmp_path):
+    path = tmp_path / "book.xlsx"
+    path.write_bytes(b"plain text")
+    assert ParseCache(str(tmp_path / "cache")).sheet_fingerprints(str(path)) is None
@@ -0,0 +1,61 @@
+from sinotrans.core import SheetSidecar
+from sinotrans.utils import GlobalThreadPool
+import pytest
+
+MODES = {
+    "process_pool": dict(pool_backend=GlobalThreadPool.BACKEND_PROCESS),
+    "concurrent_sheets": dict(concurrent_sheets=True),
+    "concurrent_sheets_process": dict(concurrent_sheets=True, pool_backend=GlobalThreadPool.BACKEND_PROCESS),
+    "columnar": dict(engine="columnar"),
+    "columnar_concurrent_sheets": dict(engine="columnar", concurrent_sheets=True),
+    "streaming_output": dict(streaming_output=True),
+    "streaming_merge": dict(streaming_merge=True),
+    "map_memo": dict(map_memo=True),
+    "no_caches": dict(parse_cache=False, sidecar=False),
+}
+
+
+def without_trailing_blank_rows(sheets):
+    """流式写入与普通保存的结果文件末尾空行数可能不同，只比较数据"""
+    trimmed = {}
+    for name, rows in sheets.items():
+        rows = list(rows)
+        while rows and all(value is None for value in rows[-1]):
+            rows.pop()
+        trimmed[name] = rows
+    return trimmed
+
+
+@pytest.fixture
+def reference(run_snt):
+    """默认参数（逐行引擎、线程池）的结果"""
+    return without_trailing_blank_rows(run_snt(parse_cache=False, sidecar=False))
+
+
+def test_reference_output_has_merged_rows(reference):
+    # 每个生成的工作表都有表头和基准数据行
+    assert len(reference["CREATED"]) > 60 and len(reference["NOT INCLUDED"]) > 60
+
+
+@pytest.mark.parametrize("options", MODES.values(), ids=MODES.keys())
+def test_engine_modes_produce_identical_output(run_snt, reference, options):
+    assert without_trailing_blank_rows(run_snt(**options)) == reference
+
+
+def test_cached_second_run_matches_first_run(run_snt, reference, snt_workspace):
+    """第二次运行从解析缓存/旁路文件加载输入，结果不变"""
+    assert without_trailing_blank_rows(run_snt()) == reference
+    assert any((snt_workspace / ".cache" / "parse").iterdir())
+    assert without_trailing_blank_rows(run_snt()) == reference
+
+
+@pytest.mark.skipif(not SheetSidecar.available(), reason="需要pyarrow")
+def test_output_sidecar_is_found_from_any_working_directory(run_snt, snt_workspace, tmp_path, monkeypatch):
+    """分析界面按工作目录的默认旁路根目录读取结果文件的旁路文件，与启动目录无关"""
+    run_snt()
+    target_file = next((snt_workspace / "target").glob("*.xlsx"))
+    monkeypatch.chdir(tmp_path)
+
+    frame = SheetSidecar.load_frame(str(target_file), "CREATED", root=SheetSidecar.default_root(str(snt_workspace)))
+    assert frame is not None and len(frame) == 60
+    assert SheetSidecar.load_frame(str(target_file), "CREATED") is None
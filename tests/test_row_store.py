@@ -0,0 +1,88 @@
+from sinotrans.core import RowStore
+import pytest
+
+HEADERS = ["po", "lot", "status"]
+
+
+@pytest.fixture
+def store():
+    return RowStore(HEADERS, 4, defaults=["", "", "FIXED"])
+
+
+def test_unwritten_cells_use_column_defaults(store):
+    store.set(1, 0, "P1")
+    assert store.get(1, 0) == "P1"
+    assert store.get(0, 0) == ""
+    assert store.row(2) == ["", "", "FIXED"]
+    assert list(store) == [["", "", "FIXED"], ["P1", "", "FIXED"], ["", "", "FIXED"], ["", "", "FIXED"]]
+    assert len(store) == 4
+
+
+def test_store_can_be_iterated_repeatedly(store):
+    store.set(0, 1, 1)
+    assert list(store) == list(store)
+
+
+def test_compact_densifies_only_columns_over_threshold(store):
+    store.set(0, 0, "P1")
+    store.set(1, 0, "P2")
+    store.set(3, 1, "L4")
+    store.DENSE_RATIO = 1 / 4
+    store.compact()
+
+    assert store.columns[0] == ["P1", "P2", "", ""]
+    assert store.columns[1] == {3: "L4"}
+    assert store.columns[2] == {}
+    assert list(store)[3] == ["", "L4", "FIXED"]
+
+
+def test_densify_fills_defaults(store):
+    store.set(2, 2, "OPEN")
+    store.densify([2, 2])
+    assert store.columns[2] == ["FIXED", "FIXED", "OPEN", "FIXED"]
+    store.set(0, 2, "CLOSED")
+    assert store.get(0, 2) == "CLOSED"
+
+
+@pytest.mark.parametrize("dense_target", [False, True])
+def test_merge_overwrites_written_cells_only(store, dense_target):
+    store.set(0, 0, "P1")
+    store.set(1, 0, "P2")
+    if dense_target:
+        store.densify(range(len(HEADERS)))
+
+    update = RowStore(HEADERS, 4)
+    update.set(1, 0, "P2-new")
+    update.set(3, 2, "OPEN")
+    store.merge(update)
+
+    assert [store.get(row_id, 0) for row_id in range(4)] == ["P1", "P2-new", "", ""]
+    assert [store.get(row_id, 2) for row_id in range(4)] == ["FIXED", "FIXED", "FIXED", "OPEN"]
+
+
+def test_merge_replaces_column_with_dense_update(store):
+    store.set(0, 0, "P1")
+    update = RowStore(HEADERS, 4)
+    update.densify([0])
+    update.set(2, 0, "P3")
+    store.merge(update)
+    assert store.columns[0] == ["", "", "P3", ""]
+    # 合并的是副本，之后修改局部更新集不影响基准行存储
+    update.set(3, 0, "P4")
+    assert store.get(3, 0) == ""
+
+
+def test_merge_in_file_order_keeps_last_write(store):
+    first, second = RowStore(HEADERS, 4), RowStore(HEADERS, 4)
+    first.set(0, 1, "first")
+    second.set(0, 1, "second")
+    for update in (first, second):
+        store.merge(update)
+    assert store.get(0, 1) == "second"
+
+
+def test_from_columns():
+    store = RowStore.from_columns(HEADERS, [["P1", "P2"], [1, 2], ["A", "B"]])
+    assert len(store) == 2
+    assert list(store) == [["P1", 1, "A"], ["P2", 2, "B"]]
+    assert len(RowStore.from_columns([], [])) == 0
@@ -0,0 +1,104 @@
+from sinotrans.core import Rule
+import math
+import numpy as np
+import pandas as pd
+import pytest
+import random
+
+
+def same(left, right):
+    return left == right or (isinstance(left, float) and isinstance(right, float) and math.isnan(left) and math.isnan(right))
+
+
+def assert_batch_matches_map_action(rule, values):
+    """map_batch 的每个元素与逐个调用 map_action 的结果一致；map_action 抛出异常的元素结果为None并记入errors"""
+    result, errors = rule.map_batch(values)
+    assert list(result.index) == list(range(len(values)))
+    for pos, value in enumerate(values):
+        try:
+            expected = rule.map_action(value)
+        except (ValueError, AttributeError, TypeError):
+            assert pos in errors, f"{value!r} 应记入errors"
+            assert result[pos] is None
+            continue
+        assert pos not in errors, f"{value!r}: {errors.get(pos)}"
+        assert same(result[pos], expected), f"{value!r}: {result[pos]!r} != {expected!r}"
+        assert type(result[pos]) is type(expected), f"{value!r}: {type(result[pos])} != {type(expected)}"
+
+
+VALUES = ["a#b#c", "a", "#", "a##b", "", None, 0, 0.0, False, "x-y", 12, " a # b "]
+
+
+@pytest.mark.parametrize("rule", [
+    Rule("f"),
+    Rule("f", splitter="#"),
+    Rule("f", splitter="#", mode="last"),
+    Rule("f", splitter="#", mode="allbutlast"),
+    Rule("f", splitter="#", index=2),
+    Rule("f", splitter="#", index=1, mode="last"),
+    Rule("f", splitter="#", index=0),
+    Rule("f", splitter="##", mode="allbutlast"),
+], ids=["plain", "split", "last", "allbutlast", "index", "index-over-mode", "bad-index", "multi-char"])
+def test_split_matches_map_action(rule):
+    assert_batch_matches_map_action(rule, VALUES)
+
+
+def test_split_then_round():
+    rule = Rule("f", splitter="/", index=2, method="round", dp=1)
+    assert_batch_matches_map_action(rule, ["a/1.25", "a/2.35", "a/x", "a", "b/-0.05/c"])
+
+
+def test_round_invalid_values_are_collected():
+    rule = Rule("f", method="round", dp=2)
+    result, errors = rule.map_batch(["1.005", "abc", None, object(), "2"])
+    assert list(result) == [round(1.005, 2), None, None, None, 2.0]
+    assert sorted(errors) == [1, 3]
+
+
+def test_round_matches_builtin_round_on_many_values():
+    """四舍五入的向量化路径与内置 round 逐个结果一致，重点覆盖接近 .5 进位边界的值"""
+    rng = random.Random(20250801)
+    for dp in (0, 1, 2, 3, 4):
+        scale = 10 ** dp
+        values = []
+        for _ in range(8000):
+            kind = rng.random()
+            if kind < 0.4:
+                # 十进制下恰好在 .5 边界上的值（二进制表示可能略大或略小）
+                values.append((rng.randint(-10 ** 6, 10 ** 6) + 0.5) / scale)
+            elif kind < 0.6:
+                values.append(repr((rng.randint(-10 ** 6, 10 ** 6) + 0.5) / scale))
+            elif kind < 0.9:
+                values.append(rng.uniform(-1e6, 1e6))
+            else:
+                values.append(rng.choice([1e300, -1e300, 2.0 ** 53 + 1, 1e-320, float("inf"), "nan", 7, -3]))
+        assert_batch_matches_map_action(Rule("f", method="round", dp=dp), values)
+
+
+def test_round_without_integer_dp_uses_builtin_round():
+    assert_batch_matches_map_action(Rule("f", method="round", dp=None), ["2.5", 3.5, "-0.5", 1.2])
+
+
+def test_accepts_arrow_and_preserves_series_index():
+    pa = pytest.importorskip("pyarrow")
+    rule = Rule("f", splitter="#", mode="last")
+    result, errors = rule.map_batch(pa.array(["a#b", None, "c"]))
+    assert list(result) == ["b", None, "c"] and not errors
+
+    series = pd.Series(["a#b", 5, "c#d"], index=[10, 10, 3], dtype=object)
+    result, errors = rule.map_batch(series)
+    assert list(result.index) == [10, 10, 3]
+    assert list(result) == ["b", None, "d"]
+    assert list(errors) == [10]
+
+
+def test_split_without_pyarrow(monkeypatch):
+    monkeypatch.setattr("sinotrans.core.rule.pc", None)
+    for rule in (Rule("f", splitter="#", mode="last"), Rule("f", splitter="#", mode="allbutlast"), Rule("f", splitter="#", index=2)):
+        assert_batch_matches_map_action(rule, VALUES)
+
+
+def test_str_subclasses_are_split():
+    rule = Rule("f", splitter="#", index=1)
+    result, errors = rule.map_batch(pd.Series([np.str_("a#b"), np.str_("c")], dtype=object))
+    assert list(result) == ["a", "c"] and not errors
@@ -0,0 +1,85 @@
+from sinotrans.core import Rule, RuleMemo
+import pytest
+
+
+class CountingRule(Rule):
+    """记录 map_action 实际调用次数"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+
+    def map_action(self, raw_value, readUntilBlank_index=None):
+        self.calls += 1
+        return super().map_action(raw_value, readUntilBlank_index)
+
+
+@pytest.fixture(autouse=True)
+def memo():
+    yield RuleMemo
+    RuleMemo.disable()
+
+
+def test_disabled_memo_calls_map_action_every_time():
+    rule = CountingRule("f", splitter="#", mode="last")
+    assert RuleMemo.map(rule, "a#b") == RuleMemo.map(rule, "a#b") == "b"
+    assert rule.calls == 2
+    assert RuleMemo.stats()["size"] == 0
+
+
+def test_repeated_values_are_served_from_cache():
+    RuleMemo.enable(8)
+    rule = CountingRule("f", splitter="#", mode="last")
+    assert [RuleMemo.map(rule, value) for value in ("a#b", "a#b", "c#d", "a#b")] == ["b", "b", "d", "b"]
+    assert rule.calls == 2
+    assert RuleMemo.stats() == {"hits": 2, "misses": 2, "hit_rate": 0.5, "size": 2, "maxsize": 8}
+
+
+def test_least_recently_used_entry_is_evicted():
+    RuleMemo.enable(2)
+    rule = CountingRule("f")
+    RuleMemo.map(rule, "a")
+    RuleMemo.map(rule, "b")
+    RuleMemo.map(rule, "a")  # a 成为最近使用
+    RuleMemo.map(rule, "c")  # 淘汰 b
+    assert RuleMemo.stats()["size"] == 2
+
+    calls = rule.calls
+    RuleMemo.map(rule, "a")
+    assert rule.calls == calls
+    RuleMemo.map(rule, "b")
+    assert rule.calls == calls + 1
+
+
+def test_equal_values_of_different_types_are_cached_separately():
+    RuleMemo.enable()
+    rule = Rule("f", method="round", dp=0)
+    assert RuleMemo.map(rule, 1) == 1.0
+    assert RuleMemo.map(rule, True) == 1.0
+    assert type(RuleMemo.map(Rule("f"), 1)) is int
+    assert type(RuleMemo.map(Rule("f"), 1.0)) is float
+    assert RuleMemo.stats()["size"] == 4
+
+
+def test_rules_are_distinguished_by_identity():
+    RuleMemo.enable()
+    first, second = Rule("f", splitter="#", index=1), Rule("f", splitter="#", index=2)
+    assert RuleMemo.map(first, "a#b") == "a"
+    assert RuleMemo.map(second, "a#b") == "b"
+
+
+def test_unhashable_values_and_errors_are_not_cached():
+    RuleMemo.enable()
+    rule = CountingRule("f")
+    assert RuleMemo.map(rule, ["x"]) == ["x"]
+    with pytest.raises(ValueError):
+        RuleMemo.map(Rule("f", method="round"), "abc")
+    assert RuleMemo.stats()["size"] == 0
+
+
+def test_enable_and_clear_reset_counters():
+    RuleMemo.enable()
+    RuleMemo.map(Rule("f"), "a")
+    RuleMemo.clear()
+    assert RuleMemo.stats()["misses"] == 0 and RuleMemo.stats()["size"] == 0
+    with pytest.raises(ValueError):
+        RuleMemo.enable(0)
@@ -0,0 +1,155 @@
+from sinotrans.core import ImapSessionPool, EmailClient
+import asyncio
+import threading
+import pytest
+
+
+def make_pool(server, **kwargs):
+    return ImapSessionPool("127.0.0.1", server.port, "user", "secret", use_ssl=False, **kwargs)
+
+
+def run_pool(server, scenario, **kwargs):
+    async def main():
+        pool = make_pool(server, **kwargs)
+        try:
+            return await scenario(pool)
+        finally:
+            await pool.close()
+    return asyncio.run(main())
+
+
+def test_checkout_and_return_reuses_session(imap_server):
+    async def scenario(pool):
+        first = await pool.acquire()
+        pool.release(first)
+        second = await pool.acquire()
+        pool.release(second)
+        return first is second, pool.stats()
+
+    same, stats = run_pool(imap_server, scenario, size=2)
+    assert same
+    assert stats == {"created": 1, "reused": 1, "health_checks": 0, "discarded": 0, "idle": 1}
+    assert imap_server.commands.count("LOGIN") == 1
+
+
+def test_checkout_waits_when_pool_is_exhausted(imap_server):
+    async def scenario(pool):
+        first, second = await pool.acquire(), await pool.acquire()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(pool.acquire(), 0.2)
+        pool.release(first)
+        third = await asyncio.wait_for(pool.acquire(), 1)
+        pool.release(second)
+        pool.release(third)
+        return third is first, pool.stats()
+
+    reused, stats = run_pool(imap_server, scenario, size=2)
+    assert reused
+    assert stats["created"] == 2 and stats["idle"] == 2
+
+
+@pytest.mark.parametrize("idle_check, noops", [(60, 0), (0, 2)])
+def test_health_check_only_for_idle_sessions(imap_server, idle_check, noops):
+    """未超过空闲时间的会话直接复用，不发送NOOP"""
+    async def scenario(pool):
+        for _ in range(3):
+            async with pool.session() as mail:
+                await mail.uid('SEARCH', 'ALL')
+        return pool.stats()
+
+    stats = run_pool(imap_server, scenario, idle_check=idle_check)
+    assert imap_server.commands.count("NOOP") == stats["health_checks"] == noops
+    assert stats["created"] == 1 and stats["reused"] == 2
+
+
+def test_dead_session_is_replaced(imap_server):
+    """空闲会话健康检查时连接断开：丢弃该会话并新建会话"""
+    imap_server.drop_after = {"NOOP": 1}
+
+    async def scenario(pool):
+        async with pool.session() as first:
+            pass
+        async with pool.session() as second:
+            status, _ = await second.uid('SEARCH', 'ALL')
+        return first is second, status, pool.stats()
+
+    same, status, stats = run_pool(imap_server, scenario, idle_check=0)
+    assert not same and status == 'OK'
+    assert stats["created"] == 2 and stats["discarded"] == 1
+    assert imap_server.commands.count("LOGIN") == 2
+
+
+def test_closed_and_failed_sessions_are_not_returned(imap_server):
+    async def scenario(pool):
+        mail = await pool.acquire()
+        await mail.close()
+        pool.release(mail)
+        with pytest.raises(RuntimeError):
+            async with pool.session():
+                raise RuntimeError("operation failed")
+        async with pool.session() as mail:
+            pass
+        return pool.stats()
+
+    stats = run_pool(imap_server, scenario)
+    assert stats["discarded"] == 2
+    assert stats["created"] == 3 and stats["idle"] == 1
+    # 已断开的会话不做健康检查
+    assert stats["health_checks"] == 0
+
+
+def sync_client(server, **kwargs):
+    return EmailClient("127.0.0.1", server.port, "user", "secret", **kwargs)
+
+
+def test_sync_client_reuses_pooled_session_without_noop(imap_server):
+    imap_server.add("INBOX", 3)
+    client = sync_client(imap_server)
+    try:
+        for _ in range(3):
+            status, data = client.search_mail(None, 'ALL')
+            assert status == 'OK' and data[0].split() == [b"1", b"2", b"3"]
+        assert client.mail is None
+        assert client.pool.stats()["reused"] == 2
+    finally:
+        client._reset_connection()
+    assert imap_server.commands.count("LOGIN") == 1
+    assert "NOOP" not in imap_server.commands
+
+
+def test_sync_client_spreads_threads_across_sessions(imap_server):
+    """多个线程同时操作时各自独占一个会话"""
+    client = sync_client(imap_server, pool_size=2)
+    barrier = threading.Barrier(2, timeout=5)
+    sessions = []
+
+    def operation():
+        sessions.append(client.mail)
+        barrier.wait()
+        return client.mail.noop()
+
+    threads = [threading.Thread(target=client._retry_imap_operation, args=(operation,)) for _ in range(2)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(set(map(id, sessions))) == 2
+        assert client.pool.stats()["idle"] == 2
+    finally:
+        client._reset_connection()
+
+
+def test_sync_client_replaces_dead_session(imap_server):
+    imap_server.add("INBOX", 1)
+    imap_server.drop_after = {"NOOP": 1}
+    client = sync_client(imap_server, idle_check=0)
+    try:
+        client.connect_imap()
+        status, _ = client.search_mail(None, 'ALL')
+        stats = client.pool.stats()
+    finally:
+        client._reset_connection()
+    assert status == 'OK'
+    assert stats["health_checks"] == 1 and stats["discarded"] == 1 and stats["created"] == 2
+    assert imap_server.commands.count("LOGIN") == 2
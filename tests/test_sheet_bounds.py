@@ -0,0 +1,57 @@
+from io import BytesIO
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font
+from sinotrans.core import ExcelProcessor, SheetBounds
+
+
+def styled_workbook(path):
+    """数据只到C3，但F1000只有样式没有值（dimension被撑到F1000）"""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "A"
+    for row in (["h1", "h2", "h3"], [1, 2, 3], [4, None, "x"]):
+        ws.append(row)
+    ws["F1000"].font = Font(bold=True)
+    wb.save(path)
+    return path
+
+
+def test_read_only_sheet_ignores_style_only_cells(tmp_path):
+    path = styled_workbook(tmp_path / "book.xlsx")
+    wb = load_workbook(path, read_only=True)
+    ws = wb["A"]
+    assert (ws.max_row, ws.max_column) == (1000, 6)
+    assert SheetBounds.of(ws) == (3, 3)
+    assert list(ExcelProcessor.iter_sheet_values(ws)) == [("h1", "h2", "h3"), (1, 2, 3), (4, None, "x")]
+    wb.close()
+
+
+def test_normal_sheet_ignores_empty_cells(tmp_path):
+    wb = load_workbook(styled_workbook(tmp_path / "book.xlsx"))
+    ws = wb["A"]
+    ws["Z50"].value = None
+    assert SheetBounds.of(ws) == (3, 3)
+
+
+def test_empty_sheet():
+    assert SheetBounds.scan_xml(BytesIO(b'<worksheet><sheetData><row r="1"><c r="A1" s="1"/></row></sheetData></worksheet>')) == (0, 0)
+
+
+def test_scan_matches_cells_across_chunk_boundaries(monkeypatch):
+    cells = "".join(f'<c r="{col}{row}" t="n"><v>{row}</v></c>' for row in range(1, 200) for col in ("A", "B", "AB"))
+    xml = f'<worksheet><sheetData>{cells}<c r="ZZ500" s="2"/></sheetData></worksheet>'.encode()
+    monkeypatch.setattr(SheetBounds, "CHUNK_SIZE", 37)
+    assert SheetBounds.scan_xml(BytesIO(xml)) == (199, 28)
+
+
+def test_inline_strings_and_formulas_count_as_values():
+    xml = (b'<worksheet><sheetData>'
+           b'<c r="B7" t="inlineStr"><is><t>x</t></is></c>'
+           b'<x:c r="D9"><x:f>SUM(A1)</x:f></x:c>'
+           b'<c r="E20" s="1"></c>'
+           b'</sheetData></worksheet>')
+    assert SheetBounds.scan_xml(BytesIO(xml)) == (9, 4)
+
+
+def test_cells_without_reference_cannot_be_bounded():
+    assert SheetBounds.scan_xml(BytesIO(b'<worksheet><sheetData><row><c t="n"><v>1</v></c></row></sheetData></worksheet>')) is None
@@ -0,0 +1,88 @@
+from datetime import date, datetime, time
+from sinotrans.core import ExcelProcessor, SheetSidecar
+import os
+import pytest
+
+pytestmark = pytest.mark.skipif(not SheetSidecar.available(), reason="需要pyarrow")
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "input" / "book.xlsx"
+    path.parent.mkdir()
+    path.write_bytes(b"source workbook")
+    return str(path)
+
+
+def test_round_trip_keeps_cell_and_header_types(source, tmp_path):
+    root = str(tmp_path / "sidecar")
+    headers = ["po", 2025, datetime(2025, 8, 1, 9, 30), date(2025, 8, 2), time(8, 0), None, 1.5, True]
+    rows = [
+        ("P1", 1, datetime(2025, 1, 1), date(2025, 1, 2), time(1, 2), None, 1.25, False),
+        (7000001, "x", None, None, None, "y", None, True),
+    ]
+    SheetSidecar.write(source, {"A": (headers, rows)}, ["A"], root=root)
+
+    loaded_headers, loaded_rows = SheetSidecar.load_values(source, "A", root=root)
+    assert loaded_headers == headers
+    assert [type(header) for header in loaded_headers] == [type(header) for header in headers]
+    assert loaded_rows == rows
+    # 混合类型列（文本和数字混合的PO号）保持各自的类型
+    assert [type(row[0]) for row in loaded_rows] == [str, int]
+
+
+def test_sidecar_is_written_under_root_not_next_to_source(source, tmp_path):
+    root = tmp_path / "sidecar"
+    SheetSidecar.write(source, {"A": (["po"], [("P1",)])}, root=str(root))
+
+    assert os.listdir(os.path.dirname(source)) == ["book.xlsx"]
+    assert os.path.dirname(SheetSidecar.sidecar_dir(source, str(root))) == str(root)
+    assert SheetSidecar.read_manifest(source, str(root))["sheets"] == {"A": "sheet0.arrow"}
+
+
+def test_same_file_name_in_different_folders_do_not_collide(tmp_path):
+    root = str(tmp_path / "sidecar")
+    first, second = tmp_path / "res" / "book.xlsx", tmp_path / "report" / "book.xlsx"
+    for path in (first, second):
+        path.parent.mkdir()
+        path.write_bytes(b"source workbook")
+    assert SheetSidecar.sidecar_dir(str(first), root) != SheetSidecar.sidecar_dir(str(second), root)
+
+
+def test_source_change_invalidates_sidecar(source, tmp_path):
+    root = str(tmp_path / "sidecar")
+    SheetSidecar.write(source, {"A": (["po"], [("P1",)])}, root=root)
+    assert SheetSidecar.load_values(source, "A", root=root) is not None
+
+    with open(source, "ab") as f:
+        f.write(b" changed")
+    assert SheetSidecar.read_manifest(source, root) is None
+    assert SheetSidecar.load_values(source, "A", root=root) is None
+
+
+def test_merge_keeps_other_sheets_of_unchanged_source(source, tmp_path):
+    root = str(tmp_path / "sidecar")
+    SheetSidecar.write(source, {"A": (["po"], [("P1",)])}, ["A", "B"], root=root)
+    SheetSidecar.write(source, {"B": (["po"], [("P2",)])}, root=root)
+    assert SheetSidecar.load_values(source, "A", root=root) == (["po"], [("P1",)])
+    assert SheetSidecar.load_values(source, "B", root=root) == (["po"], [("P2",)])
+
+    SheetSidecar.write(source, {"B": (["po"], [("P3",)])}, merge=False, root=root)
+    assert SheetSidecar.load_values(source, "A", root=root) is None
+
+
+def test_snapshots_from_sidecar_match_parsed_snapshots(make_workbook, tmp_path, monkeypatch):
+    headers = ["folder", "po", "lot", datetime(2025, 8, 1)]
+    path = make_workbook({"A": [headers, ["F1", "P1", 1, 10], [" F2 ", 7000002, 2.0, None]]})
+    root = str(tmp_path / "sidecar")
+    load = lambda: ExcelProcessor.load_sheet_snapshots(path, ["A"], ["folder", "po", "lot"], sidecar_dir=root)[1]["A"]
+    parsed = load()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("旁路文件有效时不应重新解析Excel")
+    monkeypatch.setattr("sinotrans.core.excel_processor.load_workbook", fail)
+    cached = load()
+
+    assert cached.headers == parsed.headers == headers
+    assert cached.rows == parsed.rows
+    assert cached.keys == parsed.keys == [("F1", "P1", "1"), ("F2", "7000002", "2")]
@@ -0,0 +1,60 @@
+from openpyxl import load_workbook
+from sinotrans.core import FileProcessor, SheetStyler, StreamingWorkbookWriter
+import os
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "template.xlsx")
+
+
+def data_font(path, sheet_name="CREATED"):
+    wb = load_workbook(path)
+    ws = wb[sheet_name]
+    font = ws["A2"].font
+    return (font.name, font.sz), (ws["A1"].font.name, ws["A1"].font.b), ws.column_dimensions["B"].width
+
+
+def test_template_default_font_is_not_calibri():
+    # 前提：模板默认字体为宋体，数据单元格不设置字体时不是Calibri
+    wb = load_workbook(TEMPLATE)
+    assert wb._fonts[0].name != SheetStyler.DATA_FONT.name
+
+
+def test_template_output_uses_data_font(tmp_path):
+    wb = load_workbook(TEMPLATE)
+    ws = wb["CREATED"]
+    ws.append(["P1", "x"])
+    ws.append(["P2", "y"])
+    SheetStyler.apply(ws, column_width=20)
+    path = tmp_path / "out.xlsx"
+    wb.save(path)
+
+    assert data_font(path) == (("Calibri", 11), ("Calibri", True), 20)
+    # 其他未设置字体的单元格、"常规"样式同样使用数据字体
+    saved = load_workbook(path)
+    assert saved["CREATED"]["Z5"].font.name == "Calibri"
+    assert next(style for style in saved._named_styles if style.builtinId == 0).font.name == "Calibri"
+
+
+def test_streaming_output_uses_data_font(tmp_path):
+    path = tmp_path / "out.xlsx"
+    writer = StreamingWorkbookWriter(TEMPLATE, str(path))
+    writer.write_rows("CREATED", [["P1", "x"]])
+    writer.save()
+    assert data_font(path) == (("Calibri", 11), ("Calibri", True), SheetStyler.DEFAULT_COLUMN_WIDTH)
+    assert load_workbook(path)._fonts[0] == SheetStyler.DATA_FONT
+
+
+def test_default_style_sets_width_for_every_column(tmp_path):
+    wb = load_workbook(TEMPLATE)
+    ws = wb["CREATED"]
+    FileProcessor.apply_default_style(ws)
+    assert {ws.column_dimensions[letter].width for letter in ("A", "M", "AA")} == {40}
+    assert ws.freeze_panes == "A2"
+
+
+def test_apply_default_font_keeps_font_indexes():
+    wb = load_workbook(TEMPLATE)
+    fonts = list(wb._fonts)
+    SheetStyler.apply_default_font(wb)
+    SheetStyler.apply_default_font(wb)
+    assert list(wb._fonts) == [SheetStyler.DATA_FONT, *fonts[1:]]
+    assert wb._fonts.index(fonts[2]) == 2
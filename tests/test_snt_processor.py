@@ -0,0 +1,82 @@
+from pathlib import Path
+from sinotrans.core import RowStore
+from sinotrans.utils import GlobalThreadPool, global_thread_pool
+from snt2 import AutoSntProcessor
+import pytest
+import threading
+import time
+
+HEADERS = ["po", "status"]
+
+
+def partial(values):
+    store = RowStore(HEADERS, 3)
+    for row_id, value in values.items():
+        store.set(row_id, 1, value)
+    return store
+
+
+def reduced(partials):
+    base = RowStore(HEADERS, 3, defaults=["", "NEW"])
+    AutoSntProcessor._reduce_partials(base, partials)
+    return [base.get(row_id, 1) for row_id in range(3)]
+
+
+def test_later_files_override_earlier_files():
+    first, second = partial({0: "first", 1: "first"}), partial({1: "second"})
+    assert reduced([first, second]) == ["first", "second", "NEW"]
+    assert reduced([second, first]) == ["first", "first", "NEW"]
+
+
+def test_files_without_valid_sheets_are_skipped():
+    assert reduced([None, partial({2: "only"}), None]) == ["NEW", "NEW", "only"]
+
+
+def test_reduce_accepts_lazy_results():
+    order = []
+
+    def results():
+        for name in ("a", "b"):
+            order.append(name)
+            yield partial({0: name})
+    assert reduced(results()) == ["b", "NEW", "NEW"]
+    assert order == ["a", "b"]
+
+
+def test_merge_order_does_not_depend_on_task_completion(run_snt, monkeypatch):
+    """靠前的文件任务最后完成时，归并结果仍按文件顺序"""
+    expected = run_snt()
+
+    original = AutoSntProcessor._process_single_file
+    finished = []
+    lock = threading.Lock()
+
+    def delayed(self, sheets_wb_map, sheet_name, fp, *args):
+        # 每个文件夹中文件名最靠前的文件最后完成
+        if Path(fp).name.startswith("000_"):
+            time.sleep(0.3)
+        result = original(self, sheets_wb_map, sheet_name, fp, *args)
+        with lock:
+            finished.append(Path(fp).name)
+        return result
+    monkeypatch.setattr(AutoSntProcessor, "_process_single_file", delayed)
+
+    assert run_snt() == expected
+    assert finished[-1].startswith("000_")
+
+
+@pytest.mark.parametrize("concurrent_sheets", [False, True])
+def test_process_backend_reuses_one_pool(run_snt, monkeypatch, concurrent_sheets):
+    """进程池后端在所有文件夹/工作表间复用同一个进程池，流程结束时统一关闭"""
+    created = []
+    original = global_thread_pool.concurrent.futures.ProcessPoolExecutor
+
+    class CountingPool(original):
+        def __init__(self, *args, **kwargs):
+            created.append(self)
+            super().__init__(*args, **kwargs)
+    monkeypatch.setattr(global_thread_pool.concurrent.futures, "ProcessPoolExecutor", CountingPool)
+
+    run_snt(pool_backend=GlobalThreadPool.BACKEND_PROCESS, concurrent_sheets=concurrent_sheets)
+    assert len(created) == 1
+    assert GlobalThreadPool._executor is None
@@ -0,0 +1,131 @@
+from sinotrans.core import AsyncEmailClient, AsyncImapConnection, EmailClient
+import asyncio
+import functools
+import os
+import pytest
+
+
+def run_client(server, action, *args, max_retries=5, **kwargs):
+    async def main():
+        async with AsyncEmailClient("127.0.0.1", server.port, "user", "secret", use_ssl=False,
+                                    max_retries=max_retries) as client:
+            return await getattr(client, action)(*args, **kwargs)
+    return asyncio.run(main())
+
+
+def stream(server, email_uids, **kwargs):
+    received = []
+    count = run_client(server, "fetch_emails_streaming", email_uids,
+                       lambda uid, payload: received.append((uid, payload)), **kwargs)
+    return count, received
+
+
+@pytest.mark.parametrize("chunk_size, fetches", [(3, 3), (7, 1), (100, 1), (1, 7)])
+def test_streaming_fetch_issues_one_command_per_chunk(imap_server, chunk_size, fetches):
+    imap_server.add("INBOX", 7)
+    count, received = stream(imap_server, [str(uid) for uid in range(1, 8)], chunk_size=chunk_size)
+    assert count == 7
+    assert sorted(received) == [(str(uid), imap_server.body("INBOX", uid)) for uid in range(1, 8)]
+    assert imap_server.commands.count("UID FETCH") == fetches
+
+
+def test_streaming_fetch_expands_uid_set(imap_server):
+    imap_server.add("INBOX", 5)
+    count, received = stream(imap_server, "3:*", chunk_size=2)
+    assert count == 3 and sorted(uid for uid, _ in received) == ["3", "4", "5"]
+    assert imap_server.commands.count("UID SEARCH") == 1
+    assert imap_server.commands.count("UID FETCH") == 2
+
+
+def test_streaming_fetch_retries_partial_chunk(imap_server):
+    """第二段只收到一封半邮件时断开：重连后重新获取整段，已回调的邮件再次回调，半封邮件不回调"""
+    imap_server.add("INBOX", 6)
+    imap_server.fetch_cut = {2: 1}
+    count, received = stream(imap_server, [str(uid) for uid in range(1, 7)], chunk_size=3)
+    uids = [uid for uid, _ in received]
+    assert sorted(set(uids)) == ["1", "2", "3", "4", "5", "6"]
+    assert uids.count("4") == 2 and uids.count("5") == 1
+    assert count == 7
+    assert imap_server.commands.count("UID FETCH") == 3
+    assert imap_server.commands.count("LOGIN") == 2
+
+
+def test_streaming_callback_error_is_not_retried(imap_server):
+    imap_server.add("INBOX", 4)
+
+    def on_message(uid, payload):
+        raise ValueError(uid)
+    with pytest.raises(ValueError):
+        run_client(imap_server, "fetch_emails_streaming", ["1", "2", "3", "4"], on_message, chunk_size=2)
+    assert imap_server.commands.count("LOGIN") == 1
+
+
+def eml_files(directory):
+    return sorted(os.listdir(directory))
+
+
+def test_fetch_to_dir_writes_one_file_per_message(imap_server, tmp_path):
+    imap_server.add("INBOX", 5)
+    saved = run_client(imap_server, "fetch_emails_to_dir", ["1", "2", "3", "4", "5"], str(tmp_path), chunk_size=2)
+    assert sorted(saved) == ["1", "2", "3", "4", "5"]
+    assert eml_files(tmp_path) == [f"{uid}.eml" for uid in range(1, 6)]
+    for uid, path in saved.items():
+        with open(path, "rb") as f:
+            assert f.read() == imap_server.body("INBOX", int(uid))
+
+
+def test_fetch_to_dir_recovers_from_partial_chunk(imap_server, tmp_path):
+    """中途断开时半封邮件的临时文件被清理，重试后每封邮件只保存一个完整文件"""
+    imap_server.add("INBOX", 6)
+    imap_server.fetch_cut = {2: 1}
+    saved = run_client(imap_server, "fetch_emails_to_dir", [str(uid) for uid in range(1, 7)], str(tmp_path),
+                       chunk_size=3)
+    assert len(saved) == 6
+    assert eml_files(tmp_path) == [f"{uid}.eml" for uid in range(1, 7)]
+    with open(saved["5"], "rb") as f:
+        assert f.read() == imap_server.body("INBOX", 5)
+
+
+def test_fetch_to_dir_cleans_up_when_fetch_fails(imap_server, tmp_path):
+    """重试次数用尽时抛出异常，不留下未接收完整的临时文件，已接收完整的邮件保留"""
+    imap_server.add("INBOX", 4)
+    imap_server.fetch_cut = {n: 0 for n in range(2, 10)}
+    with pytest.raises(RuntimeError):
+        run_client(imap_server, "fetch_emails_to_dir", ["1", "2", "3", "4"], str(tmp_path),
+                   chunk_size=2, max_retries=2)
+    assert eml_files(tmp_path) == ["1.eml", "2.eml"]
+
+
+def test_fetch_to_dir_streams_literal_in_blocks(imap_server, tmp_path, monkeypatch):
+    """大邮件按 LITERAL_CHUNK_SIZE 分块写入磁盘，不整体读入内存"""
+    monkeypatch.setattr(AsyncImapConnection, "LITERAL_CHUNK_SIZE", 4096)
+    body = b"Subject: large\r\n\r\n" + os.urandom(256 * 1024)
+    imap_server.add("INBOX", 1)
+    imap_server.bodies[("INBOX", 1)] = body
+
+    reads = []
+    original = asyncio.StreamReader.readexactly
+
+    async def readexactly(self, n):
+        reads.append(n)
+        return await original(self, n)
+    monkeypatch.setattr(asyncio.StreamReader, "readexactly", readexactly)
+
+    saved = run_client(imap_server, "fetch_emails_to_dir", ["1"], str(tmp_path))
+    with open(saved["1"], "rb") as f:
+        assert f.read() == body
+    assert max(reads) <= 4096
+    assert sum(reads) == len(body)
+
+
+def test_sync_client_fetch_to_dir(imap_server, tmp_path, monkeypatch):
+    """EmailClient 的批量获取使用独立的异步客户端"""
+    monkeypatch.setattr("sinotrans.core.eml.AsyncEmailClient", functools.partial(AsyncEmailClient, use_ssl=False))
+    imap_server.add("INBOX", 3)
+    client = EmailClient("127.0.0.1", imap_server.port, "user", "secret")
+    saved = client.fetch_emails_to_dir(["1", "2", "3"], str(tmp_path), chunk_size=2)
+    assert eml_files(tmp_path) == ["1.eml", "2.eml", "3.eml"]
+    received = []
+    assert client.fetch_emails_streaming(["2", "3"], lambda uid, payload: received.append(uid)) == 2
+    assert sorted(received) == ["2", "3"]
+    assert sorted(saved) == ["1", "2", "3"]
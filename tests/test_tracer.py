@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+from sinotrans.utils import Logger, Tracer
+import json
+import os
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def fresh_tracer():
+    Tracer.reset()
+    yield
+    Tracer.reset()
+
+
+@Tracer.trace("decorated")
+def decorated(rows):
+    Tracer.add_rows(rows)
+    return rows
+
+
+def test_spans_nest_and_record_rows_and_attrs():
+    with Tracer.span("run") as run:
+        with Tracer.span("stage", sheet="A") as stage:
+            stage.add_rows(3)
+            assert Tracer.current() is stage
+        assert decorated(5) == 5
+        run.set(result=True)
+    Tracer.add_rows(100)  # 没有区间时忽略
+
+    [root] = Tracer.report()
+    assert root["name"] == "run" and root["attrs"] == {"result": "True"}
+    assert [(child["name"], child["rows"], child["attrs"]) for child in root["children"]] == [
+        ("stage", 3, {"sheet": "A"}), ("decorated", 5, {}),
+    ]
+    assert root["wall"] >= sum(child["wall"] for child in root["children"])
+
+
+def test_span_is_closed_when_body_raises():
+    with pytest.raises(ValueError):
+        with Tracer.span("failing"):
+            raise ValueError("boom")
+    assert Tracer.current() is None
+    assert [span["name"] for span in Tracer.report()] == ["failing"]
+
+
+def test_propagated_spans_are_children_of_submitting_span():
+    def work(idx):
+        with Tracer.span("task", idx=idx) as span:
+            span.add_rows(idx)
+
+    with Tracer.span("parent"):
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(Tracer.propagate(work), range(1, 5)))
+    # 未传递区间的线程：记录为新的根区间
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(work, 9).result()
+
+    parent, orphan = Tracer.report()
+    assert sorted(child["attrs"]["idx"] for child in parent["children"]) == ["1", "2", "3", "4"]
+    assert all(child["thread"] != parent["thread"] for child in parent["children"])
+    assert orphan["name"] == "task" and orphan["rows"] == 9
+
+
+def test_summary_aggregates_by_name_in_first_seen_order():
+    for rows in (2, 3):
+        with Tracer.span("outer"):
+            with Tracer.span("inner") as span:
+                span.add_rows(rows)
+    summary = Tracer.summary()
+    assert [(item["name"], item["count"], item["rows"]) for item in summary] == [("outer", 2, 0), ("inner", 2, 5)]
+
+
+def test_write_report(tmp_path):
+    with Tracer.span("run") as span:
+        span.add_rows(7)
+    path = Tracer.write_report(str(tmp_path / "timing.json"))
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["summary"][0]["name"] == "run" and report["summary"][0]["rows"] == 7
+    assert report["spans"][0]["name"] == "run"
+
+
+def test_each_run_writes_its_own_report():
+    paths = []
+    for _ in range(2):
+        Tracer.reset()
+        with Tracer.span("run"):
+            pass
+        paths.append(Tracer.write_report())
+    assert paths[0] != paths[1]
+    assert all(os.path.dirname(path) == Logger().DEBUG_PATH and os.path.exists(path) for path in paths)
+    assert os.path.basename(paths[1]) == f"timing_{Tracer.run_id()}.json"